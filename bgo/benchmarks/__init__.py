@@ -0,0 +1,49 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    benchmarks
+        Small timing scripts for the position engine and the database, run from the bgo directory:
+            python -m benchmarks.bench_position
+        Each script takes --tgz to load games from a tgz of SGF files, default is TestSGF.tgz
+'''
+
+import os
+import tarfile
+import time
+
+from utils.sgf_parser import SGFParser, SGFParserException
+
+DEFAULT_TGZ = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'TestSGF.tgz')
+
+
+'''
+    Returns a list of move pair lists, one for every SGF in the tgz that parses
+'''
+def load_move_lists_from_tgz(path_to_tgz):
+    move_lists = []
+    with tarfile.open(path_to_tgz, 'r:gz') as tar:
+        for tarinfo in tar:
+            _, extension = os.path.splitext(tarinfo.name)
+            if extension.lower() != '.sgf':
+                continue
+            sgf = SGFParser()
+            try:
+                sgf.import_from_sgf_file_text(tar.extractfile(tarinfo).read().decode('utf-8'), tarinfo.name)
+            except SGFParserException:
+                continue
+            move_lists.append(sgf.move_pair_list)
+    return move_lists
+
+
+'''
+    Calls func(*args) repeat times and returns the fastest run in seconds
+'''
+def best_time(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
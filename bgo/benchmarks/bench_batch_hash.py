@@ -0,0 +1,48 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_batch_hash.py
+        Hashes the final positions of the games in a tgz in all 8 rotations, as rebuild_final_positions and the
+        duplicate check of import do, once a game at a time on a ReplayBoard and once with the NumPy batches of
+        game_of_go.batch_hash, and checks both give the same hashes. --copies repeats the games for larger batches.
+
+        python -m benchmarks.bench_batch_hash [--tgz games.tgz] [--copies 10] [--repeat 3]
+'''
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+import game_of_go.batch_hash as batch_hash
+import game_of_go.coords as coords
+
+
+def hash_one_at_a_time(stored_move_lists):
+    return [batch_hash.build_final_rotation_hashes_python(stored_move_list) for stored_move_list in stored_move_lists]
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to hash')
+@click.option('--copies', default=10, help='Number of times the games of the tgz are repeated')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, copies, repeat):
+    if not batch_hash.HAVE_NUMPY:
+        print('NumPy is not installed, batch_hash falls back to one game at a time, pip install numpy')
+        return
+
+    stored_move_lists = [coords.pack_move_pair_list(moves) for moves in load_move_lists_from_tgz(tgz)] * copies
+    print(f'Hashing {len(stored_move_lists)} final positions from {tgz}')
+
+    if batch_hash.build_final_rotation_hashes(stored_move_lists) != hash_one_at_a_time(stored_move_lists):
+        print('*** Hashes differ between ReplayBoard and batch_hash!')
+        return
+
+    python_time = best_time(hash_one_at_a_time, stored_move_lists, repeat=repeat)
+    numpy_time = best_time(batch_hash.build_final_rotation_hashes, stored_move_lists, repeat=repeat)
+
+    print(f'ReplayBoard  {python_time:8.3f}s  {python_time / len(stored_move_lists) * 1e6:8.1f}us/game')
+    print(f'NumPy        {numpy_time:8.3f}s  {numpy_time / len(stored_move_lists) * 1e6:8.1f}us/game')
+    print(f'Speedup      {python_time / numpy_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
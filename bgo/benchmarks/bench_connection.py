@@ -0,0 +1,89 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_connection.py
+        Imports a tgz into a temporary database and times single lookups, once opening a new sqlite3 connection
+        for every call as DBAccess did before the connection pool, and once with the pooled connection of the
+        thread. Lookups are timed from one thread and from several threads at once.
+
+        python -m benchmarks.bench_connection [--tgz games.tgz] [--lookups 2000] [--threads 4] [--repeat 3]
+'''
+
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+
+import click
+
+from benchmarks import DEFAULT_TGZ, best_time
+from database import DBAccess, DBAccessException
+
+
+class DBAccessConnectPerCall(DBAccess):
+    '''DBAccess with the connect_to_sql from before the connection pool'''
+
+    def connect_to_sql(self):
+        try:
+            con = sqlite3.connect(self.database_path)
+        except sqlite3.Error as e:
+            raise DBAccessException('sqlite3 error attempting to connect to database')
+        return con
+
+
+def lookup_moves(db, game_ids):
+    for game_id in game_ids:
+        db.get_moves_for_game_id(game_id)
+
+
+def lookup_next_moves(db, canonical_hashes):
+    for board_hash in canonical_hashes:
+        db.get_next_move_counter_for_canonical_hash(board_hash, 0)
+
+
+def lookup_in_threads(lookup_function, db, items, threads):
+    share = len(items) // threads
+    workers = [threading.Thread(target=lookup_function, args=(db, items[number * share:(number + 1) * share]))
+               for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to import')
+@click.option('--lookups', default=2000, help='Number of lookups of each kind')
+@click.option('--threads', default=4, help='Number of threads for the concurrent runs')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, lookups, threads, repeat):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_path = os.path.join(temp_dir, 'bench_connection.sqlite')
+        pooled = DBAccess(database_path)
+        pooled.add_games_from_tgz(tgz)
+        per_call = DBAccessConnectPerCall(database_path)
+
+        rng = random.Random(lookups)
+        game_ids = [rng.choice(pooled.get_all_game_id()) for _ in range(lookups)]
+        hashes = [row[0] for row in pooled.connect_to_sql().execute('SELECT DISTINCT board_hash FROM next_move_stats')]
+        canonical_hashes = [rng.choice(hashes) for _ in range(lookups)]
+
+        for name, lookup_function, items in (('get_moves_for_game_id', lookup_moves, game_ids),
+                                             ('get_next_move_counter_for_canonical_hash', lookup_next_moves,
+                                              canonical_hashes)):
+            print(f'\n{name}, {lookups} lookups')
+            for mode, run in (('1 thread', lookup_function),
+                              (f'{threads} threads', lambda db, items: lookup_in_threads(lookup_function, db, items,
+                                                                                         threads))):
+                per_call_time = best_time(run, per_call, items, repeat=repeat)
+                pooled_time = best_time(run, pooled, items, repeat=repeat)
+                print(f'   {mode:10} connect per call {per_call_time / lookups * 1e6:8.1f}us/lookup   '
+                      f'pooled {pooled_time / lookups * 1e6:8.1f}us/lookup   '
+                      f'speedup {per_call_time / pooled_time:6.2f}x')
+
+        pooled.close()
+
+
+if __name__ == '__main__':
+    main()
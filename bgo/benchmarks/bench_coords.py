@@ -0,0 +1,78 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_coords.py
+        Transforms every game in a tgz to the 7 other rotations and decodes every move to a flat code, once with the
+        str.index() and matrix arithmetic that coords used to do per move and once with the lookup tables
+        coords builds at import. Checks both give the same moves and prints timings.
+
+        python -m benchmarks.bench_coords [--tgz games.tgz] [--repeat 3]
+'''
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+import game_of_go.coords as coords
+
+
+# The per move version of coords.transform_move_pair_list() before the lookup tables
+def transform_move_pair_list_arithmetic(move_pair_list, rotation):
+    rotated_moves = []
+    matrix = coords.coord_transformations[rotation]
+    for charx, chary in move_pair_list:
+        if charx == 't' or chary == 't':
+            rotated_moves.append('tt')
+            continue
+        x = ('abcdefghijklmnopqrs'.index(charx)) - 9
+        y = ('abcdefghijklmnopqrs'.index(chary)) - 9
+        tx = matrix[0][0] * x + matrix[0][1] * y
+        ty = matrix[1][0] * x + matrix[1][1] * y
+        rotated_moves.append(chr(tx + 9 + ord('a')) + chr(ty + 9 + ord('a')))
+    return rotated_moves
+
+
+# The per move decode of Position.play_move() before the lookup tables
+def decode_move_pair_list_arithmetic(move_pair_list):
+    return [coords.PASS_FLAT if move[0] == 't' or move[1] == 't' else
+            19 * 'abcdefghijklmnopqrs'.index(move[1]) + 'abcdefghijklmnopqrs'.index(move[0])
+            for move in move_pair_list]
+
+
+def transform_all(transform, move_lists):
+    return [transform(moves, rotation) for moves in move_lists for rotation in range(1, 8)]
+
+
+def decode_all(decode, move_lists):
+    return [decode(moves) for moves in move_lists]
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to transform')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, repeat):
+    move_lists = load_move_lists_from_tgz(tgz)
+    move_count = sum(len(moves) for moves in move_lists)
+    print(f'Loaded {len(move_lists)} games with {move_count} moves from {tgz}')
+
+    if (transform_all(transform_move_pair_list_arithmetic, move_lists) !=
+            transform_all(coords.transform_move_pair_list, move_lists) or
+            decode_all(decode_move_pair_list_arithmetic, move_lists) !=
+            decode_all(coords.convert_move_pair_list_to_flat_moves, move_lists)):
+        print('*** Moves differ between the arithmetic and the lookup tables!')
+        return
+
+    for name, arithmetic, table, run, moves_done in (
+            ('Transform 7 rotations', transform_move_pair_list_arithmetic, coords.transform_move_pair_list,
+             transform_all, move_count * 7),
+            ('Decode to flat codes', decode_move_pair_list_arithmetic, coords.convert_move_pair_list_to_flat_moves,
+             decode_all, move_count)):
+        arithmetic_time = best_time(run, arithmetic, move_lists, repeat=repeat)
+        table_time = best_time(run, table, move_lists, repeat=repeat)
+        print(name)
+        print(f'   arithmetic   {arithmetic_time:8.3f}s  {arithmetic_time / moves_done * 1e9:6.0f}ns/move')
+        print(f'   tables       {table_time:8.3f}s  {table_time / moves_done * 1e9:6.0f}ns/move')
+        print(f'   Speedup      {arithmetic_time / table_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_hashing.py
+        Compares the additive hash (sum of const_hash_list) with the Zobrist hash.
+
+        Collisions: hashes every board with two stones on it, and every position reached in the games of the tgz,
+        and counts hashes that are shared by more than one distinct board.
+
+        Throughput: replays the games and hashes the position after every move, once by scanning the board with
+        get_hash_for_board() and once with the running hash from Position.get_hash().
+
+        python -m benchmarks.bench_hashing [--tgz games.tgz] [--repeat 3]
+'''
+
+from collections import defaultdict
+from itertools import combinations
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+import game_of_go.game_of_go as game_of_go
+
+
+'''
+    Yields every board with exactly two stones, in every combination of colors
+'''
+def two_stone_boards():
+    colors = (game_of_go.BLACK, game_of_go.WHITE)
+    empty = game_of_go.EMPTY_BOARD
+    for fa, fb in combinations(range(game_of_go.NN), 2):
+        for color_a in colors:
+            for color_b in colors:
+                board = bytearray(empty, encoding='ascii')
+                board[fa] = ord(color_a)
+                board[fb] = ord(color_b)
+                yield board.decode('ascii')
+
+
+def game_boards(move_lists):
+    for moves in move_lists:
+        position = game_of_go.Position.initial_state()
+        color = game_of_go.BLACK
+        try:
+            for move in moves:
+                position = position.play_move(move, color)
+                color = game_of_go.swap_colors(color)
+                yield position.get_board()
+        except game_of_go.IllegalMove:
+            continue
+
+
+'''
+    Returns (distinct boards, hashes shared by more than one distinct board)
+'''
+def count_collisions(hash_function, boards):
+    boards_for_hash = defaultdict(set)
+    for board in boards:
+        boards_for_hash[hash_function(board)].add(board)
+    distinct = sum(len(item) for item in boards_for_hash.values())
+    return distinct, sum(1 for item in boards_for_hash.values() if len(item) > 1)
+
+
+def hash_by_scanning(move_lists):
+    for moves in move_lists:
+        position = game_of_go.Position.initial_state()
+        color = game_of_go.BLACK
+        try:
+            for move in moves:
+                position = position.play_move(move, color)
+                color = game_of_go.swap_colors(color)
+                game_of_go.get_hash_for_board(position.get_board())
+        except game_of_go.IllegalMove:
+            continue
+
+
+def hash_incremental(move_lists):
+    for moves in move_lists:
+        position = game_of_go.Position.initial_state()
+        color = game_of_go.BLACK
+        try:
+            for move in moves:
+                position = position.play_move(move, color)
+                color = game_of_go.swap_colors(color)
+                position.get_hash()
+        except game_of_go.IllegalMove:
+            continue
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to replay')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, repeat):
+    move_lists = load_move_lists_from_tgz(tgz)
+    move_count = sum(len(moves) for moves in move_lists)
+    print(f'Loaded {len(move_lists)} games with {move_count} moves from {tgz}')
+
+    print('\nCollisions')
+    for name, boards in (('two stone boards', two_stone_boards), ('game positions', lambda: game_boards(move_lists))):
+        for scheme, hash_function in (('additive', game_of_go.get_additive_hash_for_board),
+                                      ('zobrist', game_of_go.get_hash_for_board)):
+            distinct, collisions = count_collisions(hash_function, boards())
+            print(f'   {name:18} {scheme:10} {distinct:9} boards  {collisions:6} colliding hashes')
+
+    print('\nThroughput, hash after every move')
+    scan_time = best_time(hash_by_scanning, move_lists, repeat=repeat)
+    incremental_time = best_time(hash_incremental, move_lists, repeat=repeat)
+    print(f'   get_hash_for_board  {scan_time:8.3f}s  {scan_time / move_count * 1e6:6.2f}us/move')
+    print(f'   Position.get_hash   {incremental_time:8.3f}s  {incremental_time / move_count * 1e6:6.2f}us/move')
+    print(f'   Speedup             {scan_time / incremental_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_merge.py
+        Times merging the next moves of a position with many candidate replies. The quadratic merge replays the
+        game for every candidate and again for every kept move, then scans the remaining list. The bucketed merge
+        in DBAccess plays each candidate on the base position once and groups them by canonical hash.
+
+        python -m benchmarks.bench_merge [--candidates 200] [--repeat 3]
+'''
+
+from collections import Counter
+import os
+import random
+import tempfile
+
+import click
+
+from benchmarks import best_time
+from database import DBAccess
+import game_of_go.game_of_go as game_of_go
+
+
+'''
+    The merge_next_move_counter from before bucketing
+'''
+def merge_quadratic(move_list, next_move_counter):
+    list_most_popular = [
+        (next_move, count, game_of_go.build_hash_from_move_list(move_list + [next_move]))
+        for next_move, count in
+        next_move_counter.most_common()
+    ]
+
+    merged_counter = Counter()
+
+    while len(list_most_popular) > 0:
+        next_move, count, _ = list_most_popular.pop(0)
+        merged_counter[next_move] = count
+        rotated_hash_list = game_of_go.build_all_rotation_hashes_from_move_list(move_list + [next_move])
+        for sub_next_move, sub_count, sub_hash in list(list_most_popular):
+            if sub_hash in rotated_hash_list:
+                merged_counter[next_move] += sub_count
+                list_most_popular.remove((sub_next_move, sub_count, sub_hash))
+
+    return merged_counter
+
+
+'''
+    Returns a Counter of candidates random legal next moves for move_list, with distinct counts
+'''
+def random_candidates(move_list, candidates):
+    board = game_of_go.build_position_from_move_pair_list(move_list).get_board()
+    letters = 'abcdefghijklmnopqrs'
+    empty_moves = [x + y for y in letters for x in letters if board[letters.index(y) * 19 + letters.index(x)] == '.']
+    moves = random.Random(candidates).sample(empty_moves, candidates)
+    return Counter({move: candidates * 2 - number for number, move in enumerate(moves)})
+
+
+@click.command()
+@click.option('--candidates', default=200, help='Number of candidate next moves')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(candidates, repeat):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run_merges(DBAccess(os.path.join(temp_dir, 'bench_merge.sqlite')), candidates, repeat)
+
+
+def run_merges(db, candidates, repeat):
+    for move_list in ([], ['pd', 'dp'], ['pd', 'dd', 'pq', 'dp', 'fc', 'cf', 'qj']):
+        next_move_counter = random_candidates(move_list, candidates)
+        if merge_quadratic(move_list, next_move_counter) != db.merge_next_move_counter(move_list, next_move_counter):
+            print(f'*** Merged counters differ for {move_list}!')
+            return
+        quadratic_time = best_time(merge_quadratic, move_list, next_move_counter, repeat=repeat)
+        bucketed_time = best_time(db.merge_next_move_counter, move_list, next_move_counter, repeat=repeat)
+        merged = len(db.merge_next_move_counter(move_list, next_move_counter))
+        print(f'\n{move_list}  {candidates} candidates merged to {merged}')
+        print(f'   quadratic    {quadratic_time * 1000:9.2f}ms')
+        print(f'   bucketed     {bucketed_time * 1000:9.2f}ms')
+        print(f'   Speedup      {quadratic_time / bucketed_time:9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_opening_tree.py
+        Imports the tgz into a temporary database and builds the opening tree of utils/opening_tree.py from it,
+        saves it and times loading it back, which is the cold start of a server given --opening-tree. Checks that
+        every opening position of the games in the tree gets the same next moves as from the database, then times
+        the lookups of those positions from the database and from the tree.
+
+        The load is a read of the arrays, its time per position is what a larger database costs at startup.
+        --database builds the tree from an existing database instead, the cold build of a server on a database of
+        real size, and looks up the opening positions of the tgz in it.
+
+        python -m benchmarks.bench_opening_tree [--tgz games.tgz] [--database database.sqlite] [--max-depth 20]
+                                                [--min-games 1] [--repeat 3]
+'''
+
+import os
+import tempfile
+import time
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+from database import DBAccess, DBAccessLookupNotFound
+import game_of_go.game_of_go as game_of_go
+import utils.opening_tree as opening_tree
+
+
+'''
+    Returns the distinct legal move lists of the first max_depth moves of the games
+'''
+def build_opening_move_lists(move_lists, max_depth):
+    opening_move_lists = {}
+    for moves in move_lists:
+        for length in range(1, min(max_depth, len(moves)) + 1):
+            try:
+                game_of_go.build_replayboard_from_move_pair_list(moves[:length])
+            except game_of_go.IllegalMove:
+                break
+            opening_move_lists.setdefault(tuple(moves[:length]), moves[:length])
+    return list(opening_move_lists.values())
+
+
+def lookup_database(db, opening_move_lists):
+    counters = []
+    for move_list in opening_move_lists:
+        try:
+            counters.append(db.get_next_move_counter_for_moves(move_list))
+        except DBAccessLookupNotFound:
+            counters.append(None)
+    return counters
+
+
+# The replay is part of a lookup from a move list, as it is for the database and in NextMoveCache
+def lookup_tree(tree, opening_move_lists):
+    return [tree.get_next_move_counter_for_position(game_of_go.build_replayboard_from_move_pair_list(move_list))
+            for move_list in opening_move_lists]
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to import')
+@click.option('--database', default=None, help='Existing database to build the tree from, the tgz is not imported')
+@click.option('--max-depth', default=opening_tree.DEFAULT_MAX_DEPTH, help='Moves deep the tree is built')
+@click.option('--min-games', default=1, help='Games a next move needs to be walked into')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, database, max_depth, min_games, repeat):
+    opening_move_lists = build_opening_move_lists(load_move_lists_from_tgz(tgz), max_depth)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if database:
+            db = DBAccess(database, read_only=True)
+        else:
+            db = DBAccess(os.path.join(temp_dir, 'bench_opening_tree.sqlite'))
+            db.add_games_from_tgz(tgz)
+        games = db.get_number_of_games_in_database()
+
+        start = time.perf_counter()
+        tree = opening_tree.build_opening_tree(db, max_depth, min_games)
+        build_time = time.perf_counter() - start
+
+        tree_path = os.path.join(temp_dir, 'opening_tree.bin')
+        tree.save(tree_path)
+        load_time = best_time(opening_tree.load_opening_tree, tree_path, repeat=repeat)
+
+        database_counters = lookup_database(db, opening_move_lists)
+        tree_counters = lookup_tree(opening_tree.load_opening_tree(tree_path), opening_move_lists)
+        in_tree = [move_list for move_list, counter in zip(opening_move_lists, tree_counters) if counter is not None]
+        for database_counter, tree_counter in zip(database_counters, tree_counters):
+            if tree_counter is not None and list(tree_counter.items()) != list(database_counter.items()):
+                print('*** Next moves differ between the database and the opening tree!')
+                return
+
+        database_time = best_time(lookup_database, db, in_tree, repeat=repeat)
+        tree_time = best_time(lookup_tree, tree, in_tree, repeat=repeat)
+        db.close()
+
+    stats = tree.get_stats()
+    print(f'\nOpening tree of {games} games, max depth {max_depth}, min games {min_games}')
+    print(f'   {stats["nodes"]} positions, {stats["next_moves"]} next moves, {stats["bytes"]} bytes, '
+          f'{stats["bytes"] / max(stats["nodes"], 1):.1f} bytes/position')
+    print(f'   build        {build_time:8.3f}s')
+    print(f'   load         {load_time * 1000:8.3f}ms  {load_time / max(stats["nodes"], 1) * 1e9:8.1f}ns/position')
+    print(f'\n{len(in_tree)} of {len(opening_move_lists)} opening positions of the games are in the tree')
+    print(f'   database     {database_time / max(len(in_tree), 1) * 1e6:8.1f}us/lookup')
+    print(f'   tree         {tree_time / max(len(in_tree), 1) * 1e6:8.1f}us/lookup')
+    print(f'   Speedup      {database_time / tree_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
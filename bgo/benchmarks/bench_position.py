@@ -0,0 +1,53 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_position.py
+        Replays every game in a tgz with NaivePosition (find_reached on every move) and with Position
+        (incremental chains and liberties), checks both engines reach the same boards, and prints timings.
+
+        python -m benchmarks.bench_position [--tgz games.tgz] [--repeat 3]
+'''
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+import game_of_go.game_of_go as game_of_go
+
+
+def replay_all(position_class, move_lists):
+    boards = []
+    for moves in move_lists:
+        position = position_class.initial_state()
+        color = game_of_go.BLACK
+        try:
+            for move in moves:
+                position = position.play_move(move, color)
+                color = game_of_go.swap_colors(color)
+        except game_of_go.IllegalMove:
+            pass
+        boards.append(position.get_board())
+    return boards
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to replay')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, repeat):
+    move_lists = load_move_lists_from_tgz(tgz)
+    move_count = sum(len(moves) for moves in move_lists)
+    print(f'Loaded {len(move_lists)} games with {move_count} moves from {tgz}')
+
+    if replay_all(game_of_go.NaivePosition, move_lists) != replay_all(game_of_go.Position, move_lists):
+        print('*** Final boards differ between NaivePosition and Position!')
+        return
+
+    naive_time = best_time(replay_all, game_of_go.NaivePosition, move_lists, repeat=repeat)
+    fast_time = best_time(replay_all, game_of_go.Position, move_lists, repeat=repeat)
+
+    print(f'NaivePosition  {naive_time:8.3f}s  {naive_time / move_count * 1e6:6.2f}us/move')
+    print(f'Position       {fast_time:8.3f}s  {fast_time / move_count * 1e6:6.2f}us/move')
+    print(f'Speedup        {naive_time / fast_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
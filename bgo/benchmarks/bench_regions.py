@@ -0,0 +1,91 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_regions.py
+        Times the region rows of game_of_go/regions.py that import and rebuild_region_move_stats() compute for
+        every game, then imports the tgz into a temporary database and times the joseki lookup of the region of
+        the last move of every opening position of the games, which is what the joseki command does.
+
+        A lookup is one primary key range of region_move_stats, its time does not grow with the number of games,
+        only with the number of next moves of the pattern.
+
+        python -m benchmarks.bench_regions [--tgz games.tgz] [--max-depth 30] [--repeat 3]
+'''
+
+import os
+import tempfile
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+from database import DBAccess, DBAccessLookupNotFound
+import game_of_go.coords as coords
+import game_of_go.game_of_go as game_of_go
+import game_of_go.regions as regions
+
+
+def build_region_rows(flat_move_lists):
+    region_set = regions.get_region_set(DBAccess.REGION_SIZE)
+    rows = 0
+    for flat_moves in flat_move_lists:
+        try:
+            for _ in regions.build_region_move_rows_from_flat_moves(flat_moves, DBAccess.REGION_LIST_DEPTH,
+                                                                     region_set):
+                rows += 1
+        except game_of_go.IllegalMove:
+            pass
+    return rows
+
+
+def lookup_regions(db, lookups):
+    found = 0
+    for move_list, region_name in lookups:
+        try:
+            db.get_region_next_move_stats(move_list, region_name)
+            found += 1
+        except DBAccessLookupNotFound:
+            pass
+    return found
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to import')
+@click.option('--max-depth', default=30, help='Moves deep the opening positions to look up are taken')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, max_depth, repeat):
+    move_lists = load_move_lists_from_tgz(tgz)
+    flat_move_lists = []
+    for move_list in move_lists:
+        try:
+            flat_move_lists.append([coords.convert_move_pair_to_flat(move) for move in move_list])
+        except ValueError:
+            pass
+
+    rows = build_region_rows(flat_move_lists)
+    rows_time = best_time(build_region_rows, flat_move_lists, repeat=repeat)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db = DBAccess(os.path.join(temp_dir, 'bench_regions.sqlite'))
+        db.add_games_from_tgz(tgz)
+
+        # The position before each move, looked up in the region of the move before it as joseki does
+        lookups = []
+        for move_list in move_lists:
+            for length in range(1, min(max_depth, len(move_list))):
+                region_names = db.get_regions_for_move(move_list[length - 1])
+                if region_names:
+                    lookups.append((move_list[:length], region_names[0]))
+
+        found = lookup_regions(db, lookups)
+        lookup_time = best_time(lookup_regions, db, lookups, repeat=repeat)
+        db.close()
+
+    print(f'\nRegion rows of {len(flat_move_lists)} games, {DBAccess.REGION_LIST_DEPTH} moves deep, '
+          f'{DBAccess.REGION_SIZE}x{DBAccess.REGION_SIZE} regions')
+    print(f'   {rows} rows  {rows_time:8.3f}s  {rows_time / max(len(flat_move_lists), 1) * 1e6:8.1f}us/game')
+    print(f'\n{found} of {len(lookups)} positions up to move {max_depth} found in the region of the last move')
+    print(f'   lookup       {lookup_time / max(len(lookups), 1) * 1e6:8.1f}us/lookup')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_replay.py
+        Replays every game in a tgz with the immutable Position and PositionSimple, which return a new object for
+        every move, and with the mutable ReplayBoard that the rebuilds and import use, which changes one board in
+        place. Checks that the hashes agree, then prints the time per move and, measured with tracemalloc, the
+        bytes allocated per move. The allocation pass runs every move under tracemalloc, so it is slow.
+
+        python -m benchmarks.bench_replay [--tgz games.tgz] [--repeat 3]
+'''
+
+import tracemalloc
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+import game_of_go.coords as coords
+import game_of_go.game_of_go as game_of_go
+
+
+def replay_immutable(position_class, flat_move_lists, measure=False):
+    hashes = []
+    allocated = 0
+    for flat_moves in flat_move_lists:
+        position = position_class.initial_state()
+        color = game_of_go.BLACK
+        for fc in flat_moves:
+            if measure:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            position = position.play_flat_move(fc, color)
+            if measure:
+                allocated += tracemalloc.get_traced_memory()[1] - before
+            color = game_of_go.swap_colors(color)
+        hashes.append(position.symmetric_hash)
+    return hashes, allocated
+
+
+def replay_mutable(rules, flat_move_lists, measure=False):
+    hashes = []
+    allocated = 0
+    for flat_moves in flat_move_lists:
+        board = game_of_go.ReplayBoard()
+        play = board.play_flat_move if rules else board.place_flat_stone
+        color = game_of_go.BLACK
+        for fc in flat_moves:
+            if measure:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            play(fc, color)
+            if measure:
+                allocated += tracemalloc.get_traced_memory()[1] - before
+            color = game_of_go.swap_colors(color)
+        hashes.append(board.symmetric_hash)
+    return hashes, allocated
+
+
+def measure_allocations(replay, engine, flat_move_lists):
+    tracemalloc.start()
+    try:
+        _, allocated = replay(engine, flat_move_lists, measure=True)
+    finally:
+        tracemalloc.stop()
+    return allocated
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to replay')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, repeat):
+    flat_move_lists = []
+    for moves in load_move_lists_from_tgz(tgz):
+        flat_moves = [coords.convert_move_pair_to_flat(move) for move in moves]
+        try:
+            game_of_go.build_position_from_move_pair_list(moves)
+        except game_of_go.IllegalMove:
+            continue
+        flat_move_lists.append(flat_moves)
+    move_count = sum(len(flat_moves) for flat_moves in flat_move_lists)
+    print(f'Loaded {len(flat_move_lists)} legal games with {move_count} moves from {tgz}')
+
+    engines = (
+        ('Position', replay_immutable, game_of_go.Position),
+        ('ReplayBoard', replay_mutable, True),
+        ('PositionSimple', replay_immutable, game_of_go.PositionSimple),
+        ('ReplayBoard, no rules', replay_mutable, False),
+    )
+
+    if (replay_immutable(game_of_go.Position, flat_move_lists) != replay_mutable(True, flat_move_lists) or
+            replay_immutable(game_of_go.PositionSimple, flat_move_lists) != replay_mutable(False, flat_move_lists)):
+        print('*** Hashes differ between the immutable positions and ReplayBoard!')
+        return
+
+    print(f'{"":24}{"time":>10}{"us/move":>10}{"bytes/move":>12}')
+    for name, replay, engine in engines:
+        elapsed = best_time(replay, engine, flat_move_lists, repeat=repeat)
+        allocated = measure_allocations(replay, engine, flat_move_lists)
+        print(f'{name:24}{elapsed:9.3f}s{elapsed / move_count * 1e6:10.2f}{allocated / move_count:12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    bench_symmetry.py
+        Times building the hashes of all 8 rotations of a game, once by replaying the game in every rotation and
+        once with the packed symmetric hash from a single replay. Both Position (next move lookups) and
+        PositionSimple (duplicate detection) are timed, and the hashes are checked to match.
+
+        python -m benchmarks.bench_symmetry [--tgz games.tgz] [--repeat 3]
+'''
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz, best_time
+import game_of_go.game_of_go as game_of_go
+
+
+def hashes_by_replaying(build_function, move_lists):
+    return [[build_function(moves, rotation).get_hash() for rotation in range(8)] for moves in move_lists]
+
+
+def hashes_single_pass(build_function, move_lists):
+    return [build_function(moves).get_rotation_hashes() for moves in move_lists]
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files to replay')
+@click.option('--repeat', default=3, help='Number of timed runs, the fastest is reported')
+def main(tgz, repeat):
+    move_lists = load_move_lists_from_tgz(tgz)
+    print(f'Loaded {len(move_lists)} games from {tgz}')
+
+    for name, build_function, games in (
+            ('Position, first 30 moves', game_of_go.build_position_from_move_pair_list,
+             [moves[:30] for moves in move_lists]),
+            ('PositionSimple, full game', game_of_go.build_positionsimple_from_move_pair_list, move_lists)):
+        if hashes_by_replaying(build_function, games) != hashes_single_pass(build_function, games):
+            print(f'*** {name}: rotation hashes differ!')
+            return
+        replay_time = best_time(hashes_by_replaying, build_function, games, repeat=repeat)
+        single_time = best_time(hashes_single_pass, build_function, games, repeat=repeat)
+        print(f'\n{name}')
+        print(f'   8 replays     {replay_time:8.3f}s')
+        print(f'   single pass   {single_time:8.3f}s')
+        print(f'   Speedup       {replay_time / single_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    load_nextmove.py
+        Load test for the nextmove api of http_api/asgi.py. Imports the tgz into a temporary database, starts
+        the ASGI server on it, and runs many concurrent clients over keep alive connections. Each client asks for
+        opening positions from the games, the popular ones much more often than the rest, as the SPA does.
+        Prints the throughput, the latency percentiles and the cache and coalescing counters of the server.
+
+        --url tests a server that is already running instead, its database should hold the games of the tgz.
+
+        python -m benchmarks.load_nextmove [--tgz games.tgz] [--clients 200] [--requests 20] [--no-coalesce]
+'''
+
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import click
+
+from benchmarks import DEFAULT_TGZ, load_move_lists_from_tgz
+from database import DBAccess
+
+
+'''
+    Returns the request paths of the opening positions of the games, most popular first
+'''
+def build_opening_paths(move_lists, max_moves=12):
+    paths = set()
+    for moves in move_lists:
+        for length in range(1, min(max_moves, len(moves)) + 1):
+            paths.add('/api/nextmove/' + '+'.join(moves[:length]))
+    # Shorter openings are shared by more games, ask for them more often
+    return sorted(paths, key=lambda path: (path.count('+'), path))
+
+
+async def read_response(reader):
+    header = await reader.readuntil(b'\r\n\r\n')
+    status = int(header.split(b' ', 2)[1])
+    content_length = 0
+    for line in header.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            content_length = int(value.strip())
+    body = await reader.readexactly(content_length)
+    return status, body
+
+
+async def get(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode('ascii'))
+    await writer.drain()
+    status, body = await read_response(reader)
+    writer.close()
+    return status, body
+
+
+async def run_client(host, port, paths, weights, requests, rng, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in rng.choices(paths, weights, k=requests):
+            start = time.perf_counter()
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('ascii'))
+            await writer.drain()
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, paths, clients, requests):
+    # Zipf like, the n-th most popular position is asked for 1/n as often as the first
+    weights = [1 / rank for rank in range(1, len(paths) + 1)]
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, paths, weights, requests, random.Random(number), latencies,
+                                      statuses) for number in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f'{len(latencies)} requests from {clients} clients in {elapsed:.2f}s, {len(latencies) / elapsed:.0f} req/s')
+    for name, fraction in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99), ('max', 1.0)):
+        latency = latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+        print(f'   {name}  {latency * 1000:8.2f}ms')
+    print(f'   status {statuses}')
+
+    _, body = await get(host, port, '/api/cache')
+    print(f'   server {json.loads(body)}')
+
+
+def wait_for_port(host, port, server, timeout=30):
+    stop = time.monotonic() + timeout
+    while time.monotonic() < stop and server.poll() is None:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+@click.command()
+@click.option('--tgz', default=DEFAULT_TGZ, help='tgz of SGF files for the fixture database and the positions')
+@click.option('--url', default=None, help='Test a running server, such as http://127.0.0.1:5000')
+@click.option('--clients', default=200, help='Number of concurrent clients')
+@click.option('--requests', default=20, help='Requests per client')
+@click.option('--threads', default=8, help='Lookup threads of the started server')
+@click.option('--no-coalesce', is_flag=True, help='Start the server without request coalescing')
+def main(tgz, url, clients, requests, threads, no_coalesce):
+    paths = build_opening_paths(load_move_lists_from_tgz(tgz))
+    print(f'{len(paths)} opening positions from {tgz}')
+
+    if url is not None:
+        parts = urlsplit(url)
+        asyncio.run(run_load(parts.hostname, parts.port or 80, paths, clients, requests))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_path = os.path.join(temp_dir, 'load_nextmove.sqlite')
+        db = DBAccess(database_path)
+        db.add_games_from_tgz(tgz)
+        db.close()
+
+        port = free_port()
+        command = [sys.executable, '-m', 'http_api.asgi', '--database', database_path, '--port', str(port),
+                   '--threads', str(threads)]
+        if no_coalesce:
+            command.append('--no-coalesce')
+        server = subprocess.Popen(command)
+        try:
+            if not wait_for_port('127.0.0.1', port, server):
+                print('*** Server did not start, is uvicorn installed?')
+                return
+            asyncio.run(run_load('127.0.0.1', port, paths, clients, requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
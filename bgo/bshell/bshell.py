@@ -82,6 +82,8 @@ def main_loop(database):
     game_count = db_access.get_number_of_games_in_database()
 
     print(f'Using database [{database_path}] with {game_count} games.')
+    if db_access.get_pending_migrations():
+        print(f'Database needs to be migrated, run the migrate command.')
 
 
     state = ShellState(database_path=database_path,
@@ -56,6 +56,7 @@ Examples:
             return
 
         self.state.database_path = database_path
+        self.state.opening_tree = None
 
         try:
             game_count = self.state.db_access.get_number_of_games_in_database()
@@ -65,3 +66,5 @@ Examples:
             return
 
         print(f'   Opened {self.state.database_path} with {game_count} games.')
+        if self.state.db_access.get_pending_migrations():
+            print(f'   Database needs to be migrated, run the migrate command.')
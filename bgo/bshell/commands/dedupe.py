@@ -0,0 +1,54 @@
+from bshell.commands import Command
+from database import DBAccessException
+
+class Dedupe(Command):
+
+    keywords = ['dedupe']
+    help_text = """{keyword}
+{divider}
+Summary: Reports the games of the database that were recorded more than once,
+         the games that share a dyer signature in any rotation. Shows the
+         first <count> clusters, default 20. Nothing is deleted.
+
+Usage: {keyword} [<count>]
+
+Examples:
+
+    {keyword}
+    {keyword} 100
+"""
+
+    def do_command(self, *args):
+        try:
+            count = int(args[0]) if args else 20
+        except ValueError:
+            print('Count must be a number.')
+            return
+
+        db = self.state.db_access
+        try:
+            if db.is_dyer_signatures_missing():
+                print('   The database has no dyer signatures yet, run the migrate command.')
+                return
+            clusters = db.get_duplicate_game_clusters()
+            summaries = db.get_game_summaries([game_id for cluster in clusters[:count] for game_id in cluster])
+        except DBAccessException as e:
+            print(f'Error while accessing database! {self.state.database_path} - {e}')
+            return
+
+        if not clusters:
+            print('   No duplicate games found.')
+            return
+
+        summary_for_game = {summary['game_id']: summary for summary in summaries}
+        for number, cluster in enumerate(clusters[:count], 1):
+            print(f'\n   Cluster {number}, {len(cluster)} games')
+            for game_id in cluster:
+                summary = summary_for_game.get(game_id)
+                if summary is None:
+                    continue
+                print(f'      {game_id:>8}  {summary["game_date"]}  {summary["black_player_name"]} (B) vs '
+                      f'{summary["white_player_name"]} (W)  {summary["result"]}  {summary["sgf_file_name"]}')
+
+        print(f'\n   {len(clusters)} clusters, {sum(len(cluster) for cluster in clusters) - len(clusters)} '
+              f'duplicate games')
@@ -0,0 +1,102 @@
+from bshell.commands import Command
+from database import DBAccessException
+
+class Games(Command):
+
+    keywords = ['games']
+    help_text = """{keyword}
+{divider}
+Summary: Searches the games of the database by player, event, names, dates,
+         result and rank, most recent first, 20 at a time.
+         more shows the next 20 games of the last search.
+
+         player <name>   a player, the full name or a part of it
+         vs <name>       the opponent of player
+         as <color>      black or white, the color of player
+         event <name>    an event, the full name or a part of it
+         text <words>    words in the player, event or place names
+         from <date>     YYYY, YYYY-MM or YYYY-MM-DD
+         to <date>       a year or month means up to its end
+         result <who>    black, white, or won or lost for player
+         rank <rank>     both players at least this rank, 1 is 1 dan, -1 is 1 kyu
+
+Usage: {keyword} [player <name>] [vs <name>] [as <color>] [event <name>] [text <words>]
+             [from <date>] [to <date>] [result <who>] [rank <rank>]
+       {keyword} more
+
+Examples:
+
+    {keyword} player Lee Sedol from 2010 to 2015
+    {keyword} player Lee Sedol vs Gu Li result won
+    {keyword} event Meijin from 2012-06
+    {keyword} more
+"""
+
+    page_size = 20
+
+    # Search argument of each word of the command, the words after it up to the next one are its value
+    search_words = {
+        'player': 'player',
+        'vs': 'opponent',
+        'as': 'color',
+        'event': 'event',
+        'text': 'text',
+        'from': 'date_from',
+        'to': 'date_to',
+        'result': 'result',
+        'rank': 'min_rank',
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_search = None
+        self.next_page = None
+
+    def do_command(self, *args):
+        if args and args[0] == 'more':
+            if self.next_page is None:
+                print('   No more games.')
+                return
+            search = dict(self.last_search, after=self.next_page)
+        else:
+            search = self.parse_search(args)
+            if search is None:
+                return
+
+        try:
+            page = self.state.db_access.search_games(limit=self.page_size, **search)
+        except DBAccessException as e:
+            print(f'Error while searching games! {self.state.database_path} - {e}')
+            return
+
+        self.last_search = {key: value for key, value in search.items() if key != 'after'}
+        self.next_page = page['next']
+
+        if not page['games']:
+            print('   No games found.')
+            return
+
+        for game in page['games']:
+            print(f'   {game["game_id"]:>8}  {game["game_date"]}  {game["black_player_name"]} (B) vs '
+                  f'{game["white_player_name"]} (W)  {game["result"]}  {game["event"]}')
+        if self.next_page is not None:
+            print('   more for the next games')
+
+    def parse_search(self, args):
+        search = {}
+        argument = None
+        for word in args:
+            if word in self.search_words:
+                argument = self.search_words[word]
+                search[argument] = ''
+            elif argument is None:
+                print(f'Unknown search word [{word}], see help games.')
+                return None
+            else:
+                search[argument] = f'{search[argument]} {word}'.strip()
+
+        empty = [name for name, value in search.items() if not value]
+        if empty:
+            print(f'Missing a value for [{", ".join(empty)}], see help games.')
+            return None
+        return search
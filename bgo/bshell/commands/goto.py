@@ -0,0 +1,42 @@
+from bshell.commands import Command
+
+class Goto(Command):
+
+    keywords = ['goto']
+    help_text = """{keyword}
+{divider}
+Summary: Moves the search board to a move number, by undoing moves or redoing moves taken back.
+         Move 0 is the empty board.
+
+Usage: {keyword} <move number>
+
+Examples:
+
+    {keyword} 0
+    {keyword} 12
+"""
+
+    def do_command(self, *args):
+        search = self.state.search_board
+
+        if len(args) == 0:
+            print('Need a move number.')
+            return
+
+        try:
+            move_number = int(args[0])
+        except ValueError:
+            print(f'Move number must be a number, not "{args[0]}"')
+            return
+
+        if not search.go_to_move(move_number):
+            last = search.get_move_number() + len(search.redo_moves)
+            print(f'Move number must be between 0 and {last}')
+            return
+
+        command = self.state.commands.get('board') or None
+        if not command:
+            print('Command not found: board')
+            return
+
+        command.do_command()
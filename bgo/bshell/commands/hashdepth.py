@@ -0,0 +1,65 @@
+from bshell.commands import Command
+from database import DBAccessException
+
+
+class Hashdepth(Command):
+
+    keywords = ['hashdepth']
+    help_text = """{keyword}
+{divider}
+Summary: Shows or changes how many moves of each game are indexed for search.
+         The first <depth> positions of every game are indexed. With <shared games>
+         a game is also indexed past the depth while its position is shared with
+         at least that many other games, for mid game searches without the
+         positions no other game reached. Changing it rebuilds the board hashes.
+         See hashreport for the size and speed of different depths.
+
+Usage: {keyword} [<depth> [<shared games>]]
+
+Examples:
+
+    {keyword}
+    {keyword} 30
+    {keyword} 20 2
+"""
+
+    def do_command(self, *args):
+        db = self.state.db_access
+
+        try:
+            depth, shared_games = db.get_hash_list_depth()
+        except DBAccessException as e:
+            print(f'Error while reading database - [{e}]')
+            return
+
+        if not args:
+            print(f'   Index depth {depth}, shared games {shared_games}')
+            return
+
+        try:
+            new_depth = int(args[0])
+            new_shared_games = int(args[1]) if len(args) > 1 else 0
+        except ValueError:
+            print('Depth and shared games must be numbers.')
+            return
+
+        print(f'\n\n*** Using database file {self.state.database_path}')
+        print(f'*** Index depth {depth}, shared games {shared_games} -> depth {new_depth}, shared games '
+              f'{new_shared_games}, the board hashes are rebuilt')
+        try:
+            user_input = self.state.session.prompt("   Are you sure? (YES) > ",
+                key_bindings=self.state.key_bindings)
+            if not user_input or user_input != 'YES':
+                print(f'\nAborted.')
+                return
+        except (EOFError, KeyboardInterrupt):
+            raise
+
+        try:
+            db.set_hash_list_depth(new_depth, new_shared_games)
+            db.migrate_database()
+        except DBAccessException as e:
+            print(f'Error while changing index depth - [{e}]')
+            return
+
+        print(f'\nDone!')
@@ -0,0 +1,58 @@
+from bshell.commands import Command
+from database import DBAccessException
+
+
+DEFAULT_REPORT_DEPTHS = [10, 20, 30, 45, 60]
+
+
+class Hashreport(Command):
+
+    keywords = ['hashreport']
+    help_text = """{keyword}
+{divider}
+Summary: Builds the board hashes of the games for several index depths in a
+         temporary database and prints the rows, table and index size and the
+         lookup time of each. Shared rows are positions of more than one game,
+         the only rows a search finds other games with.
+         shared <k> also measures each depth with the adaptive index, see hashdepth.
+         sample <n> only uses the first n games. The database is not changed.
+
+Usage: {keyword} [<depth> ...] [shared <k>] [sample <n>]
+
+Examples:
+
+    {keyword}
+    {keyword} 20 30 40 shared 2
+    {keyword} 30 60 90 sample 5000
+"""
+
+    def do_command(self, *args):
+        depths = []
+        options = {'shared': 0, 'sample': None}
+        args = list(args)
+        try:
+            while args:
+                arg = args.pop(0)
+                if arg in options and args:
+                    options[arg] = int(args.pop(0))
+                else:
+                    depths.append(int(arg))
+        except ValueError:
+            print('Depths, shared and sample must be numbers.')
+            return
+
+        try:
+            reports = self.state.db_access.report_hash_list_depths(depths or DEFAULT_REPORT_DEPTHS,
+                                                                   options['shared'], options['sample'])
+        except DBAccessException as e:
+            print(f'Error while building index report - [{e}]')
+            return
+
+        if reports:
+            print(f'   {reports[0]["games"]} games')
+        print(f'   {"depth":>6}{"shared":>8}{"rows":>12}{"shared rows":>13}{"table MB":>10}{"index MB":>10}'
+              f'{"lookup us":>11}')
+        for report in reports:
+            print(f'   {report["depth"]:>6}{report["shared_games"]:>8}{report["rows"]:>12}{report["shared_rows"]:>13}'
+                  f'{report["table_bytes"] / 1e6:>10.2f}{report["index_bytes"] / 1e6:>10.2f}'
+                  f'{report["lookup_us"]:>11.1f}')
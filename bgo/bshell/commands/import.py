@@ -1,7 +1,7 @@
 import os
 from datetime import datetime
 
-from bshell.commands import Command
+from bshell.commands import Command, convert_to_int
 import utils.sgf_parser as sgf_parser
 
 from database import DBAccess, DBAccessLookupNotFound, DBAccessGameRecordError, DBAccessException, DBAccessDuplicate
@@ -14,16 +14,28 @@ class Import(Command):
     help_text = """{keyword}
 {divider}
 Summary: Imports a tgz of SGF files into the current database.
+         The hashes and next move counts of the new games are added as they are imported.
+         --workers parses the SGF files with N processes, default 1.
 
-Usage: {keyword} <file>
+Usage: {keyword} [--workers N] <file>
 
 Examples:
 
     {keyword} game-collection.tgz
+    {keyword} --workers 4 game-collection.tgz
 """
 
     def do_command(self, *args):
-        if not args and len(args) != 1:
+        args = list(args)
+        workers = 1
+        if len(args) >= 2 and args[0] == '--workers':
+            workers = convert_to_int(args[1])
+            if workers is None or workers < 1:
+                print(f'--workers needs a number of 1 or more.')
+                return
+            args = args[2:]
+
+        if len(args) != 1:
             print(f'Needs a file to import.')
             return
 
@@ -42,6 +54,14 @@ Examples:
            print(f'Target file must be a tgz.')
            return
 
+        try:
+            if self.state.db_access.get_pending_migrations():
+                print(f'Database needs to be migrated before importing, run the migrate command.')
+                return
+        except DBAccessException as e:
+            print(f'Error while checking database - [{e}]')
+            return
+
         print(f'\n\n*** Using database file {self.state.database_path}')
         print(f'*** About to import {import_path}')
         try:
@@ -58,23 +78,11 @@ Examples:
         start_time = datetime.now()
 
         try:
-           sgf_count, sgf_added, sgf_duplicate, sgf_parse_error, sgf_failed = self.state.db_access.add_games_from_tgz(import_path)
+           sgf_count, sgf_added, sgf_duplicate, sgf_parse_error, sgf_failed = self.state.db_access.add_games_from_tgz(import_path, workers)
         except DBAccessException as e:
            print(f'Error while adding games - [{e}]')
            return
 
-        try:
-           self.state.db_access.rebuild_final_positions()
-        except DBAccessException as e:
-           print(f'Error while rebuilding final positions - [{e}]')
-           return
-
-        try:
-           self.state.db_access.rebuild_board_hashes()
-        except DBAccessException as e:
-           print(f'Error while rebuilding hashes - [{e}]')
-           return
-
         print(f'\nDone!')
 
         stop_time = datetime.now()
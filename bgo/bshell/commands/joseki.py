@@ -0,0 +1,63 @@
+from bshell.commands import Command
+from database import DBAccessException, DBAccessLookupNotFound
+
+class Joseki(Command):
+
+    keywords = ['joseki']
+    help_text = """{keyword}
+{divider}
+Summary: Searches the database for the stones in one corner or side of the current
+         play board, played in any corner or side of any game whatever the rest
+         of the board looked like. Shows the next moves in that region.
+         The region defaults to the one of the last move, a corner before a side.
+
+         Regions: tl tr bl br top bottom left right
+
+Usage: {keyword} [<region>]
+
+Examples:
+
+    {keyword}
+    {keyword} tr
+"""
+
+    def do_command(self, *args):
+        db = self.state.db_access
+        move_list = self.state.search_board.get_moves()
+
+        if args:
+            region_name = args[0].lower()
+        else:
+            region_names = db.get_regions_for_move(move_list[-1]) if move_list else []
+            if not region_names:
+                print('No last move in a region, give a region, see help joseki.')
+                return
+            region_name = region_names[0]
+
+        try:
+            next_move_stats = db.get_region_next_move_stats(move_list, region_name)
+        except DBAccessException as e:
+            print(f'Error while accessing database! {self.state.database_path} - {e}')
+            return
+        except DBAccessLookupNotFound:
+            print(f'No results found in region {region_name}')
+            self.state.search_board.reset_marks()
+            return
+
+        self.state.search_board.reset_marks()
+        letter = 'abcdefghijklmnopqrstuvwxyz'
+        output = []
+
+        for i, (move, stats) in enumerate(list(next_move_stats.items())[:6]):
+            self.state.search_board.add_mark(move, letter[i])
+            output.append(f'{letter[i]}: {stats["count"]} ({stats["black_wins"]}B/{stats["white_wins"]}W)')
+
+        # Display the board
+        command = self.state.commands.get('board') or None
+        if not command:
+            print('Command not found: board')
+            return
+
+        command.do_command()
+
+        print(f'Region {region_name}: ' + ', '.join(output))
@@ -0,0 +1,45 @@
+from bshell.commands import Command
+from database import DBAccessException
+
+
+class Migrate(Command):
+
+    keywords = ['migrate']
+    help_text = """{keyword}
+{divider}
+Summary: Brings the current database up to date, such as rebuilding hashes
+         made with an older hash scheme.
+
+Usage: {keyword}
+"""
+
+    def do_command(self, *args):
+        try:
+            pending = self.state.db_access.get_pending_migrations()
+        except DBAccessException as e:
+            print(f'Error while checking database - [{e}]')
+            return
+
+        if not pending:
+            print(f'   Database {self.state.database_path} is up to date.')
+            return
+
+        print(f'\n\n*** Using database file {self.state.database_path}')
+        for item in pending:
+            print(f'*** Needs to {item}')
+        try:
+            user_input = self.state.session.prompt("   Are you sure? (YES) > ",
+                key_bindings=self.state.key_bindings)
+            if not user_input or user_input != 'YES':
+                print(f'\nAborted.')
+                return
+        except (EOFError, KeyboardInterrupt):
+            raise
+
+        try:
+            self.state.db_access.migrate_database()
+        except DBAccessException as e:
+            print(f'Error while migrating database - [{e}]')
+            return
+
+        print(f'\nDone!')
@@ -0,0 +1,100 @@
+import os
+import time
+
+from bshell.commands import Command
+from database import DBAccessException
+from utils.opening_tree import OpeningTreeException, build_opening_tree, load_opening_tree
+from utils.opening_tree import DEFAULT_MAX_DEPTH, DEFAULT_MIN_GAMES
+
+class Opening(Command):
+
+    keywords = ['opening']
+    help_text = """{keyword}
+{divider}
+Summary: Builds, saves and loads the opening tree, the next moves of the opening
+         positions in memory that search answers from.
+         build walks max depth moves deep, into next moves played in at least
+         min games games. Default 20 moves and 5 games.
+         Without arguments shows the tree that is loaded.
+
+Usage: {keyword} [build [<max depth> [<min games>]] | save <filename> | load <filename> | off]
+
+Examples:
+
+    {keyword}
+    {keyword} build
+    {keyword} build 15 10
+    {keyword} save opening_tree.bin
+    {keyword} load opening_tree.bin
+"""
+
+    def do_command(self, *args):
+        if not args:
+            self.show_tree()
+        elif args[0] == 'build':
+            self.build_tree(*args[1:])
+        elif args[0] in ('save', 'load') and len(args) == 2:
+            path = os.path.join(self.state.working_dir, args[1])
+            if args[0] == 'save':
+                self.save_tree(path)
+            else:
+                self.load_tree(path)
+        elif args[0] == 'off':
+            self.state.opening_tree = None
+            print('   Opening tree dropped, search uses the database.')
+        else:
+            print('Unknown opening command, see help opening.')
+
+    def show_tree(self):
+        opening_tree = self.state.opening_tree
+        if opening_tree is None:
+            print('   No opening tree loaded.')
+            return
+
+        stats = opening_tree.get_stats()
+        print(f'   {stats["nodes"]} positions, {stats["next_moves"]} next moves, {stats["bytes"]} bytes')
+        print(f'   Max depth {stats["max_depth"]}, min games {stats["min_games"]}')
+        try:
+            if not opening_tree.is_current(self.state.db_access.get_data_generation()):
+                print('   The database changed since the tree was built, search uses the database until it is '
+                      'built again.')
+        except DBAccessException as e:
+            print(f'Error while checking database - [{e}]')
+
+    def build_tree(self, *args):
+        try:
+            max_depth = int(args[0]) if len(args) > 0 else DEFAULT_MAX_DEPTH
+            min_games = int(args[1]) if len(args) > 1 else DEFAULT_MIN_GAMES
+        except ValueError:
+            print('Max depth and min games must be numbers.')
+            return
+
+        start = time.perf_counter()
+        try:
+            self.state.opening_tree = build_opening_tree(self.state.db_access, max_depth, min_games)
+        except DBAccessException as e:
+            print(f'Error while building opening tree - [{e}]')
+            return
+        print(f'   Built in {time.perf_counter() - start:.2f}s')
+        self.show_tree()
+
+    def save_tree(self, path):
+        if self.state.opening_tree is None:
+            print('   No opening tree loaded.')
+            return
+        try:
+            self.state.opening_tree.save(path)
+        except OpeningTreeException as e:
+            print(f'Error while saving opening tree - [{e}]')
+            return
+        print(f'   Saved {path}')
+
+    def load_tree(self, path):
+        start = time.perf_counter()
+        try:
+            self.state.opening_tree = load_opening_tree(path)
+        except OpeningTreeException as e:
+            print(f'Error while loading opening tree - [{e}]')
+            return
+        print(f'   Loaded {path} in {time.perf_counter() - start:.3f}s')
+        self.show_tree()
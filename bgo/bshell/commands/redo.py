@@ -0,0 +1,43 @@
+from bshell.commands import Command
+
+class Redo(Command):
+
+    keywords = ['redo']
+    help_text = """{keyword}
+{divider}
+Summary: Plays again the last moves taken back from the search board with undo or goto.
+         Playing a different move clears the moves to redo.
+
+Usage: {keyword} [<count>]
+
+Examples:
+
+    {keyword}
+    {keyword} 5
+"""
+
+    def do_command(self, *args):
+        search = self.state.search_board
+
+        count = 1
+        if len(args) > 0:
+            try:
+                count = int(args[0])
+            except ValueError:
+                print(f'Count must be a number, not "{args[0]}"')
+                return
+            if count < 1:
+                print(f'Count must be 1 or more, not "{args[0]}". Usage: redo [<count>]')
+                return
+
+        for _ in range(count):
+            if not search.redo_move():
+                print('No moves to redo.')
+                break
+
+        command = self.state.commands.get('board') or None
+        if not command:
+            print('Command not found: board')
+            return
+
+        command.do_command()
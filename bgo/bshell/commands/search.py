@@ -8,6 +8,7 @@ class Search(Command):
     help_text = """{keyword}
 {divider}
 Summary: Searches the database for the pattern on the current play board.
+         Opening positions are answered from the opening tree when one is loaded, see opening.
 
 Usage: {keyword}
 """
@@ -16,9 +17,14 @@ Usage: {keyword}
         # Get the next move data
         db = self.state.db_access
         move_list = self.state.search_board.get_moves()
+        opening_tree = self.state.opening_tree
 
         try:
-            next_move_counter = db.get_next_move_counter_for_moves(move_list)
+            next_move_counter = None
+            if opening_tree is not None and opening_tree.is_current(db.get_data_generation()):
+                next_move_counter = opening_tree.get_next_move_counter_for_position(self.state.search_board.position)
+            if next_move_counter is None:
+                next_move_counter = db.get_next_move_counter_for_moves(move_list)
         except DBAccessException as e:
             print(f'Error while accessing database! {self.state.database_path} - {e}')
             return
@@ -6,12 +6,31 @@ class Undo(Command):
     help_text = """{keyword}
 {divider}
 Summary: Undo the last move played to the search board.
+         The moves taken back can be played again with redo.
 
-Usage: {keyword}
+Usage: {keyword} [<count>]
+
+Examples:
+
+    {keyword}
+    {keyword} 5
 """
 
     def do_command(self, *args):
-        self.state.search_board.remove_last_move()
+        search = self.state.search_board
+
+        count = 1
+        if len(args) > 0:
+            try:
+                count = int(args[0])
+            except ValueError:
+                print(f'Count must be a number, not "{args[0]}"')
+                return
+            if count < 1:
+                print(f'Count must be 1 or more, not "{args[0]}". Usage: undo [<count>]')
+                return
+
+        search.go_to_move(max(search.get_move_number() - count, 0))
 
         command = self.state.commands.get('board') or None
         if not command:
@@ -13,5 +13,6 @@ class ShellState:
     commands = attrib(default={})
     db_access = attrib(default=None)
     search_board = attrib(default=go_board.GoBoard())
+    opening_tree = attrib(default=None)
     session = attrib(default=None)
     key_bindings = attrib(default=None)
@@ -16,17 +16,50 @@ class DBAccessGameRecordError(Exception):
 
 class DBAccess(object):
     DISPLAY_MESSAGE_COUNT = 100
-    from database._sql import first_check_of_database, get_database_path, connect_to_sql
+    HASH_LIST_DEPTH = 30
+    REGION_SIZE = 9
+    REGION_LIST_DEPTH = 60
+    from database._sql import first_check_of_database, get_database_path, connect_to_sql, close, checkpoint
+    from database._sql import finish_bulk_write, get_data_generation
+    from database._sql import get_metadata, set_metadata
     from database._adding import add_games_from_tgz, add_game_record, add_final_position_hash
-    from database._adding import add_list_of_board_hash
+    from database._adding import add_list_of_board_hash, add_list_of_game_records, add_list_of_final_position_hash
+    from database._adding import add_list_of_next_move_stats, add_list_of_region_move_stats
+    from database._adding import add_list_of_dyer_signatures, is_dyer_signature_in_database, add_game_search_rows
     from database._lookup import lookup_player_by_id, lookup_player_by_name, get_all_final_positions
     from database._lookup import get_all_game_id, get_moves_for_game_id, get_number_of_games_in_database
     from database._lookup import get_next_move_for_list_board_hash, merge_next_move_counter, get_next_move_counter_for_moves
+    from database._lookup import get_next_move_counter_for_canonical_hash, get_next_move_stats_for_moves
+    from database._lookup import group_symmetric_next_moves, merge_next_move_stats
+    from database._lookup import get_next_move_stats_for_prefixes, get_next_move_stats_for_move_lists
+    from database._lookup import get_first_move_stats
+    from database._lookup import get_next_move_stats_for_positions, get_next_move_stats_rows_for_canonical_hashes
     from database._maintenance import clear_final_positions, rebuild_final_positions
-    from database._maintenance import clear_board_hashes, rebuild_board_hashes
+    from database._maintenance import is_final_positions_keyed_by_hash, convert_final_positions_table
+    from database._maintenance import clear_board_hashes, rebuild_board_hashes, iterate_game_chunks
+    from database._maintenance import clear_next_move_stats, rebuild_next_move_stats, is_next_move_stats_missing
+    from database._maintenance import get_pending_migrations, migrate_database, pack_move_lists
+    from database._maintenance import get_hash_list_depth, set_hash_list_depth, is_hash_list_depth_changed
+    from database._maintenance import extend_shared_board_hashes
+    from database._maintenance import rebuild_region_move_stats, is_region_index_missing
+    from database._maintenance import rebuild_dyer_signatures, is_dyer_signatures_missing
+    from database._maintenance import rebuild_game_search_index, is_game_search_index_missing
+    from database._lookup import get_region_next_move_stats, get_regions_for_move, get_duplicate_game_clusters
+    from database._lookup import get_game_summaries
+    from database._report import report_hash_list_depths, measure_hash_list
+    from database._search import search_games, find_player_ids, find_event_ids, has_game_text_index
 
-    def __init__(self, database_path):
+    '''
+        read_only opens the database for lookups only, such as for the http api. It does not create tables and
+        every write fails. Its reads go through the WAL like those of any reader, so they see each commit of the
+        writers.
+    '''
+    def __init__(self, database_path, read_only=False):
+        from database._pool import ConnectionPool
         self.database_path = database_path
-        self.first_check_of_database()
+        self.read_only = read_only
+        self.connection_pool = ConnectionPool(database_path, read_only)
+        if not read_only:
+            self.first_check_of_database()
 
 
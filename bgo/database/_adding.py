@@ -1,17 +1,50 @@
 import sqlite3
+import collections
+import functools
+import itertools
+import multiprocessing
 import os
 import tarfile
 
 from utils.sgf_parser import SGFParser, SGFParserException
 from database import DBAccessException, DBAccessDuplicate, DBAccessGameRecordError, DBAccessLookupNotFound
-from game_of_go import game_of_go, coords
+from game_of_go import game_of_go, coords, batch_hash, regions
 
-from utils.final_position import FinalPosition
+from utils.dyer_signature import build_dyer_signature
 
 
 
-def add_games_from_tgz(self, path_to_tgz):
-    print(f'Importing games...')
+IMPORT_BATCH_SIZE = 500
+# SGF members per worker task, their final positions are hashed in one batch
+IMPORT_CHUNK_SIZE = 64
+# Chunks given to the pool per worker before the writer takes the results of the oldest one
+IMPORT_CHUNKS_PER_WORKER = 2
+
+# Positions of the values next_move_stats needs in a build_game_record_row() row
+GAME_ROW_DATE = 7
+GAME_ROW_WHO_WON = 11
+
+
+'''
+    Imports every SGF in a tgz in three stages:
+        reader  streams the SGF members out of the tgz in a single pass
+        workers parse each SGF, build its game_list row and the canonical hashes of its positions up to the
+                index depth of get_hash_list_depth() and the moves of its first REGION_LIST_DEPTH moves inside
+                the regions of game_of_go/regions.py and its dyer signature, and hash the final positions of
+                IMPORT_CHUNK_SIZE SGFs in all 8 rotations at a time, workers > 1 runs them in a process pool
+                with at most IMPORT_CHUNKS_PER_WORKER chunks per worker waiting, see iterate_processed_members()
+        writer  this process, checks duplicates in tgz order with a lookup of the dyer signature in
+                dyer_signatures and inserts the new games in batches, together with their final_board_hash,
+                hash_list and dyer_signatures rows, their counts in next_move_stats and region_move_stats and
+                their players, event and names for search_games(), see add_game_search_rows()
+    Results come back in tgz order, so counts and duplicates are the same for any number of workers.
+    Only the games in the tgz are replayed, the games already in the database are not touched, except those
+    that share their position at the depth when the index is adaptive, see extend_shared_board_hashes().
+    Returns: (sgf_count, sgf_added, sgf_duplicate, sgf_parse_error, sgf_failed)
+    Raises: DBAccessException
+'''
+def add_games_from_tgz(self, path_to_tgz, workers=1):
+    print(f'Importing games with {workers} worker(s)...')
 
     sgf_count = 0
     sgf_added = 0
@@ -19,70 +52,279 @@ def add_games_from_tgz(self, path_to_tgz):
     sgf_parse_error = 0
     sgf_failed = 0
 
-    final_pos = FinalPosition()
-    try:
-        final_pos.load_final_positions(self.get_all_final_positions())
-    except DBAccessException as e:
-        raise DBAccessException(f'error adding games from tgz, failed to load final positions - [{e}]')
+    # Duplicates are checked against dyer_signatures, a database from before it gets its signatures first
+    if self.is_dyer_signatures_missing():
+        self.rebuild_dyer_signatures()
+    # Games that transpose into the same final board as another game need final_board_hash keyed by game_id
+    if self.is_final_positions_keyed_by_hash():
+        self.convert_final_positions_table()
 
     db = self.connect_to_sql()
     cursor = db.cursor()
 
     try:
-        tar = tarfile.open(path_to_tgz, 'r:gz')
-    except OSError as e:
+        tgz_file = open(path_to_tgz, 'rb')
+        tgz_size = os.path.getsize(path_to_tgz)
+        tar = tarfile.open(fileobj=tgz_file, mode='r:gz')
+    except (OSError, tarfile.TarError) as e:
         raise DBAccessException(f'error importing tgz, cannot open - [{path_to_tgz}]')
 
     try:
-        files_in_tar = sum(1 for member in tar if member.isreg())
+        cursor.execute('SELECT IFNULL(MAX(game_id), 0) FROM game_list')
+        next_game_id = cursor.fetchone()[0] + 1
+        first_new_game_id = next_game_id
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error importing tgz, cannot read game ids - [{e}]')
+
+    depth, shared_games = self.get_hash_list_depth()
+
+    pool = None
+    try:
+        member_chunks = group_in_chunks(read_sgf_members_from_tar(tar), IMPORT_CHUNK_SIZE)
+        process_members = functools.partial(process_sgf_members, depth=depth, region_size=self.REGION_SIZE,
+                                            region_depth=self.REGION_LIST_DEPTH)
+        if workers > 1:
+            pool = multiprocessing.Pool(workers)
+        results = iterate_processed_members(pool, process_members, member_chunks, tgz_file,
+                                            workers * IMPORT_CHUNKS_PER_WORKER)
+
+        game_rows = []
+        final_position_rows = []
+        board_hash_rows = []
+        next_move_rows = []
+        region_move_rows = []
+        dyer_rows = []
+        # Signatures of the games not yet written, the ones written are found in dyer_signatures
+        batch_signatures = set()
+        # Signatures of the games that failed, they are never written so later copies are found here
+        failed_signatures = set()
         processed = 0
-        for tarinfo in tar:
+        for read_offset, (sgf_file_name, parsed, game_row, rotated_hashes, board_hashes, region_moves,
+                          signature) in results:
             processed += 1
             if processed % self.DISPLAY_MESSAGE_COUNT == 0:
-                print(f'...Processed {processed} / {files_in_tar} ({processed / files_in_tar * 100:.0f}%)')
-            _, extension = os.path.splitext(tarinfo.name)
-            if extension.lower() != '.sgf':
-                continue
-            reader = tar.extractfile(tarinfo)
-            sgf_data = reader.read().decode('utf-8')
-            sgf = SGFParser()
-            try:
-                sgf.import_from_sgf_file_text(sgf_data, tarinfo.name)
-            except SGFParserException as e:
-                # print(f'error parsing game from tar - [{tarinfo.name}] - [{e}]')
+                # The compressed bytes read up to this game give the progress without counting the members first
+                print(f'...Processed {processed} ({read_offset / tgz_size * 100:.0f}%)')
+
+            if not parsed:
+                # print(f'error parsing game from tar - [{sgf_file_name}] - [{game_row}]')
                 sgf_parse_error += 1
                 continue
 
             sgf_count += 1
 
-            if final_pos.is_game_unique(sgf) == False:
-                print(f'{tarinfo.name} duplicate, ignoring.')
-                sgf_duplicate += 1
+            # No signature when a move could not be decoded
+            if signature is None:
+                print(f'game record error while adding game - [{sgf_file_name}] - [{game_row}]')
+                sgf_failed += 1
                 continue
 
-            try:
-                self.add_game_record(cursor, sgf)
-                sgf_added += 1
-            except DBAccessException as e:
-                print(f'exception while adding game record - [{tarinfo.name}] - [{e}]')
-                sgf_failed += 1
+            # A copy of a game is a duplicate whether the first copy was added or failed
+            if (signature in batch_signatures or signature in failed_signatures
+                    or self.is_dyer_signature_in_database(cursor, signature)):
+                print(f'{sgf_file_name} duplicate, ignoring.')
+                sgf_duplicate += 1
                 continue
-            except DBAccessGameRecordError as e:
-                print(f'game record error while adding game - [{tarinfo.name}] - [{e}]')
+
+            if rotated_hashes is None or isinstance(game_row, str):
+                print(f'game record error while adding game - [{sgf_file_name}] - [{game_row}]')
+                failed_signatures.add(signature)
                 sgf_failed += 1
                 continue
 
+            batch_signatures.add(signature)
+            game_rows.append((next_game_id,) + game_row)
+            final_position_rows.append((next_game_id, rotated_hashes[0]))
+            dyer_rows.append((next_game_id,) + signature)
+            black_win = int(game_row[GAME_ROW_WHO_WON] == 1)
+            white_win = int(game_row[GAME_ROW_WHO_WON] == -1)
+            for move_number, board_hash, next_move in board_hashes:
+                board_hash_rows.append((board_hash, next_game_id, move_number, next_move))
+                next_move_rows.append((board_hash, next_move, black_win, white_win, game_row[GAME_ROW_DATE]))
+            for region_kind, region_hash, color, next_move in region_moves:
+                region_move_rows.append((region_kind, region_hash, color, next_move, 1, black_win, white_win))
+            next_game_id += 1
+            if len(game_rows) >= IMPORT_BATCH_SIZE:
+                self.add_list_of_game_records(cursor, game_rows)
+                self.add_game_search_rows(cursor, game_rows[0][0], game_rows[-1][0])
+                self.add_list_of_final_position_hash(cursor, final_position_rows)
+                self.add_list_of_board_hash(cursor, board_hash_rows)
+                self.add_list_of_next_move_stats(cursor, next_move_rows)
+                self.add_list_of_region_move_stats(cursor, region_move_rows)
+                self.add_list_of_dyer_signatures(cursor, dyer_rows)
+                sgf_added += len(game_rows)
+                game_rows = []
+                final_position_rows = []
+                board_hash_rows = []
+                next_move_rows = []
+                region_move_rows = []
+                dyer_rows = []
+                batch_signatures = set()
+
+        self.add_list_of_game_records(cursor, game_rows)
+        if game_rows:
+            self.add_game_search_rows(cursor, game_rows[0][0], game_rows[-1][0])
+        self.add_list_of_final_position_hash(cursor, final_position_rows)
+        self.add_list_of_board_hash(cursor, board_hash_rows)
+        self.add_list_of_next_move_stats(cursor, next_move_rows)
+        self.add_list_of_region_move_stats(cursor, region_move_rows)
+        self.add_list_of_dyer_signatures(cursor, dyer_rows)
+        sgf_added += len(game_rows)
+
     except EOFError as e:
+        db.rollback()
         raise DBAccessException(f'error importing tgz, EOFError while processing - [{path_to_tgz}] - [{e}]')
+    except DBAccessException:
+        # The connection stays open in the pool, do not leave the partial import for its next commit
+        db.rollback()
+        raise
+    finally:
+        if pool is not None:
+            pool.terminate()
+        tar.close()
+        tgz_file.close()
 
     try:
         db.commit()
-    except DBAccessException as e:
+    except sqlite3.Error as e:
+        db.rollback()
         raise DBAccessException(f'error importing tgz, failed on final commit [{path_to_tgz}] - [{e}]')
 
+    # The new games can share positions past the depth with each other and with the games before them
+    if shared_games > 0 and sgf_added > 0:
+        self.extend_shared_board_hashes(refresh_next_move_stats=True, first_game_id=first_new_game_id)
+
+    self.finish_bulk_write()
+
     return (sgf_count, sgf_added, sgf_duplicate, sgf_parse_error, sgf_failed)
 
-def add_game_record(self, db_cursor, sgf_object):
+
+'''
+    Reader stage of add_games_from_tgz, yields (sgf_file_name, sgf_text) for every SGF member of the tar
+'''
+def read_sgf_members_from_tar(tar):
+    for tarinfo in tar:
+        _, extension = os.path.splitext(tarinfo.name)
+        if extension.lower() != '.sgf':
+            continue
+        reader = tar.extractfile(tarinfo)
+        if reader is None:
+            continue
+        yield tarinfo.name, reader.read().decode('utf-8')
+
+
+'''
+    Yields lists of up to size items of iterable
+'''
+def group_in_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+'''
+    Runs the worker stage on member_chunks and yields (read_offset, result) for every member in tgz order,
+    read_offset is the position in tgz_file after its chunk was read. Without a pool the chunks are processed here.
+    At most max_pending chunks are in the pool at once, so the reader only gets that far ahead of the writer and
+    the SGF text waiting in the pool stays bounded however large the tgz is.
+'''
+def iterate_processed_members(pool, process_members, member_chunks, tgz_file, max_pending):
+    pending = collections.deque()
+    for chunk in member_chunks:
+        read_offset = tgz_file.tell()
+        if pool is None:
+            for result in process_members(chunk):
+                yield read_offset, result
+            continue
+        pending.append((read_offset, pool.apply_async(process_members, (chunk,))))
+        if len(pending) >= max_pending:
+            read_offset, async_result = pending.popleft()
+            for result in async_result.get():
+                yield read_offset, result
+
+    while pending:
+        read_offset, async_result = pending.popleft()
+        for result in async_result.get():
+            yield read_offset, result
+
+
+'''
+    Worker stage of add_games_from_tgz, runs in a pool process so it only takes and returns plain data.
+    Returns a list of (sgf_file_name, parsed, game_row, rotated_hashes, board_hashes, region_moves, signature), one
+    for each member
+        parsed is False if the SGF could not be parsed, game_row is then the error
+        game_row is the game_list row from build_game_record_row(), or an error string if it could not be built
+        rotated_hashes are the final position hashes of the 8 rotations, None if a move could not be decoded
+        board_hashes are the (move_number, canonical_hash, canonical_next_move) of the first depth positions
+        region_moves are the (region_kind, region_hash, color, canonical_next_move) rows of region_move_stats of
+        the first region_depth moves
+        signature is the (signature_a, signature_b) of utils/dyer_signature.py
+'''
+def process_sgf_members(members, depth, region_size, region_depth):
+    results = [process_sgf_member(member, depth, region_size, region_depth) for member in members]
+    rotated_hashes_list = iter(batch_hash.build_final_rotation_hashes(
+        packed_moves for _, _, _, packed_moves, _, _, _ in results if packed_moves is not None))
+    return [result if result[3] is None else result[:3] + (next(rotated_hashes_list),) + result[4:]
+            for result in results]
+
+
+'''
+    Same as a result of process_sgf_members() for one member, with the packed moves in place of the rotated hashes
+'''
+def process_sgf_member(member, depth, region_size, region_depth):
+    sgf_file_name, sgf_data = member
+
+    sgf = SGFParser()
+    try:
+        sgf.import_from_sgf_file_text(sgf_data, sgf_file_name)
+    except SGFParserException as e:
+        return sgf_file_name, False, str(e), None, None, None, None
+
+    try:
+        packed_moves = coords.pack_move_pair_list(sgf.move_pair_list)
+    except ValueError as e:
+        return sgf_file_name, True, str(e), None, None, None, None
+
+    board_hashes = []
+    try:
+        for row in game_of_go.build_canonical_hash_rows_from_move_list(sgf.move_pair_list, depth):
+            board_hashes.append(row)
+    except game_of_go.IllegalMove:
+        # Keep the positions before the move, as rebuild_board_hashes() does
+        pass
+
+    flat_moves = coords.unpack_flat_moves(packed_moves)
+    region_moves = list(generate_region_move_rows(flat_moves, region_size, region_depth))
+
+    try:
+        game_row = build_game_record_row(sgf)
+    except DBAccessGameRecordError as e:
+        game_row = str(e)
+
+    return sgf_file_name, True, game_row, packed_moves, board_hashes, region_moves, build_dyer_signature(flat_moves)
+
+
+'''
+    Yields the (region_kind, region_hash, color, next_move) of the region_move_stats rows of a game, color is 1 for
+    black and -1 for white. A game with an illegal move keeps the rows of the moves before it.
+'''
+def generate_region_move_rows(flat_moves, region_size, region_depth):
+    try:
+        for region_kind, region_hash, color, fc in regions.build_region_move_rows_from_flat_moves(
+                flat_moves, region_depth, regions.get_region_set(region_size)):
+            yield region_kind, region_hash, 1 if color == game_of_go.BLACK else -1, coords.FLAT_TO_MOVE_PAIR[fc]
+    except game_of_go.IllegalMove:
+        pass
+
+
+'''
+    Returns the values of a game_list row for an SGFParser, in the order of GAME_RECORD_COLUMNS
+    Raises: DBAccessException, DBAccessGameRecordError
+'''
+def build_game_record_row(sgf_object):
     if not isinstance(sgf_object, SGFParser):
         raise DBAccessException(f'error adding new game - Passed non-GameRecord')
 
@@ -103,29 +345,63 @@ def add_game_record(self, db_cursor, sgf_object):
     except SGFParserException as e:
         who_won = 0
 
+    return (
+        sgf_object.sgf_file_name, white_player_name, white_player_rank, black_player_name, black_player_rank,
+        sgf_object.tag_dict['EV'].strip(),
+        sgf_object.tag_dict['RO'].strip(),
+        sgf_object.get_extracted_date(),
+        sgf_object.tag_dict['PC'].strip(),
+        sgf_object.tag_dict['KM'].strip(),
+        sgf_object.tag_dict['RE'].strip(),
+        who_won,
+        pack_move_list(sgf_object)
+    )
+
+'''
+    Returns the moves of an SGFParser packed for the move_list column
+    Raises: DBAccessGameRecordError
+'''
+def pack_move_list(sgf_object):
+    try:
+        return coords.pack_move_pair_list(sgf_object.move_pair_list)
+    except ValueError as e:
+        raise DBAccessGameRecordError(f'error adding new game - cannot pack moves - [{sgf_object.sgf_file_name}] [{e}]')
+
+
+GAME_RECORD_COLUMNS = ('sgf_file_name, white_player_name, white_player_rank, black_player_name, black_player_rank, '
+                       'event, round, game_date, place, komi, result, result_who_won, move_list')
+
+
+def add_game_record(self, db_cursor, sgf_object):
+    game_row = build_game_record_row(sgf_object)
+
     # Insert the record into the database
     try:
-        query_string = (
-            'INSERT INTO `game_list` (sgf_file_name, white_player_name, white_player_rank, black_player_name, black_player_rank,'
-            'event, round, game_date, place, komi, result, result_who_won, move_list) VALUES '
-            '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
-        db_cursor.execute(query_string, (
-            sgf_object.sgf_file_name, white_player_name, white_player_rank, black_player_name, black_player_rank,
-            sgf_object.tag_dict['EV'].strip(),
-            sgf_object.tag_dict['RO'].strip(),
-            sgf_object.get_extracted_date(),
-            sgf_object.tag_dict['PC'].strip(),
-            sgf_object.tag_dict['KM'].strip(),
-            sgf_object.tag_dict['RE'].strip(),
-            who_won,
-            coords.convert_move_pair_list_to_string(sgf_object.move_pair_list)
-            ))
+        query_string = (f'INSERT INTO `game_list` ({GAME_RECORD_COLUMNS}) VALUES '
+                        '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+        db_cursor.execute(query_string, game_row)
         db_cursor.execute('SELECT last_insert_rowid()')
         game_id = db_cursor.fetchone()[0]
     except sqlite3.Error as e:
         raise DBAccessException(f'error adding new game - SQLite error adding game [{e}]')
     return game_id
 
+'''
+    list_game_rows = [ (game_id, <values of build_game_record_row()>), ... ]
+    Inserts with the cursor and does not commit, the caller owns the transaction.
+'''
+def add_list_of_game_records(self, db_cursor, list_game_rows):
+    if not list_game_rows:
+        return
+
+    query_string = (f'INSERT INTO `game_list` (game_id, {GAME_RECORD_COLUMNS}) VALUES '
+                    '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+
+    try:
+        db_cursor.executemany(query_string, list_game_rows)
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error adding bulk game records - [{e}]')
+
 def add_final_position_hash(self, game_id, board_hash):
     db = self.connect_to_sql()
     cursor = db.cursor()
@@ -138,17 +414,137 @@ def add_final_position_hash(self, game_id, board_hash):
     except sqlite3.Error as e:
         raise DBAccessException('db_access::add_final_position_board_hash() - SQLite error adding hash [%s]' % (e,))
 
+'''
+    list_final_position_data = [ (game_id, board_hash), ... ]
+    Inserts with the cursor and does not commit, the caller owns the transaction.
+'''
+def add_list_of_final_position_hash(self, db_cursor, list_final_position_data):
+    if not list_final_position_data:
+        return
+
+    query_string = 'INSERT INTO final_board_hash (game_id, board_hash) VALUES (?,?)'
+
+    try:
+        db_cursor.executemany(query_string, list_final_position_data)
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error adding bulk final position hashes - [{e}]')
+
 '''
     list_board_hash_data = [ (board_hash, game_id, move_number, next_move), ... ]
+    Inserts with the cursor and does not commit, the caller owns the transaction.
 '''
-def add_list_of_board_hash(self, list_board_hash_data):
-    db = self.connect_to_sql()
-    cursor = db.cursor()
+def add_list_of_board_hash(self, db_cursor, list_board_hash_data):
+    if not list_board_hash_data:
+        return
 
     query_string = 'INSERT INTO hash_list (board_hash, game_id, move_number, next_move) VALUES (?,?,?,?)'
 
     try:
-        db.executemany(query_string, list_board_hash_data)
-        db.commit()
+        db_cursor.executemany(query_string, list_board_hash_data)
     except sqlite3.Error as e:
         raise DBAccessException(f'error adding bulk board hashes - [{e}]')
+
+'''
+    Adds the games of game_list from first_game_id to last_game_id to the tables of search_games(), their new player
+    and event names to player_list and event_list, their rows to game_player and game_event and their names to
+    game_text. Inserts with the cursor and does not commit.
+    Raises: DBAccessException
+'''
+def add_game_search_rows(self, db_cursor, first_game_id, last_game_id):
+    game_range = (first_game_id, last_game_id)
+    try:
+        db_cursor.execute('INSERT OR IGNORE INTO player_list (player_name) '
+                          'SELECT black_player_name FROM game_list WHERE game_id BETWEEN ? AND ? '
+                          'AND black_player_name != \'\' UNION '
+                          'SELECT white_player_name FROM game_list WHERE game_id BETWEEN ? AND ? '
+                          'AND white_player_name != \'\'', game_range + game_range)
+        db_cursor.execute('INSERT OR IGNORE INTO event_list (event_name) '
+                          'SELECT DISTINCT event FROM game_list WHERE game_id BETWEEN ? AND ? '
+                          'AND IFNULL(event, \'\') != \'\'', game_range)
+        for color, name_column in ((1, 'black_player_name'), (-1, 'white_player_name')):
+            db_cursor.execute('INSERT OR IGNORE INTO game_player (player_id, game_date, game_id, color) '
+                              'SELECT player_list.player_id, game_list.game_date, game_list.game_id, ? '
+                              'FROM game_list JOIN player_list '
+                              f'ON player_list.player_name = game_list.{name_column} '
+                              'WHERE game_list.game_id BETWEEN ? AND ?', (color,) + game_range)
+        db_cursor.execute('INSERT OR IGNORE INTO game_event (event_id, game_date, game_id) '
+                          'SELECT event_list.event_id, game_list.game_date, game_list.game_id '
+                          'FROM game_list JOIN event_list ON event_list.event_name = game_list.event '
+                          'WHERE game_list.game_id BETWEEN ? AND ?', game_range)
+        if self.has_game_text_index():
+            db_cursor.execute('INSERT INTO game_text (rowid, black_player_name, white_player_name, event, place) '
+                              'SELECT game_id, black_player_name, white_player_name, event, place '
+                              'FROM game_list WHERE game_id BETWEEN ? AND ?', game_range)
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error adding game search rows - [{e}]')
+
+'''
+    list_dyer_data = [ (game_id, signature_a, signature_b), ... ]
+    Inserts with the cursor and does not commit.
+'''
+def add_list_of_dyer_signatures(self, db_cursor, list_dyer_data):
+    if not list_dyer_data:
+        return
+
+    query_string = 'INSERT INTO dyer_signatures (game_id, signature_a, signature_b) VALUES (?, ?, ?)'
+
+    try:
+        db_cursor.executemany(query_string, list_dyer_data)
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error adding bulk dyer signatures - [{e}]')
+
+'''
+    Returns True if a game with signature = (signature_a, signature_b) is in dyer_signatures, read with db_cursor so
+    the rows it inserted and did not commit yet are seen
+    Raises: DBAccessException
+'''
+def is_dyer_signature_in_database(self, db_cursor, signature):
+    try:
+        db_cursor.execute('SELECT EXISTS (SELECT 1 FROM dyer_signatures WHERE signature_a = ? AND signature_b = ?)',
+                          signature)
+        return db_cursor.fetchone()[0] == 1
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking dyer signature - [{e}]')
+
+'''
+    list_region_move_data = [ (region_kind, region_hash, color, next_move, play_count, black_wins, white_wins), ... ]
+    Adds the counts to region_move_stats, inserts with the cursor and does not commit.
+'''
+def add_list_of_region_move_stats(self, db_cursor, list_region_move_data):
+    if not list_region_move_data:
+        return
+
+    query_string = ('INSERT INTO region_move_stats (region_kind, region_hash, color, next_move, play_count, '
+                    'black_wins, white_wins) VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (region_kind, region_hash, color, next_move) DO UPDATE SET '
+                    'play_count = play_count + excluded.play_count, '
+                    'black_wins = black_wins + excluded.black_wins, '
+                    'white_wins = white_wins + excluded.white_wins')
+
+    try:
+        db_cursor.executemany(query_string, list_region_move_data)
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error adding bulk region move stats - [{e}]')
+
+'''
+    list_next_move_data = [ (board_hash, next_move, black_win, white_win, game_date), ... ], one row per game
+    Adds each game to the counts of next_move_stats, the same counts rebuild_next_move_stats() builds from hash_list.
+    Inserts with the cursor and does not commit, the caller owns the transaction.
+'''
+def add_list_of_next_move_stats(self, db_cursor, list_next_move_data):
+    if not list_next_move_data:
+        return
+
+    # MAX() of a NULL date is NULL, the COALESCE keeps the other date as the aggregate MAX() does
+    query_string = ('INSERT INTO next_move_stats (board_hash, next_move, play_count, black_wins, white_wins, last_date) '
+                    'VALUES (?, ?, 1, ?, ?, ?) '
+                    'ON CONFLICT (board_hash, next_move) DO UPDATE SET '
+                    'play_count = play_count + 1, '
+                    'black_wins = black_wins + excluded.black_wins, '
+                    'white_wins = white_wins + excluded.white_wins, '
+                    'last_date = COALESCE(MAX(last_date, excluded.last_date), last_date, excluded.last_date)')
+
+    try:
+        db_cursor.executemany(query_string, list_next_move_data)
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error adding bulk next move stats - [{e}]')
@@ -4,6 +4,10 @@ from collections import Counter
 from database import DBAccessException, DBAccessDuplicate, DBAccessGameRecordError, DBAccessLookupNotFound
 import game_of_go.game_of_go as game_of_go
 import game_of_go.coords as coords
+import game_of_go.regions as regions
+
+# Hashes per IN query, older sqlite builds allow at most 999 parameters in a statement
+BATCH_QUERY_SIZE = 900
 
 '''
     Returns the number of games in the database
@@ -37,10 +41,10 @@ def lookup_player_by_id(self, player_id):
     db = self.connect_to_sql()
     cursor = db.cursor()
 
-    query_string = f'SELECT player_name FROM player_list WHERE player_id = {player_id}'
+    query_string = 'SELECT player_name FROM player_list WHERE player_id = ?'
 
     try:
-        cursor.execute(query_string)
+        cursor.execute(query_string, (player_id,))
         result = cursor.fetchone()
     except sqlite3.Error as e:
         raise DBAccessException(f'error looking up player - [{player_id}] - [{e}]')
@@ -61,9 +65,9 @@ def lookup_player_by_name(self, player_name):
     db = self.connect_to_sql()
     cursor = db.cursor()
 
-    query_string = 'SELECT player_id FROM player_list WHERE player_name = \"%s\"' % (player_name,)
+    query_string = 'SELECT player_id FROM player_list WHERE player_name = ?'
     try:
-        cursor.execute(query_string)
+        cursor.execute(query_string, (player_name,))
         result = cursor.fetchone()
     except sqlite3.Error as e:
         raise DBAccessException(f'error looking up player by name - [{e}]')
@@ -74,7 +78,8 @@ def lookup_player_by_name(self, player_name):
     return result[0]
 
 '''
-    Returns all final positions in the format d[hash] = game_id
+    Returns all final positions in the format d[hash] = game_id, a final board shared by several games has the
+    game_id of one of them
     Raises: DBAccessException
 '''
 def get_all_final_positions(self):
@@ -113,16 +118,16 @@ def get_moves_for_game_id(self, game_id):
     db = self.connect_to_sql()
     cursor = db.cursor()
 
-    query_string = f'SELECT move_list FROM game_list WHERE game_id = {game_id}'
+    query_string = 'SELECT move_list FROM game_list WHERE game_id = ?'
     try:
-        cursor.execute(query_string)
+        cursor.execute(query_string, (game_id,))
         result = cursor.fetchone()
         if result == None:
             return DBAccessLookupNotFound(f'game not found while looking up moves for game {game_id}')
     except sqlite3.Error as e:
         raise DBAccessException(f'error looking up moves for game - [{e}]')
 
-    return coords.convert_move_string_to_pair_list(result[0])
+    return coords.convert_stored_move_list_to_pair_list(result[0])
 
 
 '''
@@ -141,77 +146,334 @@ def get_moves_for_game_id(self, game_id):
 
 '''
 
-def merge_next_move_counter(self, move_list, next_move_counter):
-    list_most_popular = [
-        (next_move, count, game_of_go.build_hash_from_move_list(move_list + [next_move]))
-        for next_move, count in
-        next_move_counter.most_common()
-    ]
-
+def merge_next_move_counter(self, move_list, next_move_counter, position=None):
     merged_counter = Counter()
 
-    while len(list_most_popular) > 0:
-        next_move, count, _ = list_most_popular.pop(0)
-        merged_counter[next_move] = count
-        rotated_hash_list = game_of_go.build_all_rotation_hashes_from_move_list(move_list + [next_move])
-        for sub_next_move, sub_count, sub_hash in list(list_most_popular):
-            if sub_hash in rotated_hash_list:
-                merged_counter[next_move] += sub_count
-                list_most_popular.remove((sub_next_move, sub_count, sub_hash))
+    groups = self.group_symmetric_next_moves(move_list, [next_move for next_move, _ in next_move_counter.most_common()],
+                                             position)
+    for next_move, group in groups.items():
+        merged_counter[next_move] = sum(next_move_counter[sub_next_move] for sub_next_move in group)
 
     return merged_counter
 
+
+'''
+    Groups next moves that lead to rotations of the same position.
+    next_moves is in order of popularity, the first move of each group represents it.
+    The position of move_list is played once (or passed in as position), then each next move is played on it and
+    bucketed by its canonical hash, so the cost is one move per next move.
+
+    Returns { representative_move: [representative_move, other_move, ...], ... } in the order of next_moves
+    Raises: game_of_go.IllegalMove if move_list is illegal
+'''
+def group_symmetric_next_moves(self, move_list, next_moves, position=None):
+    if position is None:
+        position = game_of_go.build_position_from_move_pair_list(move_list)
+
+    color = game_of_go.BLACK if len(move_list) % 2 == 0 else game_of_go.WHITE
+    representative_for_hash = {}
+    groups = {}
+
+    for next_move in next_moves:
+        try:
+            canonical_hash = position.play_move(next_move, color).get_canonical_hash()
+        except game_of_go.IllegalMove:
+            # Can not be compared with the other moves, keep it on its own
+            groups[next_move] = [next_move]
+            continue
+        representative = representative_for_hash.setdefault(canonical_hash, next_move)
+        groups.setdefault(representative, []).append(next_move)
+
+    return groups
+
+'''
+    Returns Counter(next_move: count) of the position after move_list, the empty board answers the first moves of
+    the games, see get_first_move_stats()
+    Raises: DBAccessException, DBAccessLookupNotFound
+'''
 def get_next_move_counter_for_moves(self, move_list, do_merge=True):
-    to_identity_rotation = [0, 3, 2, 1, 4, 5, 6, 7]
+    if len(move_list) == 0:
+        return Counter({first_move: stats['count'] for first_move, stats in self.get_first_move_stats().items()})
 
     try:
-        search_hashes = game_of_go.build_all_rotation_hashes_from_move_list(move_list)
+        position = game_of_go.build_position_from_move_pair_list(move_list)
     except game_of_go.IllegalMove:
         raise DBAccessException(f'error while getting next move counter, illegal move in [{move_list}]')
 
-    search_hashes_str = [str(hash) for hash in search_hashes]
-    query_string = f"SELECT board_hash, next_move FROM hash_list WHERE board_hash in ({', '.join(search_hashes_str)})"
+    canonical_hash, rotation = position.get_canonical_rotation()
+    counter_next = self.get_next_move_counter_for_canonical_hash(canonical_hash, rotation)
+
+    if do_merge:
+        counter_next = self.merge_next_move_counter(move_list, counter_next, position)
+
+    # Return the counter as a normal dictionary
+    return counter_next
 
+
+'''
+    next_move_stats is keyed by canonical hash with the next moves rotated into the canonical rotation.
+    Reads the play counts of the next moves of canonical_hash and rotates each move back by the inverse of rotation,
+    the rotation that took the position being searched to its canonical hash.
+    Raises: DBAccessException, DBAccessLookupNotFound
+'''
+def get_next_move_counter_for_canonical_hash(self, canonical_hash, rotation):
     db = self.connect_to_sql()
     cursor = db.cursor()
 
+    query_string = 'SELECT next_move, play_count FROM next_move_stats WHERE board_hash = ?'
+
     try:
-        cursor.execute(query_string)
+        cursor.execute(query_string, (canonical_hash,))
     except sqlite3.Error as e:
         raise DBAccessException(f'error building next_move_list for board_hash - [{e}]')
 
+    to_identity_rotation = coords.INVERSE_ROTATION[rotation]
     counter_next = Counter()
 
-    for row in cursor:
-        board_hash = row[0]
+    for next_move, count in cursor:
+        # Rotate the move from the canonical rotation back to the rotation that was searched
+        counter_next[coords.transform_move_pair(next_move, to_identity_rotation)] += count
 
-        next_move = row[1]
-        # Find the index of board_hash in list_board_hash, which will also tell us which rotation was used for this hash
-        try:
-            rotation = search_hashes.index(board_hash)
-        except ValueError:
-            raise DBAccessException(f'error building next_move_list could not find hash index')
+    if len(counter_next) == 0:
+        raise DBAccessLookupNotFound(f'no next move data found')
 
-        # Now rotate the move to the identity rotation
-        identity_move = coords.transform_move_pair(next_move, to_identity_rotation[rotation])
-        counter_next[identity_move] += 1
+    return counter_next
 
-    if len(counter_next) == 0:
+
+'''
+    move_list = ['pd', 'dp']
+
+    Returns the full next move statistics of the position, rotated to match move_list,
+    moves that lead to rotations of the same position are merged like merge_next_move_counter when do_merge is True.
+    The empty board answers the first moves of the games, see get_first_move_stats().
+    {
+        'dd': {'count': 500, 'black_wins': 260, 'white_wins': 230, 'last_date': '2012-06-11'},
+        ...
+    }
+    Raises: DBAccessException, DBAccessLookupNotFound
+'''
+def get_next_move_stats_for_moves(self, move_list, do_merge=True):
+    if len(move_list) == 0:
+        return self.get_first_move_stats()
+
+    try:
+        position = game_of_go.build_position_from_move_pair_list(move_list)
+    except game_of_go.IllegalMove:
+        raise DBAccessException(f'error while getting next move stats, illegal move in [{move_list}]')
+
+    canonical_hash, rotation = position.get_canonical_rotation()
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    query_string = ('SELECT next_move, play_count, black_wins, white_wins, last_date FROM next_move_stats '
+                    'WHERE board_hash = ?')
+
+    try:
+        cursor.execute(query_string, (canonical_hash,))
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error getting next move stats for board_hash - [{e}]')
+
+    to_identity_rotation = coords.INVERSE_ROTATION[rotation]
+    next_move_stats = {}
+
+    for next_move, count, black_wins, white_wins, last_date in cursor:
+        next_move_stats[coords.transform_move_pair(next_move, to_identity_rotation)] = {
+            'count': count,
+            'black_wins': black_wins,
+            'white_wins': white_wins,
+            'last_date': last_date,
+        }
+
+    if len(next_move_stats) == 0:
         raise DBAccessLookupNotFound(f'no next move data found')
 
     if do_merge:
-        counter_next = self.merge_next_move_counter(move_list, counter_next)
+        next_move_stats = self.merge_next_move_stats(move_list, next_move_stats, position)
 
-    # Return the counter as a normal dictionary
-    return counter_next
+    return next_move_stats
 
 
+'''
+    move_list = ['pd', 'dp', 'pp']
 
+    Returns the next move statistics of every prefix of move_list, from the empty board to the whole list,
+    as [ (prefix, next_move_stats), ... ] with next_move_stats as get_next_move_stats_for_moves or None if there
+    is no data for the prefix.
+    The moves are played once for all prefixes and their statistics are read with batched queries.
+    Raises: DBAccessException
 '''
-    list_board_hash = [board_hash, ...]
-    Return = {
-    
-    }
+def get_next_move_stats_for_prefixes(self, move_list, do_merge=True):
+    positions = [game_of_go.Position.initial_state()]
+    color = game_of_go.BLACK
+    try:
+        for move in move_list:
+            positions.append(positions[-1].play_move(move, color))
+            color = game_of_go.swap_colors(color)
+    except game_of_go.IllegalMove:
+        raise DBAccessException(f'error while getting next move stats, illegal move {len(positions)} in [{move_list}]')
+
+    prefixes = [move_list[:move_number] for move_number in range(len(positions))]
+    return list(zip(prefixes, self.get_next_move_stats_for_positions(prefixes, positions, do_merge)))
+
+'''
+    move_lists = [ ['pd', 'dp'], ['dd'], ... ]
+
+    Returns [ (move_list, next_move_stats), ... ] like get_next_move_stats_for_prefixes, for unrelated move lists
+    Raises: DBAccessException
+'''
+def get_next_move_stats_for_move_lists(self, move_lists, do_merge=True):
+    positions = []
+    for move_list in move_lists:
+        try:
+            positions.append(game_of_go.build_position_from_move_pair_list(move_list))
+        except game_of_go.IllegalMove:
+            raise DBAccessException(f'error while getting next move stats, illegal move in [{move_list}]')
+
+    return list(zip(move_lists, self.get_next_move_stats_for_positions(move_lists, positions, do_merge)))
+
+'''
+    Returns the next_move_stats of each position, or None if there is no data, in the order of positions.
+    move_lists are the moves of the positions, they are needed to merge the next moves.
+    Raises: DBAccessException
+'''
+def get_next_move_stats_for_positions(self, move_lists, positions, do_merge=True):
+    canonical_rotations = [position.get_canonical_rotation() for position in positions]
+    canonical_hashes = {canonical_hash for canonical_hash, _ in canonical_rotations}
+    has_empty_board = any(len(move_list) == 0 for move_list in move_lists)
+    if has_empty_board:
+        canonical_hashes.update(get_first_move_for_hash())
+    rows_for_hash = self.get_next_move_stats_rows_for_canonical_hashes(canonical_hashes)
+    first_move_stats = build_first_move_stats(rows_for_hash) if has_empty_board else None
+
+    list_next_move_stats = []
+    for move_list, position, (canonical_hash, rotation) in zip(move_lists, positions, canonical_rotations):
+        if len(move_list) == 0:
+            list_next_move_stats.append(first_move_stats)
+            continue
+
+        rows = rows_for_hash.get(canonical_hash)
+        if rows is None:
+            list_next_move_stats.append(None)
+            continue
+
+        to_identity_rotation = coords.INVERSE_ROTATION[rotation]
+        next_move_stats = {}
+        for next_move, count, black_wins, white_wins, last_date in rows:
+            next_move_stats[coords.transform_move_pair(next_move, to_identity_rotation)] = {
+                'count': count,
+                'black_wins': black_wins,
+                'white_wins': white_wins,
+                'last_date': last_date,
+            }
+
+        if do_merge:
+            next_move_stats = self.merge_next_move_stats(move_list, next_move_stats, position)
+        list_next_move_stats.append(next_move_stats)
+
+    return list_next_move_stats
+
+# canonical hash of the position after a first move: the first move of its symmetric first moves in flat order
+FIRST_MOVE_FOR_HASH = {}
+
+'''
+    Returns FIRST_MOVE_FOR_HASH, filled on the first call
+'''
+def get_first_move_for_hash():
+    if not FIRST_MOVE_FOR_HASH:
+        empty_board = game_of_go.Position.initial_state()
+        # Row by row, the order of the flat codes
+        for row in 'abcdefghijklmnopqrs':
+            for column in 'abcdefghijklmnopqrs':
+                first_move = column + row
+                canonical_hash, _ = empty_board.play_move(first_move, game_of_go.BLACK).get_canonical_rotation()
+                FIRST_MOVE_FOR_HASH.setdefault(canonical_hash, first_move)
+    return FIRST_MOVE_FOR_HASH
+
+'''
+    Returns the next_move_stats of the empty board, see build_first_move_stats()
+    Raises: DBAccessException, DBAccessLookupNotFound
+'''
+def get_first_move_stats(self):
+    first_move_stats = build_first_move_stats(self.get_next_move_stats_rows_for_canonical_hashes(
+        get_first_move_for_hash()))
+    if first_move_stats is None:
+        raise DBAccessLookupNotFound(f'no next move data found')
+    return first_move_stats
+
+'''
+    hash_list has no rows for the empty board, its next moves are the first moves of the games. They are counted
+    from the next_move_stats of the positions after each first move, which only a first move reaches, so a game
+    that ends after its first move is not counted. Symmetric first moves share their position and are always merged
+    into one move.
+    Returns next_move_stats like get_next_move_stats_for_moves, or None if there is no data
+'''
+def build_first_move_stats(rows_for_hash):
+    first_move_stats = {}
+    for canonical_hash, first_move in get_first_move_for_hash().items():
+        rows = rows_for_hash.get(canonical_hash)
+        if rows is None:
+            continue
+        first_move_stats[first_move] = {
+            'count': sum(count for _, count, _, _, _ in rows),
+            'black_wins': sum(black_wins for _, _, black_wins, _, _ in rows),
+            'white_wins': sum(white_wins for _, _, _, white_wins, _ in rows),
+            'last_date': max(last_date for _, _, _, _, last_date in rows),
+        }
+    if not first_move_stats:
+        return None
+    return dict(sorted(first_move_stats.items(), key=lambda item: item[1]['count'], reverse=True))
+
+'''
+    Reads the next_move_stats rows of many canonical hashes, BATCH_QUERY_SIZE hashes per query.
+    Returns { canonical_hash: [ (next_move, play_count, black_wins, white_wins, last_date), ... ], ... }
+    with the moves in the canonical rotation, hashes without rows are left out.
+    Raises: DBAccessException
+'''
+def get_next_move_stats_rows_for_canonical_hashes(self, canonical_hashes):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    canonical_hashes = list(canonical_hashes)
+    rows_for_hash = {}
+
+    for start in range(0, len(canonical_hashes), BATCH_QUERY_SIZE):
+        batch = canonical_hashes[start:start + BATCH_QUERY_SIZE]
+        query_string = ('SELECT board_hash, next_move, play_count, black_wins, white_wins, last_date '
+                        f'FROM next_move_stats WHERE board_hash IN ({", ".join("?" * len(batch))})')
+        try:
+            cursor.execute(query_string, batch)
+            for board_hash, *row in cursor:
+                rows_for_hash.setdefault(board_hash, []).append(tuple(row))
+        except sqlite3.Error as e:
+            raise DBAccessException(f'error getting next move stats for a batch of board hashes - [{e}]')
+
+    return rows_for_hash
+
+
+'''
+    Same as merge_next_move_counter for the dictionaries of get_next_move_stats_for_moves,
+    counts and wins are added up and the most recent date is kept.
+'''
+def merge_next_move_stats(self, move_list, next_move_stats, position=None):
+    most_popular = sorted(next_move_stats, key=lambda next_move: next_move_stats[next_move]['count'], reverse=True)
+
+    merged_stats = {}
+    for next_move, group in self.group_symmetric_next_moves(move_list, most_popular, position).items():
+        merged_stats[next_move] = {
+            'count': sum(next_move_stats[sub_next_move]['count'] for sub_next_move in group),
+            'black_wins': sum(next_move_stats[sub_next_move]['black_wins'] for sub_next_move in group),
+            'white_wins': sum(next_move_stats[sub_next_move]['white_wins'] for sub_next_move in group),
+            'last_date': max(next_move_stats[sub_next_move]['last_date'] for sub_next_move in group),
+        }
+
+    return merged_stats
+
+
+
+'''
+    list_board_hash = [board_hash, ...], the hashes of the 8 rotations of a position
+    Return = Counter(next_move: count)
 '''
 def get_next_move_for_list_board_hash(self, list_board_hash):
     if not isinstance(list_board_hash, list):
@@ -220,36 +482,132 @@ def get_next_move_for_list_board_hash(self, list_board_hash):
     if len(list_to_str) != 8:
         raise DBAccessException('list_board_hash must be len == 8 and only integers')
 
-    to_identity_rotation = [0, 3, 2, 1, 4, 5, 6, 7]
+    canonical_hash = min(list_board_hash)
+    return self.get_next_move_counter_for_canonical_hash(canonical_hash, list_board_hash.index(canonical_hash))
+
+
+'''
+    move_list = ['pd', 'dp', 'qf'], region_name = 'tr'
+
+    Returns the statistics of the next moves played inside region_name in the position after move_list, by the color
+    to move, counted from every game that had the same stones in the same kind of region, in any corner or side
+    and whatever the rest of the board looked like, most played first.
+    {
+        'qc': {'count': 120, 'black_wins': 60, 'white_wins': 55},
+        ...
+    }
+    A pattern that looks the same mirrored has each move and its mirror merged into the more played one when
+    do_merge is True.
+    Raises: DBAccessException, DBAccessLookupNotFound
+'''
+def get_region_next_move_stats(self, move_list, region_name, do_merge=True):
+    region_set = regions.get_region_set(self.REGION_SIZE)
+    index = region_set.index_for_name.get(region_name)
+    if index is None:
+        raise DBAccessException(f'unknown region [{region_name}], one of [{" ".join(region_set.index_for_name)}]')
+
+    try:
+        board = game_of_go.build_replayboard_from_move_pair_list(move_list)
+    except game_of_go.IllegalMove:
+        raise DBAccessException(f'error while getting region next move stats, illegal move in [{move_list}]')
+
+    region = region_set.regions[index]
+    region_hash, rotation, symmetric = region_set.get_canonical_rotation(
+        index, region_set.get_symmetric_hash_for_board(index, board.board))
+    color = 1 if len(move_list) % 2 == 0 else -1
 
     db = self.connect_to_sql()
     cursor = db.cursor()
 
-    query_string = f"SELECT board_hash, next_move FROM hash_list WHERE board_hash in ({', '.join(list_to_str)})"
+    query_string = ('SELECT next_move, play_count, black_wins, white_wins FROM region_move_stats '
+                    'WHERE region_kind = ? AND region_hash = ? AND color = ?')
+
+    try:
+        cursor.execute(query_string, (region.kind, region_hash, color))
+        rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error getting region next move stats - [{e}]')
+
+    if len(rows) == 0:
+        raise DBAccessLookupNotFound(f'no region next move data found')
+
+    # Counted in the canonical frame of the region, where a symmetric pattern has each move and its mirror
+    canonical_stats = {}
+    for next_move, count, black_wins, white_wins in rows:
+        canonical_stats[next_move] = {'count': count, 'black_wins': black_wins, 'white_wins': white_wins}
+
+    if do_merge and symmetric:
+        mirror_rotation = region_set.mirror[region.kind]
+        for next_move, stats in sorted(canonical_stats.items(), key=lambda item: item[1]['count']):
+            mirror_move = coords.transform_move_pair(next_move, mirror_rotation)
+            mirror_stats = canonical_stats.get(mirror_move)
+            if mirror_move == next_move or mirror_stats is None:
+                continue
+            # The less played of the two is added to the other, the sort makes that the current move
+            for key in mirror_stats:
+                mirror_stats[key] += stats[key]
+            del canonical_stats[next_move]
+
+    to_board_rotation = coords.INVERSE_ROTATION[rotation]
+    return {coords.transform_move_pair(next_move, to_board_rotation): stats
+            for next_move, stats in sorted(canonical_stats.items(), key=lambda item: -item[1]['count'])}
+
+
+'''
+    Returns the names of the regions that move is in, corners first, none for a pass
+'''
+def get_regions_for_move(self, move):
+    region_set = regions.get_region_set(self.REGION_SIZE)
+    fc = coords.convert_move_pair_to_flat(move)
+    if fc == coords.PASS_FLAT:
+        return []
+    return [region_set.regions[index].name for index in region_set.regions_for_point[fc]]
+
+
+'''
+    Returns the clusters of games that share a dyer signature, the same game recorded more than once, as a list of
+    lists of game_id, each sorted, the clusters in the order of their first game
+    Raises: DBAccessException
+'''
+def get_duplicate_game_clusters(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    # The primary key is ordered by signature, the clusters are read from it without a sort
+    query_string = ('SELECT GROUP_CONCAT(game_id) FROM dyer_signatures GROUP BY signature_a, signature_b '
+                    'HAVING COUNT(*) > 1')
 
     try:
         cursor.execute(query_string)
+        result = cursor.fetchall()
     except sqlite3.Error as e:
-        raise DBAccessException(f'error building next_move_list for board_hash - [{e}]')
+        raise DBAccessException(f'error getting duplicate games - [{e}]')
 
-    counter_next = Counter()
+    return sorted(sorted(int(game_id) for game_id in game_ids.split(',')) for game_ids, in result)
 
-    for row in cursor:
-        board_hash = row[0]
-        next_move = row[1]
 
-        # Find the index of board_hash in list_board_hash, which will also tell us which rotation was used for this hash
-        try:
-            rotation = list_board_hash.index(board_hash)
-        except ValueError:
-            raise DBAccessException(f'error building next_move_list could not find hash index')
+GAME_SUMMARY_COLUMNS = ('game_id', 'sgf_file_name', 'game_date', 'black_player_name', 'black_player_rank',
+                        'white_player_name', 'white_player_rank', 'event', 'result')
 
-        # Now rotate the move to the identity rotation
-        identity_move = coords.transform_move_pair(next_move, to_identity_rotation[rotation])
-        counter_next[identity_move] += 1
+'''
+    Returns the game_list columns of GAME_SUMMARY_COLUMNS of each game in game_ids as a dictionary, in the order of
+    game_ids, games not in the database are left out
+    Raises: DBAccessException
+'''
+def get_game_summaries(self, game_ids):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
 
-    if len(counter_next) == 0:
-        raise DBAccessLookupNotFound(f'no next move data found')
+    summaries = {}
+    for start in range(0, len(game_ids), BATCH_QUERY_SIZE):
+        batch = game_ids[start:start + BATCH_QUERY_SIZE]
+        query_string = (f'SELECT {", ".join(GAME_SUMMARY_COLUMNS)} FROM game_list '
+                        f'WHERE game_id IN ({", ".join("?" * len(batch))})')
+        try:
+            cursor.execute(query_string, batch)
+        except sqlite3.Error as e:
+            raise DBAccessException(f'error getting game summaries - [{e}]')
+        for row in cursor:
+            summaries[row[0]] = dict(zip(GAME_SUMMARY_COLUMNS, row))
 
-    # Return the counter as a normal dictionary
-    return counter_next
+    return [summaries[game_id] for game_id in game_ids if game_id in summaries]
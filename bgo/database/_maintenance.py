@@ -1,8 +1,27 @@
+from collections import Counter
+import itertools
 import sqlite3
 from database import DBAccessException, DBAccessDuplicate, DBAccessGameRecordError, DBAccessLookupNotFound
-from game_of_go import game_of_go, coords
+from database._sql import CREATE_HASH_INDEX_1, CREATE_HASH_INDEX_2, MOVE_FORMAT, REGION_INDEX_KEY
+from database._sql import GAME_SEARCH_INDEX_KEY, CREATE_FINAL_BOARD_HASH_LIST, CREATE_FINAL_BOARD_HASH_INDEX
+from database._adding import generate_region_move_rows
+from utils.dyer_signature import build_dyer_signature
+from game_of_go import game_of_go, coords, batch_hash
 
 
+REBUILD_CHUNK_SIZE = 1000
+
+# Set while rebuild_board_hashes() runs, to the game_id of the last game committed to hash_list
+REBUILD_BOARD_HASHES_KEY = 'rebuild_board_hashes_game_id'
+# 'depth,shared_games,hash scheme' of the rebuild REBUILD_BOARD_HASHES_KEY belongs to
+REBUILD_BOARD_HASHES_SETTINGS_KEY = 'rebuild_board_hashes_settings'
+
+# Index depth settings of the database, see get_hash_list_depth()
+HASH_LIST_DEPTH_KEY = 'hash_list_depth'
+HASH_LIST_SHARED_GAMES_KEY = 'hash_list_shared_games'
+# 'depth,shared_games' that hash_list was last built with, databases from before the settings used the default
+HASH_LIST_BUILT_KEY = 'hash_list_built'
+
 
 
 def clear_final_positions(self):
@@ -25,60 +44,759 @@ def clear_board_hashes(self):
     except sqlite3.Error as e:
         raise DBAccessException(f'error clearing board hashes - [{e}]')
 
-def rebuild_final_positions(self):
+def clear_next_move_stats(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('DELETE FROM next_move_stats')
+        db.commit()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error clearing next move stats - [{e}]')
+
+'''
+    Rebuilds final_board_hash from game_list in a single transaction. The move lists are streamed with one cursor,
+    each chunk_size games are hashed in one batch_hash call and written with executemany.
+    progress(done, total) is called after every chunk, by default it prints the count.
+    Raises: DBAccessException
+'''
+def rebuild_final_positions(self, chunk_size=REBUILD_CHUNK_SIZE, progress=None):
     print('Rebuilding final positions...')
 
-    self.clear_final_positions()
-    game_ids = self.get_all_game_id()
+    if progress is None:
+        progress = print_rebuild_progress
+
+    db = self.connect_to_sql()
+    read_cursor = db.cursor()
+    write_cursor = db.cursor()
+
+    try:
+        read_cursor.execute('SELECT COUNT(*) FROM game_list')
+        total = read_cursor.fetchone()[0]
+        # Created again rather than emptied, so a table from before it was keyed by game_id is replaced too
+        write_cursor.execute('DROP TABLE IF EXISTS final_board_hash')
+        write_cursor.execute(CREATE_FINAL_BOARD_HASH_LIST)
+        write_cursor.execute(CREATE_FINAL_BOARD_HASH_INDEX)
+        read_cursor.execute('SELECT game_id, move_list FROM game_list ORDER BY game_id')
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding final positions, cannot read games - [{e}]')
 
-    count = 0
-    for game_id in game_ids:
-        count += 1
-        if count % self.DISPLAY_MESSAGE_COUNT == 0:
-            print(f'   ...{count} / {len(game_ids)}')
-        moves = self.get_moves_for_game_id(game_id)
-        position = game_of_go.build_positionsimple_from_move_pair_list(moves)
-        hash = game_of_go.get_hash_for_board(position.get_board())
-        self.add_final_position_hash(game_id, hash)
+    done = 0
+    try:
+        while True:
+            games = read_cursor.fetchmany(chunk_size)
+            if not games:
+                break
+            final_position_rows = []
+            rotated_hashes_list = batch_hash.build_final_rotation_hashes(move_list for _, move_list in games)
+            for (game_id, stored_move_list), rotated_hashes in zip(games, rotated_hashes_list):
+                if rotated_hashes is None:
+                    print(f'   Game {game_id} has an invalid move - '
+                          f'[{coords.convert_stored_move_list_to_pair_list(stored_move_list)}]')
+                    continue
+                final_position_rows.append((game_id, rotated_hashes[0]))
+            self.add_list_of_final_position_hash(write_cursor, final_position_rows)
+            done += len(games)
+            progress(done, total)
+        db.commit()
+    except (sqlite3.Error, DBAccessException) as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding final positions - [{e}]')
 
+    self.finish_bulk_write()
     print('...Done')
 
+'''
+    Returns True if final_board_hash is keyed by board_hash, such as a database from before it was keyed by game_id.
+    Games that transpose into the same final board can not both be added to it.
+    Raises: DBAccessException
+'''
+def is_final_positions_keyed_by_hash(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('PRAGMA table_info(final_board_hash)')
+        columns = cursor.fetchall()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking final positions table - [{e}]')
+
+    # (cid, name, type, notnull, dflt_value, pk)
+    return any(column[1] == 'board_hash' and column[5] for column in columns)
+
+'''
+    Copies final_board_hash into a table keyed by game_id with an index on board_hash, in a single transaction.
+    The hashes are kept, only the table changes.
+    Raises: DBAccessException
+'''
+def convert_final_positions_table(self):
+    print('Converting final positions table...')
 
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('ALTER TABLE final_board_hash RENAME TO final_board_hash_old')
+        cursor.execute(CREATE_FINAL_BOARD_HASH_LIST)
+        cursor.execute('INSERT INTO final_board_hash (game_id, board_hash) '
+                       'SELECT game_id, board_hash FROM final_board_hash_old')
+        cursor.execute('DROP TABLE final_board_hash_old')
+        cursor.execute(CREATE_FINAL_BOARD_HASH_INDEX)
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error converting final positions table - [{e}]')
 
-def rebuild_board_hashes(self):
+    print('...Done')
+
+def print_rebuild_progress(done, total):
+    print(f'   ...{done} / {total}')
+
+'''
+    Rebuilds hash_list from game_list with bounded memory. Games are read chunk_size at a time in game_id order,
+    their hash rows are written with executemany and each chunk is committed with the last game_id it holds in
+    the REBUILD_BOARD_HASHES_KEY metadata key.
+    The hash_list indexes are dropped for the bulk load and created again at the end.
+    If a rebuild was interrupted, resume=True continues after the last committed game instead of starting over,
+    as long as it was built with the same index depth settings and hash scheme, the rows are never mixed.
+    progress(done, total) is called after every chunk, by default it prints the count.
+    Raises: DBAccessException
+'''
+def rebuild_board_hashes(self, chunk_size=REBUILD_CHUNK_SIZE, progress=None, resume=True):
     print('Rebuilding board hashes...')
 
-    self.clear_board_hashes()
-    game_ids = self.get_all_game_id()
+    if progress is None:
+        progress = print_rebuild_progress
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    depth, shared_games = self.get_hash_list_depth()
+    settings = f'{depth},{shared_games},{game_of_go.HASH_SCHEME}'
+    last_game_id = self.get_metadata(REBUILD_BOARD_HASHES_KEY)
+    if resume and last_game_id is not None and self.get_metadata(REBUILD_BOARD_HASHES_SETTINGS_KEY) != settings:
+        print('   The interrupted rebuild used other index settings, starting over')
+        resume = False
+    try:
+        if resume and last_game_id is not None:
+            last_game_id = int(last_game_id)
+            print(f'   Resuming after game {last_game_id}')
+            cursor.execute('DELETE FROM hash_list WHERE game_id > ?', (last_game_id,))
+        else:
+            last_game_id = 0
+            cursor.execute('DELETE FROM hash_list')
+            cursor.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+                           (REBUILD_BOARD_HASHES_KEY, str(last_game_id)))
+            cursor.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+                           (REBUILD_BOARD_HASHES_SETTINGS_KEY, settings))
+        cursor.execute('DROP INDEX IF EXISTS idx_hash_list')
+        cursor.execute('DROP INDEX IF EXISTS idx_hash_list_move_number')
+        cursor.execute('SELECT COUNT(*), IFNULL(SUM(game_id <= ?), 0) FROM game_list', (last_game_id,))
+        total, done = cursor.fetchone()
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding board hashes, cannot start - [{e}]')
+
+    for games in self.iterate_game_chunks(last_game_id, chunk_size):
+        hash_rows = generate_board_hash_rows(games, depth)
+        try:
+            cursor.executemany('INSERT INTO hash_list (board_hash, game_id, move_number, next_move) VALUES (?,?,?,?)',
+                               hash_rows)
+            cursor.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+                           (REBUILD_BOARD_HASHES_KEY, str(games[-1][0])))
+            db.commit()
+        except sqlite3.Error as e:
+            db.rollback()
+            raise DBAccessException(f'error rebuilding board hashes for games {games[0][0]} to {games[-1][0]} - [{e}]')
+        done += len(games)
+        progress(done, total)
+
+    print('Creating indexes...')
+    try:
+        cursor.execute(CREATE_HASH_INDEX_1)
+        cursor.execute(CREATE_HASH_INDEX_2)
+        cursor.execute('DELETE FROM metadata WHERE key IN (?, ?)',
+                       (REBUILD_BOARD_HASHES_KEY, REBUILD_BOARD_HASHES_SETTINGS_KEY))
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding board hashes, cannot create indexes - [{e}]')
 
-    count = 0
+    if shared_games > 0:
+        self.extend_shared_board_hashes()
+    self.rebuild_next_move_stats()
+    self.set_metadata(HASH_LIST_BUILT_KEY, f'{depth},{shared_games}')
+    print('...Done')
 
-    hash_list = []
-    for game_id in game_ids:
-        count += 1
-        if count % self.DISPLAY_MESSAGE_COUNT == 0:
-            print(f'   ...{count} / {len(game_ids)}')
-        # Get the moves and start a position
-        moves = self.get_moves_for_game_id(game_id)
-        position = game_of_go.Position.initial_state()
-        color = game_of_go.BLACK
+'''
+    Yields the games after after_game_id as lists of up to chunk_size (game_id, stored_move_list), in game_id order.
+    stored_move_list is the move_list column as it is, see coords.convert_stored_move_list_to_flat_moves().
+    Each chunk is its own query, so the caller can commit between chunks.
+    Raises: DBAccessException
+'''
+def iterate_game_chunks(self, after_game_id, chunk_size):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    query_string = 'SELECT game_id, move_list FROM game_list WHERE game_id > ? ORDER BY game_id LIMIT ?'
+    while True:
+        try:
+            cursor.execute(query_string, (after_game_id, chunk_size))
+            games = cursor.fetchall()
+        except sqlite3.Error as e:
+            raise DBAccessException(f'error reading games after game {after_game_id} - [{e}]')
+        if not games:
+            return
+        yield games
+        after_game_id = games[-1][0]
+
+'''
+    Yields the (board_hash, game_id, move_number, next_move) rows of hash_list for a list of
+    (game_id, stored_move_list). A game with an illegal move keeps the rows of the moves before it.
+'''
+def generate_board_hash_rows(games, depth):
+    for game_id, stored_move_list in games:
         move_number = 0
-        # Loop through each move, build the position, save the hash
         try:
-            for move in moves[:30]:
-                move_number += 1
-                position = position.play_move(move, color)
-                color = game_of_go.swap_colors(color)
-                hash = game_of_go.get_hash_for_board(position.get_board())
+            flat_moves = coords.convert_stored_move_list_to_flat_moves(stored_move_list)
+            for move_number, hash, next_move in game_of_go.build_canonical_hash_rows_from_flat_moves(flat_moves, depth):
+                yield hash, game_id, move_number, next_move
+        except (game_of_go.IllegalMove, ValueError):
+            print(f'   Game {game_id} has an invalid move at {move_number + 1} - '
+                  f'[{coords.convert_stored_move_list_to_pair_list(stored_move_list)}]')
+
+
+'''
+    Returns (depth, shared_games), the index depth settings of the database.
+    hash_list holds the first depth positions of every game. With shared_games > 0 a game is also indexed past
+    depth for as long as its position is shared with at least shared_games other games that had the same position
+    at the depth, so the common mid game lines are found without storing the positions of each game that nobody
+    else reached.
+    Raises: DBAccessException
+'''
+def get_hash_list_depth(self):
+    return (int(self.get_metadata(HASH_LIST_DEPTH_KEY, self.HASH_LIST_DEPTH)),
+            int(self.get_metadata(HASH_LIST_SHARED_GAMES_KEY, 0)))
+
+'''
+    Changes the index depth settings, hash_list keeps its rows until rebuild_board_hashes() or migrate_database()
+    Raises: DBAccessException
+'''
+def set_hash_list_depth(self, depth, shared_games=0):
+    if not isinstance(depth, int) or depth < 1:
+        raise DBAccessException(f'index depth must be a positive integer - [{depth}]')
+    if not isinstance(shared_games, int) or shared_games < 0:
+        raise DBAccessException(f'shared games must be zero or a positive integer - [{shared_games}]')
+
+    self.set_metadata(HASH_LIST_DEPTH_KEY, depth)
+    self.set_metadata(HASH_LIST_SHARED_GAMES_KEY, shared_games)
+
+'''
+    Returns True if hash_list has rows built with other index depth settings than the current ones
+    Raises: DBAccessException
+'''
+def is_hash_list_depth_changed(self):
+    depth, shared_games = self.get_hash_list_depth()
+    built = self.get_metadata(HASH_LIST_BUILT_KEY, f'{self.HASH_LIST_DEPTH},0')
+    if built == f'{depth},{shared_games}':
+        return False
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM hash_list)')
+        result = cursor.fetchone()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking board hashes - [{e}]')
+
+    return result[0] == 1
+
+def describe_hash_list_depth(depth, shared_games):
+    if shared_games == 0:
+        return f'depth {depth}'
+    return f'depth {depth}, past it while shared with {shared_games} other games'
+
+'''
+    Replaces the hash_list rows past the index depth with those of the adaptive index, see get_hash_list_depth().
+    Only the positions at the depth of the games from first_game_id on are extended, or every position when
+    first_game_id is None, so an import replays the games that share a position at the depth with one of its games
+    and not the rest of the database. Each position at the depth is extended on its own, the games are streamed
+    from game_list one position at a time and their rows written with executemany.
+    refresh_next_move_stats counts the changed positions into next_move_stats again, for an import that has
+    already written next_move_stats. rebuild_board_hashes() rebuilds next_move_stats afterwards instead.
+    Raises: DBAccessException
+'''
+def extend_shared_board_hashes(self, refresh_next_move_stats=False, first_game_id=None):
+    depth, shared_games = self.get_hash_list_depth()
+    print(f'Indexing shared positions past move {depth}...')
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+    read_cursor = db.cursor()
+
+    try:
+        # The games at the positions to extend, the rows past the depth of all of them are written again
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS extend_game '
+                       '(game_id INTEGER PRIMARY KEY, board_hash INTEGER NOT NULL)')
+        cursor.execute('DELETE FROM extend_game')
+        cursor.execute('INSERT INTO extend_game SELECT game_id, board_hash FROM hash_list '
+                       'WHERE move_number = ? AND board_hash IN (SELECT board_hash FROM hash_list '
+                       'WHERE move_number = ? AND game_id >= ?)', (depth, depth, first_game_id or 0))
+
+        if refresh_next_move_stats:
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS changed_board_hash (board_hash INTEGER PRIMARY KEY)')
+            cursor.execute('DELETE FROM changed_board_hash')
+            cursor.execute(CHANGED_BOARD_HASHES_INSERT, (depth,))
+        cursor.execute('DELETE FROM hash_list WHERE move_number > ? AND game_id IN (SELECT game_id FROM extend_game)',
+                       (depth,))
+
+        read_cursor.execute('SELECT e.board_hash, g.game_id, g.move_list FROM extend_game AS e '
+                            'JOIN game_list AS g ON g.game_id = e.game_id '
+                            'WHERE e.board_hash IN (SELECT board_hash FROM extend_game GROUP BY board_hash '
+                            'HAVING COUNT(*) > ?) ORDER BY e.board_hash, e.game_id', (shared_games,))
+        cursor.executemany('INSERT INTO hash_list (board_hash, game_id, move_number, next_move) VALUES (?,?,?,?)',
+                           generate_frontier_board_hash_rows(read_cursor, depth, shared_games))
+        row_count = cursor.rowcount
+
+        if refresh_next_move_stats:
+            # The positions of the rows just written, read back from hash_list instead of kept in memory
+            cursor.execute(CHANGED_BOARD_HASHES_INSERT, (depth,))
+            cursor.execute('DELETE FROM next_move_stats WHERE board_hash IN '
+                           '(SELECT board_hash FROM changed_board_hash)')
+            cursor.execute(NEXT_MOVE_STATS_SELECT + ' WHERE hash_list.board_hash IN '
+                           '(SELECT board_hash FROM changed_board_hash) ' + NEXT_MOVE_STATS_GROUP_BY)
+            cursor.execute('DELETE FROM changed_board_hash')
+        cursor.execute('DELETE FROM extend_game')
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error indexing shared positions past move {depth} - [{e}]')
+
+    print(f'   {max(row_count, 0)} positions past move {depth}')
+
+# Adds the positions past the depth of the games of extend_game to changed_board_hash
+CHANGED_BOARD_HASHES_INSERT = ('INSERT OR IGNORE INTO changed_board_hash SELECT board_hash FROM hash_list '
+                               'WHERE move_number > ? AND game_id IN (SELECT game_id FROM extend_game)')
+
+'''
+    Yields the (board_hash, game_id, move_number, next_move) rows past depth of the adaptive index for
+    (board_hash, game_id, stored_move_list) rows ordered by board_hash, the position of the game at depth.
+    The games of one position at the depth are replayed together and only they are held in memory.
+'''
+def generate_frontier_board_hash_rows(frontier_games, depth, shared_games):
+    for _, games in itertools.groupby(frontier_games, key=lambda game: game[0]):
+        frontier = [entry for entry in (build_frontier_entry(game_id, stored_move_list, depth)
+                                        for _, game_id, stored_move_list in games) if entry is not None]
+        yield from generate_shared_board_hash_rows(frontier, depth, shared_games)
+
+'''
+    Returns (game_id, row, rows) for a game of the frontier of extend_shared_board_hashes(), row is the
+    (move_number, board_hash, next_move) of its position at depth and rows yields those of the moves after it.
+    Returns None if the game is shorter than depth or has an invalid move before it.
+'''
+def build_frontier_entry(game_id, stored_move_list, depth):
+    try:
+        flat_moves = coords.convert_stored_move_list_to_flat_moves(stored_move_list)
+        rows = game_of_go.build_canonical_hash_rows_from_flat_moves(flat_moves, len(flat_moves))
+        row = next(itertools.islice(rows, depth - 1, depth), None)
+    except (game_of_go.IllegalMove, ValueError):
+        return None
+    if row is None:
+        return None
+    return game_id, row, rows
+
+'''
+    Yields the (board_hash, game_id, move_number, next_move) rows past depth of the adaptive index.
+    frontier has an entry from build_frontier_entry() for every game at one position at depth, all games are moved
+    forward one move at a time and a position is kept, and its game moved on, while more than shared_games of the
+    games that are still going have it. A game that transposes into a shared line after leaving it is not picked up
+    again, nor are the games that came from another position at the depth.
+'''
+def generate_shared_board_hash_rows(frontier, depth, shared_games):
+    entries = frontier
+    while entries:
+        games_for_hash = Counter(row[1] for _, row, _ in entries)
+        next_entries = []
+        for game_id, (move_number, board_hash, next_move), rows in entries:
+            if games_for_hash[board_hash] <= shared_games:
+                continue
+            if move_number > depth:
+                yield board_hash, game_id, move_number, next_move
+            try:
+                row = next(rows, None)
+            except (game_of_go.IllegalMove, ValueError):
+                continue
+            if row is not None:
+                next_entries.append((game_id, row, rows))
+        entries = next_entries
+
+
+# Counts the rows of hash_list into next_move_stats, a WHERE on hash_list can go between the two
+NEXT_MOVE_STATS_SELECT = ('INSERT INTO next_move_stats (board_hash, next_move, play_count, black_wins, white_wins, '
+                          'last_date) '
+                          'SELECT hash_list.board_hash, hash_list.next_move, COUNT(*), '
+                          'SUM(game_list.result_who_won = 1), SUM(game_list.result_who_won = -1), '
+                          'MAX(game_list.game_date) '
+                          'FROM hash_list JOIN game_list ON hash_list.game_id = game_list.game_id')
+NEXT_MOVE_STATS_GROUP_BY = 'GROUP BY hash_list.board_hash, hash_list.next_move'
+
+'''
+    Counts every next move of every position in hash_list into next_move_stats, with the wins of each color
+    from game_list.result_who_won and the date of the most recent game.
+    Raises: DBAccessException
+'''
+def rebuild_next_move_stats(self):
+    print('Rebuilding next move stats...')
+
+    self.clear_next_move_stats()
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(NEXT_MOVE_STATS_SELECT + ' ' + NEXT_MOVE_STATS_GROUP_BY)
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding next move stats - [{e}]')
+
+    self.finish_bulk_write()
+
+
+'''
+    Rebuilds dyer_signatures from game_list in a single transaction. The signatures are read from the stored move
+    lists, no game is replayed.
+    progress(done, total) is called after every chunk, by default it prints the count.
+    Raises: DBAccessException
+'''
+def rebuild_dyer_signatures(self, chunk_size=REBUILD_CHUNK_SIZE, progress=None):
+    print('Rebuilding dyer signatures...')
+
+    if progress is None:
+        progress = print_rebuild_progress
+
+    db = self.connect_to_sql()
+    read_cursor = db.cursor()
+    write_cursor = db.cursor()
+
+    try:
+        read_cursor.execute('SELECT COUNT(*) FROM game_list')
+        total = read_cursor.fetchone()[0]
+        write_cursor.execute('DELETE FROM dyer_signatures')
+        read_cursor.execute('SELECT game_id, move_list FROM game_list ORDER BY game_id')
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding dyer signatures, cannot read games - [{e}]')
+
+    done = 0
+    try:
+        while True:
+            games = read_cursor.fetchmany(chunk_size)
+            if not games:
+                break
+            dyer_rows = []
+            for game_id, stored_move_list in games:
+                try:
+                    flat_moves = coords.convert_stored_move_list_to_flat_moves(stored_move_list)
+                except ValueError:
+                    print(f'   Game {game_id} has an invalid move - '
+                          f'[{coords.convert_stored_move_list_to_pair_list(stored_move_list)}]')
+                    continue
+                dyer_rows.append((game_id,) + build_dyer_signature(flat_moves))
+            self.add_list_of_dyer_signatures(write_cursor, dyer_rows)
+            done += len(games)
+            progress(done, total)
+        db.commit()
+    except (sqlite3.Error, DBAccessException) as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding dyer signatures - [{e}]')
+
+    print('...Done')
+
+'''
+    Returns True if game_list has games but dyer_signatures was never built, such as a database from before it was
+    written
+    Raises: DBAccessException
+'''
+def is_dyer_signatures_missing(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM game_list) AND NOT EXISTS (SELECT 1 FROM dyer_signatures)')
+        result = cursor.fetchone()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking dyer signatures - [{e}]')
+
+    return result[0] == 1
+
+'''
+    Rebuilds game_player, game_event and game_text from game_list in a single transaction and fills player_list and
+    event_list with the names of its games
+    Raises: DBAccessException
+'''
+def rebuild_game_search_index(self):
+    print('Rebuilding game search index...')
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT IFNULL(MIN(game_id), 0), IFNULL(MAX(game_id), 0) FROM game_list')
+        first_game_id, last_game_id = cursor.fetchone()
+        cursor.execute('DELETE FROM game_player')
+        cursor.execute('DELETE FROM game_event')
+        if self.has_game_text_index():
+            # game_text reads its text from game_list, it is emptied with its delete-all command
+            cursor.execute('INSERT INTO game_text (game_text) VALUES (\'delete-all\')')
+        self.add_game_search_rows(cursor, first_game_id, last_game_id)
+        db.commit()
+    except (sqlite3.Error, DBAccessException) as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding game search index - [{e}]')
+
+    self.set_metadata(GAME_SEARCH_INDEX_KEY, '1')
+    self.finish_bulk_write()
+    print('...Done')
+
+'''
+    Returns True if the database has games but game_player, game_event and game_text were never built, such as a
+    database from before they existed
+    Raises: DBAccessException
+'''
+def is_game_search_index_missing(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM game_list)')
+        has_games = cursor.fetchone()[0] == 1
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking game search index - [{e}]')
+
+    return has_games and self.get_metadata(GAME_SEARCH_INDEX_KEY) != '1'
+
+'''
+    Rebuilds region_move_stats from game_list in a single transaction. The games are streamed chunk_size at a time
+    and the rows of each chunk are counted before they are written, so a joseki played in many games of the chunk
+    is one upsert.
+    progress(done, total) is called after every chunk, by default it prints the count.
+    Raises: DBAccessException
+'''
+def rebuild_region_move_stats(self, chunk_size=REBUILD_CHUNK_SIZE, progress=None):
+    print('Rebuilding region move stats...')
+
+    if progress is None:
+        progress = print_rebuild_progress
+
+    db = self.connect_to_sql()
+    read_cursor = db.cursor()
+    write_cursor = db.cursor()
+
+    try:
+        read_cursor.execute('SELECT COUNT(*) FROM game_list')
+        total = read_cursor.fetchone()[0]
+        write_cursor.execute('DELETE FROM region_move_stats')
+        read_cursor.execute('SELECT game_id, move_list, result_who_won FROM game_list ORDER BY game_id')
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding region move stats, cannot read games - [{e}]')
+
+    done = 0
+    try:
+        while True:
+            games = read_cursor.fetchmany(chunk_size)
+            if not games:
+                break
+            region_move_counts = {}  # row: [play_count, black_wins, white_wins]
+            for game_id, stored_move_list, result_who_won in games:
+                try:
+                    flat_moves = coords.convert_stored_move_list_to_flat_moves(stored_move_list)
+                except ValueError:
+                    print(f'   Game {game_id} has an invalid move - '
+                          f'[{coords.convert_stored_move_list_to_pair_list(stored_move_list)}]')
+                    continue
+                black_win = int(result_who_won == 1)
+                white_win = int(result_who_won == -1)
+                for row in generate_region_move_rows(flat_moves, self.REGION_SIZE, self.REGION_LIST_DEPTH):
+                    counts = region_move_counts.setdefault(row, [0, 0, 0])
+                    counts[0] += 1
+                    counts[1] += black_win
+                    counts[2] += white_win
+            self.add_list_of_region_move_stats(write_cursor, [row + tuple(counts)
+                                                              for row, counts in region_move_counts.items()])
+            done += len(games)
+            progress(done, total)
+        db.commit()
+    except (sqlite3.Error, DBAccessException) as e:
+        db.rollback()
+        raise DBAccessException(f'error rebuilding region move stats - [{e}]')
+
+    self.set_metadata(REGION_INDEX_KEY, f'{self.REGION_SIZE},{self.REGION_LIST_DEPTH}')
+    self.finish_bulk_write()
+    print('...Done')
+
+'''
+    Returns True if the database has games but region_move_stats was not built for the REGION_SIZE and
+    REGION_LIST_DEPTH of the code, such as a database from before it existed
+    Raises: DBAccessException
+'''
+def is_region_index_missing(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM game_list)')
+        has_games = cursor.fetchone()[0] == 1
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking region move stats - [{e}]')
+
+    return has_games and self.get_metadata(REGION_INDEX_KEY) != f'{self.REGION_SIZE},{self.REGION_LIST_DEPTH}'
+
+
+'''
+    Returns a list of descriptions of the migrations this database needs, empty if it is up to date
+    Raises: DBAccessException
+'''
+def get_pending_migrations(self):
+    pending = []
+
+    move_format = self.get_metadata('move_format')
+    if move_format != MOVE_FORMAT:
+        pending.append(f'convert game move lists [{move_format or "text"}] -> [{MOVE_FORMAT}]')
+
+    if self.is_final_positions_keyed_by_hash():
+        pending.append('convert final positions to allow games with the same final board')
+
+    hash_scheme = self.get_metadata('hash_scheme')
+    if hash_scheme != game_of_go.HASH_SCHEME:
+        pending.append(f'rebuild final positions and board hashes with hash scheme '
+                       f'[{hash_scheme or "additive"}] -> [{game_of_go.HASH_SCHEME}]')
+    elif self.get_metadata(REBUILD_BOARD_HASHES_KEY) is not None:
+        pending.append('finish the interrupted rebuild of board hashes')
+    elif self.is_hash_list_depth_changed():
+        pending.append(f'rebuild board hashes for the index setting '
+                       f'[{describe_hash_list_depth(*self.get_hash_list_depth())}]')
+    elif self.is_next_move_stats_missing():
+        pending.append('build next move stats from board hashes')
+
+    if self.is_region_index_missing():
+        pending.append('build the region index for joseki search')
+
+    if self.is_dyer_signatures_missing():
+        pending.append('build dyer signatures for duplicate checks')
+
+    if self.is_game_search_index_missing():
+        pending.append('build the player, event and text indexes for game search')
+
+    return pending
+
+'''
+    Converts the move strings of game_list to packed moves chunk_size games at a time, each chunk is committed so
+    an interrupted run continues where it stopped. The file only gets smaller after the VACUUM at the end.
+    Raises: DBAccessException
+'''
+def pack_move_lists(self, chunk_size=REBUILD_CHUNK_SIZE, progress=None):
+    print(f'Converting move lists to [{MOVE_FORMAT}]...')
+
+    if progress is None:
+        progress = print_rebuild_progress
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    query_string = ('SELECT game_id, move_list FROM game_list WHERE typeof(move_list) = \'text\' AND game_id > ? '
+                    'ORDER BY game_id LIMIT ?')
+    try:
+        cursor.execute('SELECT COUNT(*) FROM game_list WHERE typeof(move_list) = \'text\'')
+        total = cursor.fetchone()[0]
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error converting move lists, cannot count games - [{e}]')
+
+    done = 0
+    last_game_id = 0
+    while True:
+        try:
+            cursor.execute(query_string, (last_game_id, chunk_size))
+            games = cursor.fetchall()
+            if not games:
+                break
+            packed_rows = []
+            for game_id, move_string in games:
                 try:
-                    next_move = moves[move_number]
-                except IndexError:
-                    next_move = 'tt'
-                hash_list.append((hash, game_id, move_number, next_move))
-        except game_of_go.IllegalMove:
-            print(f'   Game {game_id} has an invalid move at {move_number} - [{moves}]')
-            continue
-
-    print('Done processing games, inserting into database...')
-    self.add_list_of_board_hash(hash_list)
+                    packed_rows.append((coords.pack_move_pair_list(coords.convert_move_string_to_pair_list(move_string)),
+                                        game_id))
+                except ValueError:
+                    # Keep the move string, every reader still understands it
+                    print(f'   Game {game_id} has a move that cannot be packed - [{move_string}]')
+            cursor.executemany('UPDATE game_list SET move_list = ? WHERE game_id = ?', packed_rows)
+            db.commit()
+        except sqlite3.Error as e:
+            db.rollback()
+            raise DBAccessException(f'error converting move lists after game {last_game_id} - [{e}]')
+        last_game_id = games[-1][0]
+        done += len(games)
+        progress(done, total)
+
+    self.set_metadata('move_format', MOVE_FORMAT)
+
+    print('Compacting database file...')
+    try:
+        db.execute('VACUUM')
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error compacting database after converting move lists - [{e}]')
+
+    self.finish_bulk_write()
     print('...Done')
+
+'''
+    Returns True if hash_list has rows but next_move_stats was never built, such as a database from before it existed
+    Raises: DBAccessException
+'''
+def is_next_move_stats_missing(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM hash_list) AND NOT EXISTS (SELECT 1 FROM next_move_stats)')
+        result = cursor.fetchone()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking next move stats - [{e}]')
+
+    return result[0] == 1
+
+'''
+    Brings an older database up to date with the current code.
+    The hash tables can not be converted from another hash scheme, they are rebuilt from game_list.
+    Raises: DBAccessException
+'''
+def migrate_database(self):
+    if self.get_metadata('move_format') != MOVE_FORMAT:
+        self.pack_move_lists()
+
+    if self.is_final_positions_keyed_by_hash():
+        self.convert_final_positions_table()
+
+    if self.get_metadata('hash_scheme') != game_of_go.HASH_SCHEME:
+        print(f'Migrating hashes to [{game_of_go.HASH_SCHEME}]...')
+        self.rebuild_final_positions()
+        self.rebuild_board_hashes()
+        self.set_metadata('hash_scheme', game_of_go.HASH_SCHEME)
+    elif self.get_metadata(REBUILD_BOARD_HASHES_KEY) is not None or self.is_hash_list_depth_changed():
+        self.rebuild_board_hashes()
+    elif self.is_next_move_stats_missing():
+        self.rebuild_next_move_stats()
+
+    if self.is_region_index_missing():
+        self.rebuild_region_move_stats()
+
+    if self.is_dyer_signatures_missing():
+        self.rebuild_dyer_signatures()
+
+    if self.is_game_search_index_missing():
+        self.rebuild_game_search_index()
+
+    self.finish_bulk_write()
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import threading
+import urllib.request
+import weakref
+
+from database import DBAccessException
+
+
+# Applied to every new connection
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',  # readers do not block the writer, and the writer does not block readers
+    'PRAGMA synchronous = NORMAL',  # safe with WAL, syncs at checkpoints instead of every commit
+    'PRAGMA mmap_size = 268435456',  # 256 MiB
+    'PRAGMA cache_size = -65536',  # 64 MiB, negative is KiB
+    'PRAGMA temp_store = MEMORY',
+)
+
+# Applied instead of SQLITE_PRAGMAS to a read only connection, the file is mapped whole for a typical database so
+# the processes reading it share the page cache
+SQLITE_READ_ONLY_PRAGMAS = (
+    'PRAGMA mmap_size = 4294967296',  # 4 GiB, sqlite caps it at its build limit (2 GiB by default) and the file size
+    'PRAGMA cache_size = -65536',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA query_only = ON',
+)
+
+# Prepared statements kept by each connection, the queries of DBAccess use ? parameters so they are reused
+SQLITE_CACHED_STATEMENTS = 256
+
+# Connections kept for new threads after their threads finish, more are closed
+POOL_MAX_IDLE = 8
+
+
+class ConnectionPool(object):
+    '''
+        One sqlite3 connection per thread, opened on the first get_connection() of the thread.
+        When a thread finishes its connection is rolled back and kept for the next new thread, so a server
+        that starts a thread per request reuses a few connections instead of opening one per request.
+
+        read_only opens the file with mode=ro, the connections take the usual locks and read through the WAL, so
+        each read sees the last commit of the writers and never a half written checkpoint. reopen_if_changed()
+        opens new connections after the file changed on disk, which a database file replaced by another one
+        needs, the old connections would keep reading the old file.
+    '''
+
+    def __init__(self, database_path, read_only=False):
+        self.database_path = database_path
+        self.read_only = read_only
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = []
+        # Connections of an older epoch are closed instead of reused, reopen_if_changed() starts a new epoch
+        self._epoch = 0
+        self._file_signature = None
+
+    '''
+        Returns the connection of the calling thread
+        Raises: DBAccessException
+    '''
+    def get_connection(self):
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None:
+            if holder.epoch == self._epoch:
+                return holder.connection
+            del self._local.holder
+
+        with self._lock:
+            epoch = self._epoch
+            con = self._idle.pop() if self._idle else None
+        if con is None:
+            con = self.open_connection()
+
+        holder = _ConnectionHolder(con, epoch)
+        # Runs when the thread finishes and its thread local storage is released
+        weakref.finalize(holder, self.release_connection, con, epoch)
+        self._local.holder = holder
+        return con
+
+    '''
+        Opens a new connection with SQLITE_PRAGMAS, or SQLITE_READ_ONLY_PRAGMAS for a read only pool
+        Raises: DBAccessException
+    '''
+    def open_connection(self):
+        if self.read_only:
+            if self._file_signature is None:
+                self._file_signature = self.get_file_signature()
+            database = f'file:{urllib.request.pathname2url(os.path.abspath(self.database_path))}?mode=ro'
+            pragmas = SQLITE_READ_ONLY_PRAGMAS
+        else:
+            database = self.database_path
+            pragmas = SQLITE_PRAGMAS
+
+        try:
+            # check_same_thread is off because a connection moves to a new thread after its thread finishes,
+            # it is never used by two threads at once
+            con = sqlite3.connect(database, cached_statements=SQLITE_CACHED_STATEMENTS, check_same_thread=False,
+                                  uri=self.read_only)
+            for pragma in pragmas:
+                con.execute(pragma)
+        except sqlite3.Error as e:
+            raise DBAccessException(f'sqlite3 error attempting to connect to database - [{e}]')
+        return con
+
+    def release_connection(self, con, epoch):
+        try:
+            con.rollback()
+        except sqlite3.Error:
+            con.close()
+            return
+        with self._lock:
+            if epoch == self._epoch and len(self._idle) < POOL_MAX_IDLE:
+                self._idle.append(con)
+                return
+        con.close()
+
+    '''
+        For a read only pool, starts a new epoch if the database file changed on disk since the connections were
+        opened. Every thread then opens a new connection on its next get_connection(), which opens the file again.
+        Returns True if the file changed.
+    '''
+    def reopen_if_changed(self):
+        if not self.read_only or self._file_signature is None:
+            return False
+
+        file_signature = self.get_file_signature()
+        with self._lock:
+            if file_signature == self._file_signature:
+                return False
+            self._file_signature = file_signature
+            self._epoch += 1
+            idle, self._idle = self._idle, []
+        for con in idle:
+            con.close()
+        return True
+
+    def get_file_signature(self):
+        try:
+            stat = os.stat(self.database_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    '''
+        Closes the connection of the calling thread and all idle connections.
+        Connections still held by other running threads are closed when those threads finish.
+    '''
+    def close(self):
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None:
+            del self._local.holder
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for con in idle:
+            con.close()
+
+
+class _ConnectionHolder(object):
+    __slots__ = ('connection', 'epoch', '__weakref__')
+
+    def __init__(self, connection, epoch):
+        self.connection = connection
+        self.epoch = epoch
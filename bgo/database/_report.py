@@ -0,0 +1,150 @@
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from database import DBAccessException
+from database._sql import CREATE_HASH_LIST, CREATE_HASH_INDEX_1
+from database._lookup import BATCH_QUERY_SIZE
+from database._maintenance import generate_board_hash_rows, generate_frontier_board_hash_rows
+from database._maintenance import REBUILD_CHUNK_SIZE
+
+
+# Lookups timed for each depth of report_hash_list_depths()
+REPORT_LOOKUPS = 2000
+
+INSERT_HASH_ROW = 'INSERT INTO hash_list (board_hash, game_id, move_number, next_move) VALUES (?,?,?,?)'
+
+'''
+    Builds hash_list for each index depth in a temporary database, from the first sample_games games of game_list or
+    all of them, and measures it. With shared_games > 0 each depth is measured a second time with the adaptive index
+    of get_hash_list_depth(). The database itself is not changed.
+    The games are streamed in chunks into the temporary hash_list, memory does not grow with the number of games.
+    Returns a list with a dictionary for each hash_list built
+    {
+        'depth': 30, 'shared_games': 0, 'games': 2000,
+        'rows': 60000,              rows of hash_list
+        'shared_rows': 8000,        rows of positions that more than one game has, the rows a search can find
+        'table_bytes': 2500000,     size of the table
+        'index_bytes': 1800000,     size of the board_hash index
+        'lookup_us': 12.5,          average time of a lookup of the next moves of a position in hash_list
+    }
+    Raises: DBAccessException
+'''
+def report_hash_list_depths(self, depths, shared_games=0, sample_games=None, lookups=REPORT_LOOKUPS):
+    reports = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for depth in depths:
+            for shared in sorted({0, shared_games}):
+                report = self.measure_hash_list(os.path.join(temp_dir, f'report_{depth}_{shared}.sqlite'), depth,
+                                                shared, sample_games, lookups)
+                report.update({'depth': depth, 'shared_games': shared})
+                reports.append(report)
+
+    return reports
+
+'''
+    Writes the hash_list of depth and shared_games for the first sample_games games to a new database_path and
+    returns its sizes and lookup time
+    Raises: DBAccessException
+'''
+def measure_hash_list(self, database_path, depth, shared_games, sample_games, lookups):
+    db = sqlite3.connect(database_path)
+    try:
+        cursor = db.cursor()
+        cursor.execute(CREATE_HASH_LIST)
+        games = 0
+        for chunk in iterate_report_game_chunks(self, sample_games):
+            cursor.executemany(INSERT_HASH_ROW, generate_board_hash_rows(chunk, depth))
+            games += len(chunk)
+        if shared_games > 0:
+            # As extend_shared_board_hashes(), the games of each shared position at the depth are replayed together
+            cursor.execute('CREATE TEMP TABLE frontier_game (board_hash INTEGER NOT NULL, game_id INTEGER NOT NULL)')
+            cursor.execute('INSERT INTO frontier_game SELECT board_hash, game_id FROM hash_list WHERE move_number = ? '
+                           'AND board_hash IN (SELECT board_hash FROM hash_list WHERE move_number = ? '
+                           'GROUP BY board_hash HAVING COUNT(*) > ?)', (depth, depth, shared_games))
+            frontier_cursor = db.cursor()
+            frontier_cursor.execute('SELECT board_hash, game_id FROM frontier_game ORDER BY board_hash, game_id')
+            cursor.executemany(INSERT_HASH_ROW, generate_frontier_board_hash_rows(
+                read_frontier_games(self, frontier_cursor), depth, shared_games))
+        db.commit()
+        cursor.execute('SELECT COUNT(*) FROM hash_list')
+        rows = cursor.fetchone()[0]
+        table_bytes = get_database_bytes(cursor)
+        cursor.execute(CREATE_HASH_INDEX_1)
+        db.commit()
+        index_bytes = get_database_bytes(cursor) - table_bytes
+
+        cursor.execute('SELECT IFNULL(SUM(games), 0) FROM '
+                       '(SELECT COUNT(*) AS games FROM hash_list GROUP BY board_hash HAVING games > 1)')
+        shared_rows = cursor.fetchone()[0]
+
+        # Positions to look up, picked from the rows so every lookup finds its position. The table is only
+        # inserted into, its rowids are 1 to rows.
+        sample = []
+        for rowid in random.Random(rows).sample(range(1, rows + 1), min(lookups, rows)):
+            cursor.execute('SELECT board_hash FROM hash_list WHERE rowid = ?', (rowid,))
+            sample.append(cursor.fetchone()[0])
+        start = time.perf_counter()
+        for board_hash in sample:
+            cursor.execute('SELECT next_move, COUNT(*) FROM hash_list WHERE board_hash = ? GROUP BY next_move',
+                           (board_hash,))
+            cursor.fetchall()
+        lookup_time = time.perf_counter() - start
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error measuring hash_list for the index report - [{e}]')
+    finally:
+        db.close()
+
+    return {
+        'games': games,
+        'rows': rows,
+        'shared_rows': shared_rows,
+        'table_bytes': table_bytes,
+        'index_bytes': index_bytes,
+        'lookup_us': lookup_time / len(sample) * 1e6 if sample else 0.0,
+    }
+
+'''
+    Yields the games of the report as lists of (game_id, stored_move_list) like iterate_game_chunks(), stopping after
+    sample_games games if it is not None
+    Raises: DBAccessException
+'''
+def iterate_report_game_chunks(db_access, sample_games):
+    remaining = sample_games
+    for games in db_access.iterate_game_chunks(0, REBUILD_CHUNK_SIZE):
+        if remaining is not None:
+            games = games[:remaining]
+            remaining -= len(games)
+        if games:
+            yield games
+        if remaining == 0:
+            return
+
+'''
+    Yields (board_hash, game_id, stored_move_list) for the (board_hash, game_id) rows of frontier_rows, ordered by
+    board_hash, the move lists of the games of one board_hash are read from game_list together
+    Raises: DBAccessException
+'''
+def read_frontier_games(db_access, frontier_rows):
+    cursor = db_access.connect_to_sql().cursor()
+    for board_hash, rows in itertools.groupby(frontier_rows, key=lambda row: row[0]):
+        game_ids = [game_id for _, game_id in rows]
+        for start in range(0, len(game_ids), BATCH_QUERY_SIZE):
+            batch = game_ids[start:start + BATCH_QUERY_SIZE]
+            try:
+                cursor.execute(f'SELECT game_id, move_list FROM game_list WHERE game_id IN '
+                               f'({", ".join("?" * len(batch))}) ORDER BY game_id', batch)
+                games = cursor.fetchall()
+            except sqlite3.Error as e:
+                raise DBAccessException(f'error reading games for the index report - [{e}]')
+            for game_id, stored_move_list in games:
+                yield board_hash, game_id, stored_move_list
+
+def get_database_bytes(cursor):
+    cursor.execute('PRAGMA page_count')
+    page_count = cursor.fetchone()[0]
+    cursor.execute('PRAGMA page_size')
+    return page_count * cursor.fetchone()[0]
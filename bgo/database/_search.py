@@ -0,0 +1,229 @@
+import re
+import sqlite3
+
+from database import DBAccessException
+from database._lookup import GAME_SUMMARY_COLUMNS
+
+
+SEARCH_PAGE_SIZE = 50
+SEARCH_MAX_PAGE_SIZE = 500
+
+# Players or events a name can match, a name that matches more is too short to search with
+MAX_NAME_MATCHES = 200
+
+COLOR_FOR_NAME = {'black': 1, 'white': -1}
+
+
+'''
+    Searches game_list by its metadata and returns one page of games, most recent first
+        player      name of a player, the exact name or a part of it such as 'Sedol'
+        opponent    name of the opponent of player
+        color       'black' or 'white', the color player had
+        event       name of an event or a part of it
+        text        words that must all be in the player, event or place names of the game, a word also matches
+                    the start of a longer word
+        date_from   first date, 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD'
+        date_to     last date, a year or month means up to its end
+        result      'black' or 'white', the color that won, or 'won' or 'lost' for player
+        min_rank    games where both players have at least this rank, 1 is 1 dan and -1 is 1 kyu
+        after       the 'next' of the page before, to get the page after it
+        limit       games per page, at most SEARCH_MAX_PAGE_SIZE
+    Returns
+    {
+        'games': [ {'game_id': 12, 'sgf_file_name': ..., <the columns of GAME_SUMMARY_COLUMNS>}, ... ],
+        'next': ('2012-06-11', 12) to pass as after for the next page, None on the last page
+    }
+    Pages are keyset paginated on (game_date, game_id), a page is an index range scan however deep it is.
+    Raises: DBAccessException
+'''
+def search_games(self, player=None, opponent=None, color=None, event=None, text=None, date_from=None, date_to=None,
+                 result=None, min_rank=None, after=None, limit=SEARCH_PAGE_SIZE):
+    if color is not None and color not in COLOR_FOR_NAME:
+        raise DBAccessException(f'error searching games, color must be black or white - [{color}]')
+    if result is not None and result not in ('black', 'white', 'won', 'lost'):
+        raise DBAccessException(f'error searching games, result must be black, white, won or lost - [{result}]')
+    if (opponent or color or result in ('won', 'lost')) and not player:
+        raise DBAccessException('error searching games, opponent, color and won or lost need a player')
+    if not isinstance(limit, int) or not 1 <= limit <= SEARCH_MAX_PAGE_SIZE:
+        raise DBAccessException(f'error searching games, limit must be 1 to {SEARCH_MAX_PAGE_SIZE} - [{limit}]')
+    try:
+        min_rank = None if min_rank is None else int(min_rank)
+    except ValueError:
+        raise DBAccessException(f'error searching games, min rank must be a number - [{min_rank}]')
+
+    empty_page = {'games': [], 'next': None}
+    conditions = []
+    params = []
+
+    # The table the games are read from in date order, the other filters are checked for each of its rows
+    if player:
+        player_ids = self.find_player_ids(player)
+        if not player_ids:
+            return empty_page
+        from_clause = 'game_player AS d JOIN game_list AS g ON g.game_id = d.game_id'
+        conditions.append(f'd.player_id IN ({", ".join("?" * len(player_ids))})')
+        params.extend(player_ids)
+        if color is not None:
+            conditions.append('d.color = ?')
+            params.append(COLOR_FOR_NAME[color])
+        driver = 'd'
+    elif event:
+        event_ids = self.find_event_ids(event)
+        if not event_ids:
+            return empty_page
+        from_clause = 'game_event AS d JOIN game_list AS g ON g.game_id = d.game_id'
+        conditions.append(f'd.event_id IN ({", ".join("?" * len(event_ids))})')
+        params.extend(event_ids)
+        driver = 'd'
+    else:
+        from_clause = 'game_list AS g'
+        driver = 'g'
+
+    if date_from:
+        conditions.append(f'{driver}.game_date >= ?')
+        params.append(normalize_search_date(date_from, False))
+    if date_to:
+        conditions.append(f'{driver}.game_date <= ?')
+        params.append(normalize_search_date(date_to, True))
+
+    # Found with the primary keys of game_event and game_player, the date of the game is part of them
+    if event and player:
+        event_ids = self.find_event_ids(event)
+        if not event_ids:
+            return empty_page
+        conditions.append(f'EXISTS (SELECT 1 FROM game_event AS e WHERE e.event_id IN '
+                          f'({", ".join("?" * len(event_ids))}) AND e.game_date = d.game_date '
+                          f'AND e.game_id = d.game_id)')
+        params.extend(event_ids)
+    if opponent:
+        opponent_ids = self.find_player_ids(opponent)
+        if not opponent_ids:
+            return empty_page
+        conditions.append(f'EXISTS (SELECT 1 FROM game_player AS o WHERE o.player_id IN '
+                          f'({", ".join("?" * len(opponent_ids))}) AND o.game_date = d.game_date '
+                          f'AND o.game_id = d.game_id AND o.color = -d.color)')
+        params.extend(opponent_ids)
+
+    if text:
+        words = re.findall(r'\w+', text)
+        if words and self.has_game_text_index():
+            conditions.append('g.game_id IN (SELECT rowid FROM game_text WHERE game_text MATCH ?)')
+            params.append(' '.join(f'"{word}"*' for word in words))
+        else:
+            for word in words:
+                pattern = '%' + word.replace('\\', '\\\\').replace('_', '\\_') + '%'
+                conditions.append('(' + ' OR '.join(f'g.{column} LIKE ? ESCAPE \'\\\''
+                                                    for column in ('black_player_name', 'white_player_name',
+                                                                   'event', 'place')) + ')')
+                params.extend([pattern] * 4)
+
+    if result == 'black':
+        conditions.append('g.result_who_won = 1')
+    elif result == 'white':
+        conditions.append('g.result_who_won = -1')
+    elif result == 'won':
+        conditions.append('g.result_who_won = d.color')
+    elif result == 'lost':
+        conditions.append('g.result_who_won = -d.color')
+
+    if min_rank is not None:
+        conditions.append('g.black_player_rank >= ? AND g.white_player_rank >= ?')
+        params.extend([min_rank] * 2)
+
+    if after is not None:
+        try:
+            after_date, after_game_id = after[0], int(after[1])
+        except (TypeError, ValueError, IndexError):
+            raise DBAccessException(f'error searching games, after must be (game_date, game_id) - [{after}]')
+        conditions.append(f'({driver}.game_date, {driver}.game_id) < (?, ?)')
+        params.extend([after_date, after_game_id])
+
+    # A game can come twice from game_player only when the name matches both of its players
+    distinct = 'DISTINCT ' if player and color is None and len(player_ids) > 1 else ''
+    query_string = (f'SELECT {distinct}{", ".join("g." + column for column in GAME_SUMMARY_COLUMNS)} '
+                    f'FROM {from_clause} ' +
+                    (f'WHERE {" AND ".join(conditions)} ' if conditions else '') +
+                    f'ORDER BY {driver}.game_date DESC, {driver}.game_id DESC LIMIT ?')
+    params.append(limit + 1)
+
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(query_string, params)
+        rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error searching games - [{e}]')
+
+    games = [dict(zip(GAME_SUMMARY_COLUMNS, row)) for row in rows[:limit]]
+    next_page = None
+    if len(rows) > limit:
+        next_page = (games[-1]['game_date'], games[-1]['game_id'])
+    return {'games': games, 'next': next_page}
+
+
+'''
+    Returns the dates of a date range as game_list stores them, to_end moves a year or month to its last day
+    Raises: DBAccessException
+'''
+def normalize_search_date(date, to_end):
+    match = re.fullmatch(r'(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?', str(date).strip())
+    if match is None:
+        raise DBAccessException(f'error searching games, dates must be YYYY, YYYY-MM or YYYY-MM-DD - [{date}]')
+    year, month, day = match.groups()
+    if month is None:
+        month = '12' if to_end else '1'
+    if day is None:
+        # Dates compare as strings, 31 is past the end of every month
+        day = '31' if to_end else '1'
+    return f'{year}-{int(month):02}-{int(day):02}'
+
+
+'''
+    Returns the player_id of the player named name, or of every player with name in their name when there is no
+    exact match
+    Raises: DBAccessException
+'''
+def find_player_ids(self, name):
+    return find_name_ids(self, 'player_list', 'player_id', 'player_name', name)
+
+'''
+    Same as find_player_ids() for event_list
+    Raises: DBAccessException
+'''
+def find_event_ids(self, name):
+    return find_name_ids(self, 'event_list', 'event_id', 'event_name', name)
+
+def find_name_ids(self, table, id_column, name_column, name):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    name = name.strip()
+    pattern = '%' + name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    try:
+        cursor.execute(f'SELECT {id_column} FROM {table} WHERE {name_column} = ?', (name,))
+        ids = [row[0] for row in cursor]
+        if not ids:
+            cursor.execute(f'SELECT {id_column} FROM {table} WHERE {name_column} LIKE ? ESCAPE \'\\\' LIMIT ?',
+                           (pattern, MAX_NAME_MATCHES + 1))
+            ids = [row[0] for row in cursor]
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error looking up names in {table} - [{e}]')
+
+    if len(ids) > MAX_NAME_MATCHES:
+        raise DBAccessException(f'error searching games, more than {MAX_NAME_MATCHES} names match [{name}]')
+    return ids
+
+'''
+    Returns True if the database has the FTS5 game_text index, sqlite builds without FTS5 have no game_text
+    Raises: DBAccessException
+'''
+def has_game_text_index(self):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = \'game_text\')')
+        return cursor.fetchone()[0] == 1
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error checking game text index - [{e}]')
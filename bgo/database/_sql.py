@@ -1,5 +1,6 @@
 import sqlite3
 from database import DBAccessDuplicate, DBAccessException, DBAccessGameRecordError, DBAccessLookupNotFound
+import game_of_go.game_of_go as game_of_go
 
 CREATE_PLAYER_LIST = ('CREATE TABLE IF NOT EXISTS `player_list` ('
                       '`player_id`	INTEGER PRIMARY KEY AUTOINCREMENT,'
@@ -19,29 +20,110 @@ CREATE_GAME_LIST = ('CREATE TABLE IF NOT EXISTS `game_list` ('
                     '`komi`	TEXT,'
                     '`result`	TEXT NOT NULL,'
                     '`result_who_won`	INTEGER NOT NULL,'  # -1 = white   0 = unknown   1 = black
-                    '`move_list` TEXT NOT NULL'
+                    '`move_list` TEXT NOT NULL'  # BLOB from coords.pack_move_pair_list(), TEXT in older databases
                     ');')
 
+CREATE_EVENT_LIST = ('CREATE TABLE IF NOT EXISTS `event_list` ('
+                     '`event_id`	INTEGER PRIMARY KEY AUTOINCREMENT,'
+                     '`event_name`	TEXT NOT NULL UNIQUE);')
+
+# The players of every game, color is 1 = black and -1 = white like result_who_won. game_date is copied from
+# game_list so the games of a player in a range of dates are one range of the primary key, already in date order.
+CREATE_GAME_PLAYER = ('CREATE TABLE IF NOT EXISTS `game_player` ('
+                      '`player_id`	INTEGER NOT NULL,'
+                      '`game_date`	DATE NOT NULL,'
+                      '`game_id`	INTEGER NOT NULL,'
+                      '`color`	INTEGER NOT NULL,'
+                      'PRIMARY KEY(`player_id`,`game_date`,`game_id`,`color`)) WITHOUT ROWID;')
+
+# The event of every game that has one, keyed like game_player
+CREATE_GAME_EVENT = ('CREATE TABLE IF NOT EXISTS `game_event` ('
+                     '`event_id`	INTEGER NOT NULL,'
+                     '`game_date`	DATE NOT NULL,'
+                     '`game_id`	INTEGER NOT NULL,'
+                     'PRIMARY KEY(`event_id`,`game_date`,`game_id`)) WITHOUT ROWID;')
+
+# Full text index of the names of game_list, its rowid is the game_id. The text is not stored twice, it is read from
+# game_list. Only created when sqlite has FTS5, searches fall back to LIKE on game_list without it.
+CREATE_GAME_TEXT = ('CREATE VIRTUAL TABLE IF NOT EXISTS `game_text` USING fts5('
+                    'black_player_name, white_player_name, event, place, '
+                    'content=\'game_list\', content_rowid=\'game_id\');')
+
+# Dyer signatures of utils/dyer_signature.py, the same game recorded twice has the same signature_a and signature_b.
+# The import looks up the signatures of each new game to skip duplicates.
 CREATE_DYER_LIST = ('CREATE TABLE IF NOT EXISTS `dyer_signatures` ('
                     '`game_id`	INTEGER NOT NULL,'
                     '`signature_a`	TEXT NOT NULL,'
                     '`signature_b`	TEXT NOT NULL,'
                     'PRIMARY KEY(`signature_a`,`signature_b`,`game_id`));')
 
+# board_hash is the canonical hash of the position, the smallest hash of its 8 rotations.
+# next_move is rotated into the same rotation as the canonical hash, so every rotation of a position shares its rows.
 CREATE_HASH_LIST = ('CREATE TABLE IF NOT EXISTS `hash_list` ('
                     '`board_hash`	INTEGER NOT NULL,'
                     '`game_id`	INTEGER NOT NULL,'
                     '`move_number` INTEGER NOT NULL,'
                     '`next_move` TEXT NOT NULL);')  # the move number was played to generate this position and hash
 
-# A table containing the board hashes of the final boards of every game in the database, for quick unique checks.
+# A table containing the board hashes of the final boards of every game in the database.
+# Different games can transpose into the same final board, so board_hash is indexed but not unique.
 CREATE_FINAL_BOARD_HASH_LIST = ('CREATE TABLE IF NOT EXISTS `final_board_hash` ('
-                                '`board_hash`	INTEGER PRIMARY KEY,'
-                                '`game_id`	INTEGER NOT NULL);')
+                                '`game_id`	INTEGER PRIMARY KEY,'
+                                '`board_hash`	INTEGER NOT NULL);')
+CREATE_FINAL_BOARD_HASH_INDEX = 'CREATE INDEX IF NOT EXISTS idx_final_board_hash ON final_board_hash (board_hash);'
+
+# Next move statistics for every position in hash_list, built from hash_list and game_list by rebuild_board_hashes.
+# board_hash and next_move are canonical like hash_list, last_date is the most recent game_date with this next move.
+CREATE_NEXT_MOVE_STATS = ('CREATE TABLE IF NOT EXISTS `next_move_stats` ('
+                          '`board_hash`	INTEGER NOT NULL,'
+                          '`next_move`	TEXT NOT NULL,'
+                          '`play_count`	INTEGER NOT NULL,'
+                          '`black_wins`	INTEGER NOT NULL,'
+                          '`white_wins`	INTEGER NOT NULL,'
+                          '`last_date`	DATE NOT NULL,'
+                          'PRIMARY KEY(`board_hash`,`next_move`)) WITHOUT ROWID;')
+
+# Moves played inside the corner and side regions of game_of_go/regions.py, counted by the canonical hash of the
+# region before the move. color is the player of the move, 1 = black and -1 = white like result_who_won, and
+# next_move is in the canonical frame of the region. Built by rebuild_region_move_stats.
+CREATE_REGION_MOVE_STATS = ('CREATE TABLE IF NOT EXISTS `region_move_stats` ('
+                            '`region_kind`	INTEGER NOT NULL,'
+                            '`region_hash`	INTEGER NOT NULL,'
+                            '`color`	INTEGER NOT NULL,'
+                            '`next_move`	TEXT NOT NULL,'
+                            '`play_count`	INTEGER NOT NULL,'
+                            '`black_wins`	INTEGER NOT NULL,'
+                            '`white_wins`	INTEGER NOT NULL,'
+                            'PRIMARY KEY(`region_kind`,`region_hash`,`color`,`next_move`)) WITHOUT ROWID;')
+
+# Key / value settings for the database, such as the hash scheme used to build hash_list and final_board_hash.
+CREATE_METADATA = ('CREATE TABLE IF NOT EXISTS `metadata` ('
+                   '`key`	TEXT PRIMARY KEY,'
+                   '`value`	TEXT NOT NULL);')
+
+# Format of game_list.move_list written by this code, databases with move strings are migrated to it
+MOVE_FORMAT = 'packed'
+
+# Metadata key of the 'region size,depth' region_move_stats was built with
+REGION_INDEX_KEY = 'region_index'
+
+# Metadata key set once game_player, game_event and game_text hold every game of game_list
+GAME_SEARCH_INDEX_KEY = 'game_search_index'
+
+# Metadata key increased by finish_bulk_write()
+DATA_GENERATION_KEY = 'data_generation'
 
 CREATE_HASH_INDEX_1 = ('CREATE INDEX IF NOT EXISTS idx_hash_list ON hash_list (board_hash);')
 CREATE_HASH_INDEX_2 = ('CREATE INDEX IF NOT EXISTS idx_hash_list_move_number ON hash_list (move_number);')
 
+# Indexes of game_list for search_games(), the rowid is the game_id so every index is also in game_id order
+CREATE_GAME_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_game_list_date ON game_list (game_date);',
+    'CREATE INDEX IF NOT EXISTS idx_game_list_result ON game_list (result_who_won, game_date);',
+    'CREATE INDEX IF NOT EXISTS idx_game_list_black_rank ON game_list (black_player_rank, game_date);',
+    'CREATE INDEX IF NOT EXISTS idx_game_list_white_rank ON game_list (white_player_rank, game_date);',
+)
+
 '''
     Runs all create statements, which will silently be ignored if the tables exist.
     Call this before using the database for the first time to make sure it is initialized properly.
@@ -53,15 +135,39 @@ def first_check_of_database(self):
 
     try:
         cursor.execute(CREATE_PLAYER_LIST)
+        cursor.execute(CREATE_EVENT_LIST)
         cursor.execute(CREATE_GAME_LIST)
+        cursor.execute(CREATE_GAME_PLAYER)
+        cursor.execute(CREATE_GAME_EVENT)
         cursor.execute(CREATE_DYER_LIST)
         cursor.execute(CREATE_HASH_LIST)
         cursor.execute(CREATE_FINAL_BOARD_HASH_LIST)
+        cursor.execute(CREATE_FINAL_BOARD_HASH_INDEX)
+        cursor.execute(CREATE_NEXT_MOVE_STATS)
+        cursor.execute(CREATE_REGION_MOVE_STATS)
+        cursor.execute(CREATE_METADATA)
         cursor.execute(CREATE_HASH_INDEX_1)
         cursor.execute(CREATE_HASH_INDEX_2)
+        for create_index in CREATE_GAME_INDEXES:
+            cursor.execute(create_index)
+        db.commit()
     except sqlite3.Error as e:
         raise DBAccessException('first_check_of_database() sql error [%s]' % (e,))
 
+    try:
+        cursor.execute(CREATE_GAME_TEXT)
+        db.commit()
+    except sqlite3.OperationalError:
+        # sqlite was built without FTS5
+        db.rollback()
+
+    # A new database has no hashes to migrate and starts with the current hash scheme
+    if self.get_metadata('hash_scheme') is None and self.get_number_of_games_in_database() == 0:
+        self.set_metadata('hash_scheme', game_of_go.HASH_SCHEME)
+        self.set_metadata('move_format', MOVE_FORMAT)
+        self.set_metadata(REGION_INDEX_KEY, f'{self.REGION_SIZE},{self.REGION_LIST_DEPTH}')
+        self.set_metadata(GAME_SEARCH_INDEX_KEY, '1')
+
 
 '''
     Returns a string containing the full path to the database file
@@ -71,13 +177,94 @@ def get_database_path(self):
 
 
 '''
-    Attempt to open the database and return a connection object
+    Returns the connection of the calling thread from the connection pool, it stays open for the next call
     Raises: DBAccessException
 '''
 def connect_to_sql(self):
+    return self.connection_pool.get_connection()
+
+
+'''
+    Moves everything in the WAL file into the database file and empties it, so the WAL does not grow across jobs
+    Raises: DBAccessException
+'''
+def checkpoint(self):
+    if self.read_only:
+        return
+
+    db = self.connect_to_sql()
+
     try:
-        con = sqlite3.connect(self.database_path)
+        db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
     except sqlite3.Error as e:
-        raise DBAccessException('sqlite3 error attempting to connect to database')
-    return con
+        raise DBAccessException(f'error checkpointing database - [{e}]')
+
 
+'''
+    Called by the writers at the end of an import or rebuild. Increases data_generation, so caches of lookup
+    results can tell the data changed, and checkpoints the WAL.
+    Raises: DBAccessException
+'''
+def finish_bulk_write(self):
+    db = self.connect_to_sql()
+
+    try:
+        db.execute('INSERT INTO metadata (key, value) VALUES (?, 1) '
+                   'ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1', (DATA_GENERATION_KEY,))
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        raise DBAccessException(f'error increasing data generation - [{e}]')
+
+    self.checkpoint()
+
+
+'''
+    Returns data_generation, which the writers increase every time they change the games or hashes.
+    A read only pool first opens new connections if the file changed on disk since they were opened.
+    Raises: DBAccessException
+'''
+def get_data_generation(self):
+    if self.read_only:
+        self.connection_pool.reopen_if_changed()
+    return int(self.get_metadata(DATA_GENERATION_KEY, 0))
+
+
+'''
+    Closes the pooled connections, the next call opens new ones
+'''
+def close(self):
+    self.connection_pool.close()
+
+
+'''
+    Returns the value of a metadata key as a string, or default if the key is not set
+    Raises: DBAccessException
+'''
+def get_metadata(self, key, default=None):
+    db = self.connect_to_sql()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute('SELECT value FROM metadata WHERE key = ?', (key,))
+        result = cursor.fetchone()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error reading metadata - [{key}] - [{e}]')
+
+    if result is None:
+        return default
+    return result[0]
+
+
+'''
+    Sets a metadata key to a value, the value is stored as a string
+    Raises: DBAccessException
+'''
+def set_metadata(self, key, value):
+    db = self.connect_to_sql()
+
+    try:
+        db.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', (key, str(value)))
+        db.commit()
+    except sqlite3.Error as e:
+        raise DBAccessException(f'error writing metadata - [{key}] - [{e}]')
@@ -0,0 +1,147 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    batch_hash.py
+        Zobrist hashes of many boards per call, for the bulk paths that hash thousands of final positions.
+
+        With NumPy a batch of boards is an (N, 361) int8 array of 0 empty, 1 black and 2 white. KEY_TABLE[rotation,
+        code, fc] is the key of fc in that rotation, ROTATED_FLAT applied to the key lists as index permutations, so
+        a gather and an XOR reduce over the 361 points hash every board of the batch in one rotation. Packed move
+        lists from game_list are decoded to flat codes inside NumPy as well, without a Python loop per move.
+
+        NumPy is optional. Without it the same functions replay on a ReplayBoard and return the same hashes.
+'''
+
+import game_of_go.coords as coords
+import game_of_go.game_of_go as game_of_go
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+HAVE_NUMPY = numpy is not None
+
+# Games per NumPy batch, the gathered keys of one rotation take 8 * 361 bytes per game
+HASH_BATCH_SIZE = 4096
+
+if HAVE_NUMPY:
+    _ROTATED_FLAT = numpy.array(game_of_go.ROTATED_FLAT, dtype=numpy.intp)
+    KEY_TABLE = numpy.zeros((8, 3, game_of_go.NN), dtype=numpy.uint64)
+    KEY_TABLE[:, 1] = numpy.array(game_of_go.zobrist_black, dtype=numpy.uint64)[_ROTATED_FLAT]
+    KEY_TABLE[:, 2] = numpy.array(game_of_go.zobrist_white, dtype=numpy.uint64)[_ROTATED_FLAT]
+    _POINTS = numpy.arange(game_of_go.NN)
+    _PACKED_FLAT_FOR_CODE = numpy.array(coords.PACKED_FLAT_FOR_CODE, dtype=numpy.intp)
+
+
+'''
+    Returns the 8 rotation hashes of each board, boards are 361 character strings as from Position.get_board(),
+    the same as Position.get_rotation_hashes() for the positions of those boards
+'''
+def get_rotation_hashes_for_boards(boards):
+    boards = list(boards)
+    if not HAVE_NUMPY:
+        return [unpack_board_hash(board) for board in boards]
+
+    hashes = []
+    for start in range(0, len(boards), HASH_BATCH_SIZE):
+        batch = boards[start:start + HASH_BATCH_SIZE]
+        points = numpy.frombuffer(''.join(batch).encode('ascii'), dtype=numpy.int8).reshape(len(batch), game_of_go.NN)
+        codes = (points == ord(game_of_go.BLACK)).astype(numpy.int8)
+        codes[points == ord(game_of_go.WHITE)] = 2
+        hashes.extend(hash_codes(codes))
+    return hashes
+
+
+'''
+    Returns the 8 rotation hashes of the final board of each game, with the stones placed without rules like
+    PositionSimple, or None for a game that has a move that cannot be decoded. stored_move_lists are values of the
+    move_list column of game_list, packed bytes or move strings.
+'''
+def build_final_rotation_hashes(stored_move_lists):
+    stored_move_lists = list(stored_move_lists)
+    if not HAVE_NUMPY:
+        return [build_final_rotation_hashes_python(stored_move_list) for stored_move_list in stored_move_lists]
+
+    hashes = []
+    for start in range(0, len(stored_move_lists), HASH_BATCH_SIZE):
+        packed_list = []
+        for stored_move_list in stored_move_lists[start:start + HASH_BATCH_SIZE]:
+            if isinstance(stored_move_list, str):
+                try:
+                    stored_move_list = coords.pack_move_pair_list(
+                        coords.convert_move_string_to_pair_list(stored_move_list))
+                except ValueError:
+                    stored_move_list = None
+            packed_list.append(stored_move_list)
+
+        decoded = [packed for packed in packed_list if packed is not None]
+        batch_hashes = iter(hash_codes(build_final_codes(decoded))) if decoded else iter(())
+        hashes.extend(None if packed is None else next(batch_hashes) for packed in packed_list)
+    return hashes
+
+
+def build_final_rotation_hashes_python(stored_move_list):
+    try:
+        flat_moves = coords.convert_stored_move_list_to_flat_moves(stored_move_list)
+    except ValueError:
+        return None
+    return game_of_go.build_replayboard_from_flat_moves(flat_moves, rules=False).get_rotation_hashes()
+
+
+def unpack_board_hash(board):
+    symmetric_hash = 0
+    for fc, point in enumerate(board):
+        if point != game_of_go.EMPTY:
+            symmetric_hash ^= game_of_go.symmetric_keys[point][fc]
+    return game_of_go.unpack_rotation_hashes(symmetric_hash)
+
+
+'''
+    Returns the (N, 361) codes of the final boards of a list of packed move lists, each point has the color of the
+    last move played on it. A pass is flat code 361, a column that is dropped at the end.
+'''
+def build_final_codes(packed_list):
+    packed = numpy.frombuffer(b''.join(packed_list), dtype=numpy.uint8)
+    byte_counts = numpy.fromiter((len(game) for game in packed_list), dtype=numpy.intp, count=len(packed_list))
+
+    game_ends = numpy.cumsum(byte_counts)
+    game_starts = numpy.zeros(len(packed) + 1, dtype=bool)
+    game_starts[game_ends - byte_counts] = True
+
+    # The byte after an escape is code - PACKED_ESCAPE, it is never PACKED_ESCAPE itself. An escape at the end of
+    # a broken game must not change the first move of the next one.
+    escaped = packed == coords.PACKED_ESCAPE
+    codes = packed.astype(numpy.intp)
+    codes[1:][escaped[:-1] & ~game_starts[1:-1]] += coords.PACKED_ESCAPE
+    flat_moves = _PACKED_FLAT_FOR_CODE[codes[~escaped]]
+
+    # Moves per game are its bytes less its escapes
+    escapes_before = numpy.concatenate(([0], numpy.cumsum(escaped)))
+    move_counts = byte_counts - (escapes_before[game_ends] - escapes_before[game_ends - byte_counts])
+
+    game = numpy.repeat(numpy.arange(len(packed_list)), move_counts)
+    move_number = numpy.arange(len(flat_moves)) - numpy.repeat(numpy.cumsum(move_counts) - move_counts, move_counts)
+    colors = (move_number & 1) + 1  # black plays the even moves
+
+    # Index of the last move played on each point of each board, -1 for a point never played on
+    board_points = game * (game_of_go.NN + 1) + flat_moves
+    last_move = numpy.full(len(packed_list) * (game_of_go.NN + 1), -1, dtype=numpy.intp)
+    numpy.maximum.at(last_move, board_points, numpy.arange(len(board_points)))
+
+    played = last_move >= 0
+    boards = numpy.zeros((len(packed_list), game_of_go.NN + 1), dtype=numpy.int8)
+    boards.reshape(-1)[played] = colors[last_move[played]]
+    return boards[:, :game_of_go.NN]
+
+
+'''
+    Returns the 8 rotation hashes of each board of (N, 361) codes as lists of ints
+'''
+def hash_codes(codes):
+    key_index = codes.astype(numpy.intp) * game_of_go.NN + _POINTS
+    hashes = numpy.empty((len(codes), 8), dtype=numpy.uint64)
+    for rotation in range(8):
+        hashes[:, rotation] = numpy.bitwise_xor.reduce(KEY_TABLE[rotation].take(key_index), axis=1)
+    return hashes.tolist()
@@ -29,6 +29,12 @@ coord_transformations = [
 ]
 
 
+'''
+    INVERSE_ROTATION[r] is the rotation that undoes rotation r
+'''
+INVERSE_ROTATION = [0, 3, 2, 1, 4, 5, 6, 7]
+
+
 '''
     Convert a move pair list ['DD', 'DP', 'QQ'] to a string 'DDDPQQ'
 '''
@@ -42,6 +48,130 @@ def convert_move_string_to_pair_list(move_string):
     return [move_string[i:i + 2] for i in range(0, len(move_string), 2)]
 
 
+'''
+    Flat coordinates number the points 0 - 360 row by row, fc = 19 * y + x for the move pair letters[x] + letters[y].
+    PASS_FLAT is the flat code of a pass, 'tt'.
+'''
+LETTERS = 'abcdefghijklmnopqrs'
+PASS_FLAT = 361
+FLAT_TO_MOVE_PAIR = [x + y for y in LETTERS for x in LETTERS] + ['tt']
+MOVE_PAIR_TO_FLAT = {move_pair: fc for fc, move_pair in enumerate(FLAT_TO_MOVE_PAIR)}
+
+'''
+    Returns the flat code of a move pair, any move with a 't' is a pass like Position.play_move() treats it
+    Raises: ValueError
+'''
+def convert_move_pair_to_flat(move_pair):
+    fc = MOVE_PAIR_TO_FLAT.get(move_pair)
+    if fc is None:
+        if 't' not in move_pair:
+            raise ValueError(f'move cannot be converted to a flat code - [{move_pair}]')
+        fc = PASS_FLAT
+    return fc
+
+
+'''
+    Convert a move pair list ['dd', 'dp', 'tt'] to flat codes [60, 288, 361] and back
+    Raises: ValueError
+'''
+def convert_move_pair_list_to_flat_moves(move_pair_list):
+    try:
+        return [MOVE_PAIR_TO_FLAT[move_pair] for move_pair in move_pair_list]
+    except KeyError:
+        return [convert_move_pair_to_flat(move_pair) for move_pair in move_pair_list]
+
+def convert_flat_moves_to_move_pair_list(flat_moves):
+    return [FLAT_TO_MOVE_PAIR[fc] for fc in flat_moves]
+
+
+'''
+    Rotation tables, built once from coord_transformations
+
+    ROTATED_FLAT[rotation][fc] is the flat code fc moves to in that rotation, PASS_FLAT stays PASS_FLAT.
+    ROTATED_MOVE_PAIR[rotation] maps every lower case move pair and 'tt' to its rotated move pair.
+'''
+def get_rotated_flat(fc, rotation):
+    if fc == PASS_FLAT:
+        return PASS_FLAT
+    # Zero centered coordinates, x is the column and y the row
+    y, x = divmod(fc, 19)
+    x -= 9
+    y -= 9
+    matrix = coord_transformations[rotation]
+    tx = matrix[0][0] * x + matrix[0][1] * y
+    ty = matrix[1][0] * x + matrix[1][1] * y
+    return 19 * (ty + 9) + (tx + 9)
+
+ROTATED_FLAT = [[get_rotated_flat(fc, rotation) for fc in range(PASS_FLAT + 1)] for rotation in range(8)]
+ROTATED_MOVE_PAIR = [{FLAT_TO_MOVE_PAIR[fc]: FLAT_TO_MOVE_PAIR[rotated_fc] for fc, rotated_fc in enumerate(rotated_flat)}
+                     for rotated_flat in ROTATED_FLAT]
+
+
+'''
+    Packed move lists store a game in about one byte per move, for the move_list column of game_list.
+
+    Each flat code gets a packed code, the points furthest from the edge first, so the 255 central points that
+    most moves are played on have codes 0 - 254. Those are stored as one byte. Codes 255 - 361, the first line,
+    34 of the 64 points of the second line and the pass, are stored as PACKED_ESCAPE followed by code - 255.
+'''
+PACKED_ESCAPE = 255
+PACKED_FLAT_FOR_CODE = sorted(range(PASS_FLAT), key=lambda fc: (-min(fc % 19, fc // 19, 18 - fc % 19, 18 - fc // 19),
+                                                                  fc)) + [PASS_FLAT]
+PACKED_CODE_FOR_FLAT = [0] * len(PACKED_FLAT_FOR_CODE)
+for _code, _fc in enumerate(PACKED_FLAT_FOR_CODE):
+    PACKED_CODE_FOR_FLAT[_fc] = _code
+
+'''
+    Convert a move pair list ['dd', 'dp', 'tt'] to packed bytes
+    Raises: ValueError
+'''
+def pack_move_pair_list(move_pair_list):
+    packed = bytearray()
+    for move_pair in move_pair_list:
+        code = PACKED_CODE_FOR_FLAT[convert_move_pair_to_flat(move_pair)]
+        if code < PACKED_ESCAPE:
+            packed.append(code)
+        else:
+            packed.append(PACKED_ESCAPE)
+            packed.append(code - PACKED_ESCAPE)
+    return bytes(packed)
+
+'''
+    Convert packed moves to a list of flat codes, packed can be bytes, a memoryview or an array('B'),
+    the bytes are read as they are without a copy
+'''
+def unpack_flat_moves(packed):
+    flat_for_code = PACKED_FLAT_FOR_CODE
+    if PACKED_ESCAPE not in packed:
+        return [flat_for_code[code] for code in packed]
+
+    flat_moves = []
+    escaped = False
+    for code in packed:
+        if escaped:
+            flat_moves.append(flat_for_code[PACKED_ESCAPE + code])
+            escaped = False
+        elif code == PACKED_ESCAPE:
+            escaped = True
+        else:
+            flat_moves.append(flat_for_code[code])
+    return flat_moves
+
+'''
+    The move_list column of game_list holds a move string or packed bytes, these return either one as
+    a move pair list or as a list of flat codes
+'''
+def convert_stored_move_list_to_pair_list(stored_move_list):
+    if isinstance(stored_move_list, str):
+        return convert_move_string_to_pair_list(stored_move_list)
+    return [FLAT_TO_MOVE_PAIR[fc] for fc in unpack_flat_moves(memoryview(stored_move_list))]
+
+def convert_stored_move_list_to_flat_moves(stored_move_list):
+    if isinstance(stored_move_list, str):
+        return convert_move_pair_list_to_flat_moves(convert_move_string_to_pair_list(stored_move_list))
+    return unpack_flat_moves(memoryview(stored_move_list))
+
+
 '''
     Given two move strings A and B, test if A is a rotation of B
     Return the rotation number needed to transform move string A to move string B
@@ -77,23 +207,21 @@ def are_move_pair_lists_rotations(mpl_a, mpl_b):
     return -1
 
 
+'''
+    Transforms move_pair to the given rotation number, upper case is accepted and any move with a 't' or ' ' is
+    a pass, 'tt'. Returns the rotated move in lower case.
+    Raises ValueError if charx or chary out of range.
+'''
 def transform_move_pair(move_pair, rotation):
-    charx, chary = move_pair.lower()
-    if charx == 't' or chary == 't' or charx == ' ' or chary == ' ':
-        return 'tt'
-    # Convert to numeric coordinates and zero center
-    x = ('abcdefghijklmnopqrs'.index(charx)) - 9
-    y = ('abcdefghijklmnopqrs'.index(chary)) - 9
-
-    # Rotate zero based coords
-    tx = coord_transformations[rotation][0][0] * x + coord_transformations[rotation][0][1] * y
-    ty = coord_transformations[rotation][1][0] * x + coord_transformations[rotation][1][1] * y
-
-    # Convert back to move_pair
-    rot_charx = chr(tx + 9 + ord('a'))
-    rot_chary = chr(ty + 9 + ord('a'))
-
-    return rot_charx + rot_chary
+    rotated = ROTATED_MOVE_PAIR[rotation].get(move_pair)
+    if rotated is None:
+        charx, chary = move_pair.lower()
+        if charx in ('t', ' ') or chary in ('t', ' '):
+            return 'tt'
+        rotated = ROTATED_MOVE_PAIR[rotation].get(charx + chary)
+        if rotated is None:
+            raise ValueError(f'move cannot be transformed - [{move_pair}]')
+    return rotated
 
 '''
     Transforms move_pair_list to the given rotation number
@@ -103,29 +231,32 @@ def transform_move_pair(move_pair, rotation):
 def transform_move_pair_list(move_pair_list, rotation):
     if rotation == 0:
         return move_pair_list
+    rotated_move_pair = ROTATED_MOVE_PAIR[rotation]
+    try:
+        return [rotated_move_pair[move_pair] for move_pair in move_pair_list]
+    except KeyError:
+        pass
+
+    # Passes other than 'tt', or a move that is not valid
     rotated_moves = []
     for charx, chary in move_pair_list:
         # 'tt' is a pass and is not rotated
         if charx == 't' or chary == 't':
             rotated_moves.append('tt')
             continue
-
-        # Convert to numeric coordinates and zero center
-        x = ('abcdefghijklmnopqrs'.index(charx)) - 9
-        y = ('abcdefghijklmnopqrs'.index(chary)) - 9
-
-
-        # Rotate zero based coords
-        tx = coord_transformations[rotation][0][0] * x + coord_transformations[rotation][0][1] * y
-        ty = coord_transformations[rotation][1][0] * x + coord_transformations[rotation][1][1] * y
-
-        # Convert back to move_pair
-        rot_charx = chr(tx + 9 + ord('a'))
-        rot_chary = chr(ty + 9 + ord('a'))
-        rotated_moves.append(rot_charx + rot_chary)
-
+        rotated = rotated_move_pair.get(charx + chary)
+        if rotated is None:
+            raise ValueError(f'move cannot be transformed - [{charx + chary}]')
+        rotated_moves.append(rotated)
     return rotated_moves
 
+'''
+    Transforms a list of flat codes to the given rotation number, a pass stays a pass
+'''
+def transform_flat_moves(flat_moves, rotation):
+    rotated_flat = ROTATED_FLAT[rotation]
+    return [rotated_flat[fc] for fc in flat_moves]
+
 '''
     Transforms move_string to the given rotation number
     Returns rotated moves.
@@ -13,7 +13,23 @@
 
         TODO Rewrite for more speed.
             Consider caching moves -> positions in SQL for fast lookup of known positions?
-            Instead of calling find_reached() for every move, cache groups and liberty counts, update during move.
+
+    Incremental chains:
+
+    Position keeps a chain id for every stone and the stones and liberties of every chain, and updates them as each
+    move is played. Captures, ko and suicide only look at the chains next to the move, and the work is proportional to
+    the stones that are merged or removed. The original find_reached() version is kept as NaivePosition, run
+    benchmarks.bench_position to compare the two on a tgz of games. Unlike NaivePosition, Position enforces ko and a
+    pass clears the ko point.
+
+    Replay board:
+
+    Position and PositionSimple return a new object for every move, the rebuilds, import and the duplicate check only
+    ever look at the last one. They replay on a ReplayBoard instead, one mutable board that plays and undoes moves in
+    place with the rules of Position, or places stones like PositionSimple. On TestSGF.tgz (benchmarks.bench_replay)
+
+        Position         8.12us/move  7328 bytes allocated/move    ReplayBoard             1.79us/move  252 bytes/move
+        PositionSimple   1.15us/move   964 bytes allocated/move    ReplayBoard, no rules   0.67us/move  107 bytes/move
 
     Old speed fix for fast duplicate game check:
 
@@ -44,6 +60,7 @@
 """
 
 from collections import namedtuple
+import random
 import game_of_go.coords as coords
 
 N = 19
@@ -51,6 +68,9 @@ NN = N ** 2
 WHITE, BLACK, EMPTY = 'O', 'X', '.'
 
 EMPTY_BOARD = EMPTY * NN
+PASS = coords.PASS_FLAT  # flat code of a pass for play_flat_move()
+BYTE_EMPTY = ord(EMPTY)
+BYTE_OPPONENT = {ord(BLACK): ord(WHITE), ord(WHITE): ord(BLACK)}
 
 
 def swap_colors(color):
@@ -71,6 +91,17 @@ def unflatten(fc):
     return divmod(fc, N)
 
 
+# Returns the flat code of a two letter move from the coords tables, any move with a 't' is a PASS
+def decode_move_pair(two_letter_move):
+    fc = coords.MOVE_PAIR_TO_FLAT.get(two_letter_move)
+    if fc is None:
+        try:
+            fc = coords.convert_move_pair_to_flat(two_letter_move)
+        except (TypeError, ValueError):
+            raise IllegalMove("Move %s cannot be decoded." % (two_letter_move))
+    return fc
+
+
 def is_on_board(c):
     return c[0] % N == c[0] and c[1] % N == c[1]
 
@@ -181,19 +212,80 @@ def build_position_from_move_pair_list(move_pair_list, rotation=0):
 
     return p
 
+# Plays the moves once, the position keeps the hash of all 8 rotations
 def build_all_rotation_hashes_from_move_list(move_list):
-    return [
-        get_hash_for_board(
-            build_position_from_move_pair_list(move_list, rotation).get_board()
-        )
-        for rotation in range(8)
-    ]
+    return build_position_from_move_pair_list(move_list).get_rotation_hashes()
+
+# Returns the smallest hash of the 8 rotations, the same for every rotation of a position
+def build_canonical_hash_from_move_list(move_list):
+    return build_position_from_move_pair_list(move_list).get_canonical_hash()
+
+# Yields (move_number, canonical_hash, canonical_next_move) for the positions after each of the first depth moves,
+# the next move is transformed by the canonical rotation and is 'tt' after the last move of the game.
+# Raises IllegalMove, the rows of the moves before it have already been yielded
+def build_canonical_hash_rows_from_move_list(move_list, depth):
+    p = ReplayBoard()
+    color = BLACK
+
+    for move_number, move in enumerate(move_list[:depth], 1):
+        p.play_move(move, color)
+        color = swap_colors(color)
+        canonical_hash, rotation = p.get_canonical_rotation()
+        if move_number < len(move_list):
+            next_move = coords.transform_move_pair(move_list[move_number], rotation)
+        else:
+            next_move = 'tt'
+        yield move_number, canonical_hash, next_move
+
+# Same as build_canonical_hash_rows_from_move_list() for a list of flat codes
+def build_canonical_hash_rows_from_flat_moves(flat_moves, depth):
+    p = ReplayBoard()
+    color = BLACK
+
+    for move_number, fc in enumerate(flat_moves[:depth], 1):
+        p.play_flat_move(fc, color)
+        color = swap_colors(color)
+        canonical_hash, rotation = p.get_canonical_rotation()
+        if move_number < len(flat_moves):
+            next_move = coords.FLAT_TO_MOVE_PAIR[coords.ROTATED_FLAT[rotation][flat_moves[move_number]]]
+        else:
+            next_move = 'tt'
+        yield move_number, canonical_hash, next_move
 
 def build_hash_from_move_list(move_list, rotation=0):
     position = build_position_from_move_pair_list(move_list, rotation)
-    return get_hash_for_board(position.get_board())
+    return position.get_hash()
+
+
+# Replays the moves on one ReplayBoard, with rules=False the stones are placed like PositionSimple
+# Raises IllegalMove
+def build_replayboard_from_flat_moves(flat_moves, rules=True):
+    p = ReplayBoard()
+    play = p.play_flat_move if rules else p.place_flat_stone
+    color = BLACK
+    for fc in flat_moves:
+        play(fc, color)
+        color = swap_colors(color)
+    return p
+
+# Raises IllegalMove
+def build_replayboard_from_move_pair_list(move_pair_list, rules=True):
+    try:
+        flat_moves = coords.convert_move_pair_list_to_flat_moves(move_pair_list)
+    except ValueError as e:
+        raise IllegalMove(str(e))
+    return build_replayboard_from_flat_moves(flat_moves, rules)
 
 
+# Raises IllegalMove
+def build_positionsimple_from_flat_moves(flat_moves):
+    p = PositionSimple.initial_state()
+    color = BLACK
+    for fc in flat_moves:
+        p = p.play_flat_move(fc, color)
+        color = swap_colors(color)
+    return p
+
 # Raises IllegalMove
 def build_positionsimple_from_move_pair_list(move_pair_list, rotation=0):
     p = PositionSimple.initial_state()
@@ -228,7 +320,20 @@ def are_move_strings_rotated_positions(move_string_a, move_string_b):
 
 
 # board is from Position.get_board(), a 361 character string representing a go board in flat coordinates
+# Scans the whole board, Position and PositionSimple keep the same hash up to date in get_hash()
 def get_hash_for_board(board):
+    hash = 0
+    for i in range(361):
+        if board[i] == BLACK:
+            hash ^= zobrist_black[i]
+        elif board[i] == WHITE:
+            hash ^= zobrist_white[i]
+    return hash
+
+
+# The hash scheme used before Zobrist hashing, a sum of const_hash_list. Different boards can add up to the same
+# hash, only kept so benchmarks.bench_hashing can compare collisions between the two schemes.
+def get_additive_hash_for_board(board):
     hash = 0
     for i in range(361):
         if board[i] == BLACK:
@@ -241,14 +346,177 @@ def get_hash_for_board(board):
 
 
 
-class Position(namedtuple('Position', ['board', 'ko'])):
+'''
+    Position keeps every chain of stones and its liberties up to date as moves are played, so a move only
+    touches the stones next to it instead of flood filling every neighboring chain with find_reached().
+
+        board       bytearray of NN, one color character per point
+        ko          flat coordinate that cannot be played on the next move, or None
+        chain_id    list of NN, the id of the chain each stone belongs to, None for empty points
+        chains      dict of chain_id -> (stones, liberties), stones is a tuple and liberties a frozenset
+        symmetric_hash  Zobrist hashes of the board in all 8 rotations packed into one int, see get_rotation_hashes()
+
+    A chain id is the flat coordinate of one of its stones. When chains merge the largest keeps its id and the
+    smaller ones are relabeled. play_move() copies the three containers and never modifies the old ones, so a
+    Position can still be kept around after a move like the namedtuple version.
+'''
+class Position(object):
+    __slots__ = ('board', 'ko', 'chain_id', 'chains', 'symmetric_hash')
+
+    def __init__(self, board, ko, chain_id, chains, symmetric_hash):
+        self.board = board
+        self.ko = ko
+        self.chain_id = chain_id
+        self.chains = chains
+        self.symmetric_hash = symmetric_hash
+
     @staticmethod
     def initial_state():
-        return Position(board=EMPTY_BOARD, ko=None)
+        return Position(bytearray(EMPTY_BOARD, encoding='ascii'), None, [None] * NN, {}, 0)
+
+    def get_board(self):
+        return self.board.decode('ascii')
+
+    def get_hash(self):
+        return self.symmetric_hash & HASH_MASK
+
+    def get_rotation_hashes(self):
+        return unpack_rotation_hashes(self.symmetric_hash)
+
+    def get_canonical_hash(self):
+        return min(unpack_rotation_hashes(self.symmetric_hash))
+
+    def get_canonical_rotation(self):
+        return get_canonical_rotation(self.symmetric_hash)
+
+    def __str__(self):
+        import textwrap
+        return '\n'.join(textwrap.wrap(self.get_board(), N))
+
+    def play_move(self, two_letter_move, color):
+        return self.play_flat_move(decode_move_pair(two_letter_move), color)
+
+    # fc is a flat coordinate 0 - 360 or PASS, as decoded from packed moves by coords.unpack_flat_moves()
+    def play_flat_move(self, fc, color):
+        if fc == PASS:
+            # A pass changes nothing on the board but ends any ko
+            return Position(self.board, None, self.chain_id, self.chains, self.symmetric_hash)
+
+        if fc == self.ko:
+            raise IllegalMove("Move at %s illegally retakes ko." % (fc))
+
+        board = self.board
+        if board[fc] != BYTE_EMPTY:
+            raise IllegalMove("Stone exists at %s." % (fc))
+
+        my_color = ord(color)
+        chain_id = self.chain_id
+        liberties = set()
+        friendly = set()
+        enemy = set()
+        for fn in NEIGHBORS[fc]:
+            neighbor = board[fn]
+            if neighbor == BYTE_EMPTY:
+                liberties.add(fn)
+            elif neighbor == my_color:
+                friendly.add(chain_id[fn])
+            else:
+                enemy.add(chain_id[fn])
+
+        new_board = board[:]
+        new_board[fc] = my_color
+        new_chain_id = chain_id[:]
+        new_chains = self.chains.copy()
+        new_hash = self.symmetric_hash ^ symmetric_keys_by_byte[my_color][fc]
+
+        # Take the liberty away from each enemy chain, a chain left with no liberties is captured
+        captured = []
+        for cid in enemy:
+            stones, libs = new_chains[cid]
+            if len(libs) == 1:
+                del new_chains[cid]
+                captured.extend(stones)
+            else:
+                new_chains[cid] = (stones, libs - {fc})
+
+        # Join the new stone to the friendly chains, the largest chain keeps its id
+        if friendly:
+            if len(friendly) == 1:
+                root = next(iter(friendly))
+            else:
+                root = max(friendly, key=lambda cid: len(new_chains[cid][0]))
+            stones = new_chains[root][0] + (fc,)
+            for cid in friendly:
+                chain_stones, chain_libs = new_chains.pop(cid)
+                liberties |= chain_libs
+                if cid != root:
+                    stones += chain_stones
+                    for fs in chain_stones:
+                        new_chain_id[fs] = root
+            liberties.discard(fc)
+        else:
+            root = fc
+            stones = (fc,)
+        new_chain_id[fc] = root
+
+        # Remove captured stones, each one becomes a liberty for the chains of ours touching it
+        if captured:
+            opp_keys = symmetric_keys_by_byte[board[captured[0]]]
+            for fs in captured:
+                new_board[fs] = BYTE_EMPTY
+                new_chain_id[fs] = None
+                new_hash ^= opp_keys[fs]
+            gained = {}
+            for fs in captured:
+                for fn in NEIGHBORS[fs]:
+                    if new_board[fn] == my_color:
+                        cid = new_chain_id[fn]
+                        if cid == root:
+                            liberties.add(fs)
+                        else:
+                            gained.setdefault(cid, set()).add(fs)
+            for cid, gained_libs in gained.items():
+                chain_stones, chain_libs = new_chains[cid]
+                new_chains[cid] = (chain_stones, chain_libs | gained_libs)
+
+        if not liberties:
+            raise IllegalMove("Move at %s is suicide." % (fc))
+        new_chains[root] = (stones, frozenset(liberties))
+
+        # A single stone that captured a single stone and has only that point as a liberty starts a ko
+        if len(captured) == 1 and len(stones) == 1 and len(liberties) == 1:
+            new_ko = captured[0]
+        else:
+            new_ko = None
+
+        return Position(new_board, new_ko, new_chain_id, new_chains, new_hash)
+
+    def score(self):
+        return NaivePosition(self.get_board(), self.ko).score()
+
+    def get_liberties(self):
+        liberties = bytearray(NN)
+        for stones, libs in self.chains.values():
+            for fs in stones:
+                liberties[fs] = len(libs)
+        return list(liberties)
+
+
+'''
+    The original Position from go_naive.py, calls find_reached() on every neighbor of every move.
+    Kept as a reference implementation for benchmarks and rule checks against Position.
+'''
+class NaivePosition(namedtuple('NaivePosition', ['board', 'ko'])):
+    @staticmethod
+    def initial_state():
+        return NaivePosition(board=EMPTY_BOARD, ko=None)
 
     def get_board(self):
         return self.board
 
+    def get_hash(self):
+        return get_hash_for_board(self.board)
+
     def __str__(self):
         import textwrap
         return '\n'.join(textwrap.wrap(self.board, N))
@@ -303,7 +571,7 @@ class Position(namedtuple('Position', ['board', 'ko'])):
         else:
             new_ko = None
 
-        return Position(new_board, new_ko)
+        return NaivePosition(new_board, new_ko)
 
     def score(self):
         board = self.board
@@ -333,34 +601,203 @@ class Position(namedtuple('Position', ['board', 'ko'])):
         return list(liberties)
 
 
-class PositionSimple(namedtuple('Position', ['board', 'ko'])):
+class PositionSimple(namedtuple('PositionSimple', ['board', 'ko', 'symmetric_hash'])):
     @staticmethod
     def initial_state():
-        return PositionSimple(board=EMPTY_BOARD, ko=None)
+        return PositionSimple(board=EMPTY_BOARD, ko=None, symmetric_hash=0)
 
     def get_board(self):
         return self.board
 
+    def get_hash(self):
+        return self.symmetric_hash & HASH_MASK
+
+    def get_rotation_hashes(self):
+        return unpack_rotation_hashes(self.symmetric_hash)
+
+    def get_canonical_hash(self):
+        return min(unpack_rotation_hashes(self.symmetric_hash))
+
     def __str__(self):
         import textwrap
         return '\n'.join(textwrap.wrap(self.board, N))
 
-    # Flatten expects y,x
+    # Decoding the move is the only place we can raise IllegalMove()
     def play_move(self, two_letter_move, color):
-        board, ko = self
+        return self.play_flat_move(decode_move_pair(two_letter_move), color)
+
+    def play_flat_move(self, fc, color):
+        if fc == PASS:
+            return self
+        board, ko, symmetric_hash = self
+
+        # Create a new board and return it with no ko, a stone played on top of another replaces it in the hash
+        old_color = board[fc]
+        if old_color != EMPTY:
+            symmetric_hash ^= symmetric_keys[old_color][fc]
+        symmetric_hash ^= symmetric_keys[color][fc]
+        new_board = place_stone(color, board, fc)
+        return PositionSimple(new_board, None, symmetric_hash)
+
+
+'''
+    ReplayBoard is one mutable board for replaying games when the earlier positions are never looked at again,
+    as in the rebuilds, import and the duplicate check. Moves change the board in place instead of returning a
+    new Position, so a move allocates only its journal entry, the new hash and the small lists of the chains it
+    looks at, and not a copy of the board.
+
+        board           bytearray of NN, one color character per point
+        ko              flat coordinate that cannot be played on the next move, or None
+        symmetric_hash  the packed hash of all 8 rotations, the same value Position keeps
+        journal         one (fc, old point, captured stones, old ko, old hash) entry per move for undo()
+
+    play_flat_move() follows the same rules as Position and raises IllegalMove without changing the board.
+    Chains are not stored, a move flood fills only the chains next to it and stops at the first liberty.
+    place_flat_stone() puts a stone down without any rules like PositionSimple and gives the same hashes.
+'''
+class ReplayBoard(object):
+    __slots__ = ('board', 'ko', 'symmetric_hash', 'journal', '_marks', '_stamp')
+
+    def __init__(self):
+        self.board = bytearray(EMPTY_BOARD, encoding='ascii')
+        self.ko = None
+        self.symmetric_hash = 0
+        self.journal = []
+        self._marks = [0] * NN  # points visited by the current flood fill have the value of _stamp
+        self._stamp = 0
 
-        # Decode the move into an FC, ths is the only place we can raise IllegalMove()
-        try:
-            if two_letter_move[0] == 't' or two_letter_move[1] == 't':
-                return self
-            fc = flatten(
-                ('abcdefghijklmnopqrs'.index(two_letter_move[1]), 'abcdefghijklmnopqrs'.index(two_letter_move[0])))
-        except (IndexError, ValueError):
-            raise IllegalMove("Move %s cannot be decoded." % (two_letter_move))
+    def get_board(self):
+        return self.board.decode('ascii')
 
-        # Create a new board and return it with no ko
-        new_board = place_stone(color, board, fc)
-        return PositionSimple(new_board, None)
+    def get_hash(self):
+        return self.symmetric_hash & HASH_MASK
+
+    def get_rotation_hashes(self):
+        return unpack_rotation_hashes(self.symmetric_hash)
+
+    def get_canonical_hash(self):
+        return min(unpack_rotation_hashes(self.symmetric_hash))
+
+    def get_canonical_rotation(self):
+        return get_canonical_rotation(self.symmetric_hash)
+
+    def __str__(self):
+        import textwrap
+        return '\n'.join(textwrap.wrap(self.get_board(), N))
+
+    # Raises IllegalMove
+    def play_move(self, two_letter_move, color):
+        self.play_flat_move(decode_move_pair(two_letter_move), color)
+
+    # Raises IllegalMove
+    def place_stone(self, two_letter_move, color):
+        self.place_flat_stone(decode_move_pair(two_letter_move), color)
+
+    # fc is a flat coordinate 0 - 360 or PASS, raises IllegalMove and leaves the board as it was
+    def play_flat_move(self, fc, color):
+        old_ko = self.ko
+        old_hash = self.symmetric_hash
+        if fc == PASS:
+            self.journal.append((PASS, BYTE_EMPTY, (), old_ko, old_hash))
+            self.ko = None
+            return
+
+        if fc == old_ko:
+            raise IllegalMove("Move at %s illegally retakes ko." % (fc))
+
+        board = self.board
+        if board[fc] != BYTE_EMPTY:
+            raise IllegalMove("Stone exists at %s." % (fc))
+
+        my_color = ord(color)
+        opp_color = BYTE_OPPONENT[my_color]
+        board[fc] = my_color
+        new_hash = old_hash ^ symmetric_keys_by_byte[my_color][fc]
+
+        captured = ()
+        for fn in NEIGHBORS[fc]:
+            if board[fn] == opp_color:
+                chain = self.find_chain_without_liberties(fn)
+                if chain is not None:
+                    opp_keys = symmetric_keys_by_byte[opp_color]
+                    for fs in chain:
+                        board[fs] = BYTE_EMPTY
+                        new_hash ^= opp_keys[fs]
+                    captured = captured + chain if captured else chain
+
+        if not captured and self.find_chain_without_liberties(fc) is not None:
+            board[fc] = BYTE_EMPTY
+            raise IllegalMove("Move at %s is suicide." % (fc))
+
+        # A single stone that captured a single stone and has only that point as a liberty starts a ko
+        new_ko = None
+        if len(captured) == 1:
+            neighbors = [board[fn] for fn in NEIGHBORS[fc]]
+            if my_color not in neighbors and neighbors.count(BYTE_EMPTY) == 1:
+                new_ko = captured[0]
+
+        self.journal.append((fc, BYTE_EMPTY, captured, old_ko, old_hash))
+        self.ko = new_ko
+        self.symmetric_hash = new_hash
+
+    # Same as PositionSimple.play_flat_move(), no captures, ko or suicide and a stone can replace another
+    def place_flat_stone(self, fc, color):
+        old_hash = self.symmetric_hash
+        if fc == PASS:
+            self.journal.append((PASS, BYTE_EMPTY, (), self.ko, old_hash))
+            return
+
+        board = self.board
+        old_point = board[fc]
+        my_color = ord(color)
+        new_hash = old_hash ^ symmetric_keys_by_byte[my_color][fc]
+        if old_point != BYTE_EMPTY:
+            new_hash ^= symmetric_keys_by_byte[old_point][fc]
+        board[fc] = my_color
+
+        self.journal.append((fc, old_point, (), self.ko, old_hash))
+        self.ko = None
+        self.symmetric_hash = new_hash
+
+    # Takes back the last move, raises IndexError if there is none
+    def undo(self):
+        fc, old_point, captured, old_ko, old_hash = self.journal.pop()
+        if fc != PASS:
+            board = self.board
+            if captured:
+                opp_color = BYTE_OPPONENT[board[fc]]
+                for fs in captured:
+                    board[fs] = opp_color
+            board[fc] = old_point
+        self.ko = old_ko
+        self.symmetric_hash = old_hash
+
+    def get_move_count(self):
+        return len(self.journal)
+
+    '''
+        Returns the list of stones of the chain at fc if it has no liberties, or None as soon as a liberty is found
+    '''
+    def find_chain_without_liberties(self, fc):
+        board = self.board
+        color = board[fc]
+        marks = self._marks
+        self._stamp += 1
+        stamp = self._stamp
+        marks[fc] = stamp
+        chain = [fc]
+        # chain is also the list of stones still to visit, index walks it
+        index = 0
+        while index < len(chain):
+            for fn in NEIGHBORS[chain[index]]:
+                point = board[fn]
+                if point == BYTE_EMPTY:
+                    return None
+                if point == color and marks[fn] != stamp:
+                    marks[fn] = stamp
+                    chain.append(fn)
+            index += 1
+        return chain
 
 
 const_hash_list = [840137363, 1899467765, 2245934378, 165313342, 2754462454, 714355976, 4098738971, 4006584887,
@@ -409,3 +846,60 @@ const_hash_list = [840137363, 1899467765, 2245934378, 165313342, 2754462454, 714
                    2725919425, 1128318170, 215383668, 3844272023, 3775815883, 2067084053, 1214945249, 1371360989,
                    2132683990, 1217601152, 1525159386, 4227669814, 2660244675, 3030184365, 1914212585, 1564074740]
 
+
+'''
+    Zobrist hash keys, one random 63 bit number for every point and color. A board hash is the XOR of the keys of
+    every stone on it, so placing or capturing a stone updates the hash with a single XOR. 63 bits keeps every hash
+    a positive value that fits in an sqlite INTEGER. The generator is seeded so every run builds the same keys.
+
+    HASH_SCHEME is saved in the database metadata, databases built with another scheme need migrate_database().
+    hash_list stores the canonical hash of each position with the next move rotated into the canonical rotation.
+'''
+HASH_SCHEME = 'zobrist63-canonical'
+
+_zobrist_random = random.Random(19)
+zobrist_black = [_zobrist_random.getrandbits(63) for _ in range(NN)]
+zobrist_white = [_zobrist_random.getrandbits(63) for _ in range(NN)]
+zobrist_keys = {BLACK: zobrist_black, WHITE: zobrist_white}
+
+
+'''
+    Symmetric hashing
+
+    The 8 rotations of coords.coord_transformations are fixed permutations of the flat coordinates, ROTATED_FLAT[r][fc]
+    is where fc lands in rotation r. The hash of rotation r of a board is the XOR of the keys of its stones at their
+    rotated points, so Position keeps all 8 hashes up to date while playing the moves once.
+
+    The 8 hashes are packed into one int, 64 bits per rotation with rotation 0 in the lowest bits. XOR works on every
+    packed hash at once without carries, so a stone still costs a single XOR with symmetric_keys[color][fc].
+    Rotation r of the packed hash is the same as get_hash() of the position built from the moves rotated by r.
+'''
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+
+
+# The points of coords.ROTATED_FLAT without the pass
+ROTATED_FLAT = [rotated_flat[:NN] for rotated_flat in coords.ROTATED_FLAT]
+
+
+def pack_symmetric_keys(keys):
+    return [
+        sum(keys[ROTATED_FLAT[rotation][fc]] << (HASH_BITS * rotation) for rotation in range(8))
+        for fc in range(NN)
+    ]
+
+
+symmetric_keys = {BLACK: pack_symmetric_keys(zobrist_black), WHITE: pack_symmetric_keys(zobrist_white)}
+symmetric_keys_by_byte = {ord(BLACK): symmetric_keys[BLACK], ord(WHITE): symmetric_keys[WHITE]}
+
+
+# Returns a list of the 8 rotation hashes packed in symmetric_hash, index is the rotation number
+def unpack_rotation_hashes(symmetric_hash):
+    return [(symmetric_hash >> (HASH_BITS * rotation)) & HASH_MASK for rotation in range(8)]
+
+
+# Returns (canonical hash, rotation), the smallest of the 8 hashes and the first rotation that has it
+def get_canonical_rotation(symmetric_hash):
+    hashes = unpack_rotation_hashes(symmetric_hash)
+    canonical_hash = min(hashes)
+    return canonical_hash, hashes.index(canonical_hash)
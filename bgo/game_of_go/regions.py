@@ -0,0 +1,166 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    regions.py
+        Hashes of the stones in the corners and on the sides of the board, so a joseki matches wherever it was
+        played and whatever the rest of the board looks like.
+
+        A region is a size x size window, the 4 corners and a window centered on each of the 4 sides. The hash of a
+        region is the packed symmetric hash of game_of_go of only the stones inside it, so it has all 8 rotations
+        like the hash of a whole board. The rotations that move the region onto the canonical region of its kind,
+        the top left corner or the top side, are the 2 frames the stones can be seen in from that region. The
+        canonical hash is the smallest hash of those rotations, the same for a pattern in any corner, mirrored
+        or not. Corners and sides are told apart by their kind.
+
+        RegionHasher keeps the hashes of all regions up to date from the stones that a ReplayBoard move places and
+        captures, a stone costs one XOR for each region it is in.
+'''
+
+from collections import namedtuple
+
+import game_of_go.coords as coords
+import game_of_go.game_of_go as game_of_go
+
+
+DEFAULT_REGION_SIZE = 9
+
+CORNER, SIDE = 0, 1
+KIND_NAMES = ['corner', 'side']
+
+# to_canonical are the rotations that move the points of the region onto the canonical region of its kind
+Region = namedtuple('Region', ['name', 'kind', 'points', 'to_canonical'])
+
+
+class RegionSet(object):
+
+    def __init__(self, size):
+        if not 2 <= size <= game_of_go.N:
+            raise ValueError(f'region size must be between 2 and {game_of_go.N} - [{size}]')
+
+        self.size = size
+        side_start = (game_of_go.N - size) // 2
+        canonical_points = {
+            CORNER: frozenset(y * game_of_go.N + x for y in range(size) for x in range(size)),
+            SIDE: frozenset(y * game_of_go.N + x for y in range(size) for x in range(side_start, side_start + size)),
+        }
+
+        self.regions = []
+        for kind in (CORNER, SIDE):
+            canonical = canonical_points[kind]
+            for rotation in range(8):
+                points = frozenset(game_of_go.ROTATED_FLAT[rotation][fc] for fc in canonical)
+                if any(region.points == points for region in self.regions):
+                    continue
+                to_canonical = [r for r in range(8)
+                                if frozenset(game_of_go.ROTATED_FLAT[r][fc] for fc in points) == canonical]
+                self.regions.append(Region(get_region_name(kind, points), kind, points, to_canonical))
+
+        # The rotation other than 0 that moves each canonical region onto itself, it mirrors the region
+        self.mirror = {kind: next(r for r in range(1, 8) if frozenset(
+            game_of_go.ROTATED_FLAT[r][fc] for fc in canonical_points[kind]) == canonical_points[kind])
+                       for kind in (CORNER, SIDE)}
+
+        self.regions_for_point = [[index for index, region in enumerate(self.regions) if fc in region.points]
+                                  for fc in range(game_of_go.NN)]
+        self.index_for_name = {region.name: index for index, region in enumerate(self.regions)}
+
+    '''
+        Returns (canonical_hash, rotation, symmetric) of a packed symmetric hash of the stones of region index.
+        rotation is the first rotation of the region that gives the canonical hash, symmetric is True if the
+        stones look the same mirrored, then both frames give it.
+    '''
+    def get_canonical_rotation(self, index, symmetric_hash):
+        best_hash = None
+        best_rotation = None
+        symmetric = False
+        for rotation in self.regions[index].to_canonical:
+            rotation_hash = (symmetric_hash >> (game_of_go.HASH_BITS * rotation)) & game_of_go.HASH_MASK
+            if best_hash is None or rotation_hash < best_hash:
+                best_hash, best_rotation, symmetric = rotation_hash, rotation, False
+            elif rotation_hash == best_hash:
+                symmetric = True
+        return best_hash, best_rotation, symmetric
+
+    '''
+        Returns the packed symmetric hash of the stones of region index on the board bytearray of a ReplayBoard or
+        Position
+    '''
+    def get_symmetric_hash_for_board(self, index, board):
+        symmetric_hash = 0
+        for fc in self.regions[index].points:
+            if board[fc] != game_of_go.BYTE_EMPTY:
+                symmetric_hash ^= game_of_go.symmetric_keys_by_byte[board[fc]][fc]
+        return symmetric_hash
+
+
+_region_sets = {}
+
+def get_region_set(size=DEFAULT_REGION_SIZE):
+    if size not in _region_sets:
+        _region_sets[size] = RegionSet(size)
+    return _region_sets[size]
+
+
+# Names the region by the edges it touches, 'tl' is the corner at aa and 'top' the side along the a row
+def get_region_name(kind, points):
+    last = game_of_go.N - 1
+    edges = ''
+    if any(fc // game_of_go.N == 0 for fc in points):
+        edges += 't'
+    if any(fc // game_of_go.N == last for fc in points):
+        edges += 'b'
+    if any(fc % game_of_go.N == 0 for fc in points):
+        edges += 'l'
+    if any(fc % game_of_go.N == last for fc in points):
+        edges += 'r'
+    if kind == CORNER:
+        return edges
+    return {'t': 'top', 'b': 'bottom', 'l': 'left', 'r': 'right'}[edges]
+
+
+class RegionHasher(object):
+    __slots__ = ('region_set', 'hashes')
+
+    def __init__(self, region_set):
+        self.region_set = region_set
+        self.hashes = [0] * len(region_set.regions)
+
+    # Adds or removes a stone, point is the byte of its color as on a ReplayBoard
+    def toggle_stone(self, fc, point):
+        key = game_of_go.symmetric_keys_by_byte[point][fc]
+        hashes = self.hashes
+        for index in self.region_set.regions_for_point[fc]:
+            hashes[index] ^= key
+
+    # Follows the last move played on board, call it after every move
+    def follow_move(self, board):
+        fc, _, captured, _, _ = board.journal[-1]
+        if fc == game_of_go.PASS:
+            return
+        point = board.board[fc]
+        self.toggle_stone(fc, point)
+        if captured:
+            captured_point = game_of_go.BYTE_OPPONENT[point]
+            for fs in captured:
+                self.toggle_stone(fs, captured_point)
+
+
+'''
+    Yields (kind, canonical_hash, color, canonical_next_move) for every move of the first depth moves that is played
+    inside a region, once for each region it is in. canonical_hash is the region before the move and
+    canonical_next_move the flat code of the move in the canonical frame of the region.
+    Raises: IllegalMove, after the rows of the moves before it
+'''
+def build_region_move_rows_from_flat_moves(flat_moves, depth, region_set):
+    board = game_of_go.ReplayBoard()
+    hasher = RegionHasher(region_set)
+    color = game_of_go.BLACK
+
+    for fc in flat_moves[:depth]:
+        board.play_flat_move(fc, color)
+        if fc != game_of_go.PASS:
+            for index in region_set.regions_for_point[fc]:
+                region_hash, rotation, _ = region_set.get_canonical_rotation(index, hasher.hashes[index])
+                yield region_set.regions[index].kind, region_hash, color, coords.ROTATED_FLAT[rotation][fc]
+        hasher.follow_move(board)
+        color = game_of_go.swap_colors(color)
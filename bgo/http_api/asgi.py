@@ -0,0 +1,258 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    asgi.py
+        The api of flask.py as a plain ASGI app, for an ASGI server such as uvicorn:
+
+            uvicorn http_api.asgi:app
+            python -m http_api.asgi [--database database.sqlite] [--port 5000] [--threads 8]
+
+        GET /api/nextmove/<moves>, GET /api/nextmove for the empty board, POST /api/nextmove (batch.py) and
+        GET /api/games (games.py) answer the same JSON as flask.py. The event loop only parses requests and writes
+        responses, the replay and the sqlite lookup run in a bounded pool of threads. Requests for the same
+        moves that arrive while one of them is being looked up wait for that lookup instead of starting their own.
+        When max_pending different lookups are already waiting the server answers 503 instead of queueing more.
+
+        --opening-tree (or BGO_OPENING_TREE for http_api.asgi:app) answers the opening positions from an opening
+        tree in memory, see utils/opening_tree.py. The file is loaded at startup, or built from the database and
+        saved there when it is missing, was built with other knobs or the database changed since.
+'''
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+from urllib.parse import parse_qsl
+
+import click
+
+from database import DBAccess, DBAccessLookupNotFound, DBAccessException
+from http_api.cache import NextMoveCache
+from http_api.batch import answer_batch_request
+from http_api.games import answer_games_request
+from utils.opening_tree import OpeningTreeException, load_or_build_opening_tree, DEFAULT_MAX_DEPTH, DEFAULT_MIN_GAMES
+
+
+DEFAULT_THREADS = 8
+DEFAULT_MAX_PENDING = 256
+
+# Largest POST body, a batch of MAX_BATCH_POSITIONS move lists fits easily
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class NextMoveApp(object):
+
+    def __init__(self, database_path, threads=DEFAULT_THREADS, max_pending=DEFAULT_MAX_PENDING, coalesce=True,
+                 opening_tree_path=None, opening_depth=DEFAULT_MAX_DEPTH, opening_min_games=DEFAULT_MIN_GAMES):
+        self.database_path = database_path
+        self.threads = threads
+        self.max_pending = max_pending
+        self.coalesce = coalesce
+        self.opening_tree_path = opening_tree_path
+        self.opening_depth = opening_depth
+        self.opening_min_games = opening_min_games
+        # Opened by startup(), so importing the module does not need the database
+        self.db = None
+        self.next_move_cache = None
+        self.executor = None
+        self.pending = {}  # move string: asyncio.Future of its lookup
+        self.coalesced = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if self.db is None:
+                self.startup()
+            await self.handle_http(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def startup(self):
+        self.db = DBAccess(self.database_path, read_only=True)
+        self.next_move_cache = NextMoveCache(self.db, opening_tree=self.load_opening_tree())
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='nextmove')
+        try:
+            if self.db.get_pending_migrations():
+                print('Database needs to be migrated, run the migrate command in bshell.')
+        except DBAccessException as e:
+            print(f'Database needs to be migrated, run the migrate command in bshell. [{e}]')
+
+    def load_opening_tree(self):
+        if not self.opening_tree_path:
+            return None
+        try:
+            opening_tree = load_or_build_opening_tree(self.db, self.opening_tree_path, self.opening_depth,
+                                                      self.opening_min_games)
+        except (DBAccessException, OpeningTreeException) as e:
+            print(f'Opening tree not used - {e}')
+            return None
+        stats = opening_tree.get_stats()
+        print(f'Opening tree {self.opening_tree_path} with {stats["nodes"]} positions, {stats["bytes"]} bytes')
+        return opening_tree
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        if self.db is not None:
+            self.db.close()
+
+    async def handle_http(self, scope, receive, send):
+        path = scope['path']
+        if scope['method'] == 'POST' and path == '/api/nextmove':
+            status, data = await self.get_next_moves_batch(receive)
+            await send_json(send, status, data)
+        elif scope['method'] != 'GET':
+            await send_json(send, 405, {'message': 'Method not allowed'})
+        elif path.startswith('/api/nextmove/') and len(path) > len('/api/nextmove/'):
+            status, data = await self.get_next_moves(path[len('/api/nextmove/'):])
+            await send_json(send, status, data)
+        elif path == '/api/nextmove':
+            # No moves is the empty board
+            status, data = await self.get_next_moves('')
+            await send_json(send, status, data)
+        elif path == '/api/games':
+            status, data = await self.search_games(scope['query_string'].decode('latin-1'))
+            await send_json(send, status, data)
+        elif path == '/api/cache':
+            data = self.next_move_cache.get_stats()
+            data['coalesced'] = self.coalesced
+            data['pending'] = len(self.pending)
+            await send_json(send, 200, data)
+        elif path == '/api':
+            await send_json(send, 200, {'message': 'hello world'})
+        else:
+            await send_json(send, 404, {'message': 'Not found'})
+
+    '''
+        Returns (status, data) for the moves of a nextmove request, '+' separated like flask.py
+    '''
+    async def get_next_moves(self, move_string):
+        if self.coalesce:
+            future = self.pending.get(move_string)
+            if future is not None:
+                self.coalesced += 1
+                # shield, a client that disconnects must not cancel the lookup the others wait for
+                return await asyncio.shield(future)
+
+        if len(self.pending) >= self.max_pending:
+            return 503, {'message': 'Server busy'}
+
+        # Without coalescing every lookup still counts towards max_pending
+        key = move_string if self.coalesce else object()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, self.lookup_next_moves,
+                                      move_string.split('+') if move_string else [])
+        self.pending[key] = future
+        future.add_done_callback(lambda done: self.pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    '''
+        Returns (status, data) for a POST to /api/nextmove, see batch.py
+    '''
+    async def get_next_moves_batch(self, receive):
+        body = b''
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return 400, {'message': 'Client disconnected'}
+            body += message.get('body', b'')
+            if len(body) > MAX_BODY_SIZE:
+                return 413, {'message': 'Request too large'}
+            if not message.get('more_body', False):
+                break
+
+        try:
+            request_data = json.loads(body)
+        except ValueError:
+            return 400, {'message': 'Request must be JSON'}
+
+        if len(self.pending) >= self.max_pending:
+            return 503, {'message': 'Server busy'}
+
+        key = object()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, answer_batch_request, self.db, request_data)
+        self.pending[key] = future
+        future.add_done_callback(lambda done: self.pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    '''
+        Returns (status, data) for a GET of /api/games, see games.py
+    '''
+    async def search_games(self, query_string):
+        if len(self.pending) >= self.max_pending:
+            return 503, {'message': 'Server busy'}
+
+        key = object()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, answer_games_request, self.db, dict(parse_qsl(query_string)))
+        self.pending[key] = future
+        future.add_done_callback(lambda done: self.pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    # Runs in the thread pool
+    def lookup_next_moves(self, move_list):
+        try:
+            next_move_dict = self.next_move_cache.get_next_move_counter_for_moves(move_list)
+        except DBAccessException as e:
+            message = f'Error while accessing database! {e}'
+            print(message)
+            return 200, {'message': message}
+        except DBAccessLookupNotFound:
+            return 200, {'message': 'No data found'}
+
+        return 200, [{'move': k, 'count': v} for k, v in next_move_dict.items()]
+
+
+async def send_json(send, status, data):
+    # Sorted keys match the output of flask's jsonify
+    body = json.dumps(data, sort_keys=True).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+app = NextMoveApp(os.environ.get('BGO_DATABASE', 'database.sqlite'),
+                  opening_tree_path=os.environ.get('BGO_OPENING_TREE'))
+
+
+@click.command()
+@click.option('--database', default='database.sqlite', help='Database file to serve')
+@click.option('--host', default='127.0.0.1', help='Address to listen on')
+@click.option('--port', default=5000, help='Port to listen on')
+@click.option('--threads', default=DEFAULT_THREADS, help='Threads for the lookups')
+@click.option('--max-pending', default=DEFAULT_MAX_PENDING, help='Different lookups waiting before answering 503')
+@click.option('--no-coalesce', is_flag=True, help='Look up every request on its own')
+@click.option('--opening-tree', default=None, help='Opening tree file to load, or to build and save')
+@click.option('--opening-depth', default=DEFAULT_MAX_DEPTH, help='Moves deep the opening tree is built')
+@click.option('--opening-min-games', default=DEFAULT_MIN_GAMES, help='Games a next move needs to be walked into')
+def main(database, host, port, threads, max_pending, no_coalesce, opening_tree, opening_depth, opening_min_games):
+    try:
+        import uvicorn
+    except ImportError:
+        print('Needs uvicorn to run, pip install uvicorn, or serve http_api.asgi:app with another ASGI server.')
+        return
+
+    uvicorn.run(NextMoveApp(database, threads, max_pending, not no_coalesce, opening_tree, opening_depth,
+                            opening_min_games), host=host, port=port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    batch.py
+        POST /api/nextmove, the next moves of many positions in one request. Shared by flask.py and asgi.py.
+
+        {"moves": ["pd", "dp", "pq"]}           every prefix of a game, from the empty board to the last move
+        {"move_lists": [["pd"], ["dd", "pp"]]}  unrelated positions
+
+        Answers a list with one entry per position, in order:
+        [
+            {"moves": ["pd"], "next_moves": [{"move": "dp", "count": 20, "black_wins": 9, "white_wins": 11,
+                                              "last_date": "2012-06-11"}, ...]},
+            {"moves": ["pd", "dp"], "message": "No data found"},
+            ...
+        ]
+'''
+
+from database import DBAccessException
+import game_of_go.coords as coords
+
+
+# Positions answered by one request
+MAX_BATCH_POSITIONS = 1000
+
+
+'''
+    Returns (status, data) for the decoded JSON body of a batch request
+'''
+def answer_batch_request(db, request_data):
+    if not isinstance(request_data, dict):
+        return 400, {'message': 'Request must be a JSON object with "moves" or "move_lists"'}
+
+    if 'moves' in request_data:
+        move_lists = [request_data['moves']]
+    elif 'move_lists' in request_data:
+        move_lists = request_data['move_lists']
+    else:
+        return 400, {'message': 'Request must have "moves" or "move_lists"'}
+
+    if not isinstance(move_lists, list) or not all(is_move_list(move_list) for move_list in move_lists):
+        return 400, {'message': 'Moves must be lists of move strings such as ["pd", "dp"]'}
+
+    position_count = len(request_data['moves']) + 1 if 'moves' in request_data else len(move_lists)
+    if position_count > MAX_BATCH_POSITIONS:
+        return 400, {'message': f'At most {MAX_BATCH_POSITIONS} positions per request'}
+
+    try:
+        # A read only DBAccess opens new connections if the file changed on disk, as /api/nextmove does
+        db.get_data_generation()
+        if 'moves' in request_data:
+            results = db.get_next_move_stats_for_prefixes(request_data['moves'])
+        else:
+            results = db.get_next_move_stats_for_move_lists(move_lists)
+    except DBAccessException as e:
+        message = f'Error while accessing database! {e}'
+        print(message)
+        return 200, {'message': message}
+
+    data = []
+    for move_list, next_move_stats in results:
+        if next_move_stats is None:
+            data.append({'moves': move_list, 'message': 'No data found'})
+        else:
+            data.append({'moves': move_list,
+                         'next_moves': [dict(stats, move=next_move) for next_move, stats in next_move_stats.items()]})
+    return 200, data
+
+
+# Moves are lower case pairs as in the database, 'tt' is a pass
+def is_move_list(move_list):
+    return isinstance(move_list, list) and all(
+        move == 'tt' or (coords.is_valid_move(move) and move.islower()) for move in move_list)
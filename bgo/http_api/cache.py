@@ -0,0 +1,134 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    cache.py
+        Result cache for the next move lookups of the http api.
+
+        Entries are keyed by the canonical hash of the position and hold the merged next moves in the canonical
+        rotation, so every rotation of a position shares one entry. A hit only replays the moves to find the
+        canonical hash and rotation, then rotates the cached moves back into the rotation that was asked for.
+
+        The cache holds at most max_size positions and drops the least recently used. An entry expires ttl
+        seconds after it was stored. The whole cache is dropped when the data_generation of the database changes,
+        which import, the rebuilds and migrate increase.
+
+        With an opening tree (utils/opening_tree.py) the positions in the tree are answered from it and never
+        reach the cache. A tree built from another data_generation is not used.
+'''
+
+from collections import Counter, OrderedDict
+import threading
+import time
+
+from database import DBAccessException, DBAccessLookupNotFound
+import game_of_go.game_of_go as game_of_go
+import game_of_go.coords as coords
+
+
+DEFAULT_MAX_SIZE = 4096
+DEFAULT_TTL = 3600
+
+# Stored for positions the database has no next moves for, they are asked for repeatedly as well
+_NOT_FOUND = object()
+
+
+class NextMoveCache(object):
+
+    def __init__(self, db, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, opening_tree=None):
+        self.db = db
+        self.opening_tree = opening_tree
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # canonical_hash: (expires, merged counter in the canonical rotation)
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tree_hits = 0
+
+    '''
+        Same result as DBAccess.get_next_move_counter_for_moves(move_list)
+        Raises: DBAccessException, DBAccessLookupNotFound
+    '''
+    def get_next_move_counter_for_moves(self, move_list):
+        try:
+            position = game_of_go.build_replayboard_from_move_pair_list(move_list)
+        except game_of_go.IllegalMove:
+            raise DBAccessException(f'error while getting next move counter, illegal move in [{move_list}]')
+
+        canonical_hash, rotation = position.get_canonical_rotation()
+        generation = self.db.get_data_generation()
+
+        if self.opening_tree is not None and self.opening_tree.is_current(generation):
+            next_move_counter = self.opening_tree.get_next_move_counter(canonical_hash, rotation)
+            if next_move_counter is not None:
+                with self._lock:
+                    self.tree_hits += 1
+                return next_move_counter
+
+        counter_canonical = self.get(canonical_hash, generation)
+        if counter_canonical is None:
+            # In the canonical rotation the canonical rotation of the position is 0
+            try:
+                counter_canonical = self.db.get_next_move_counter_for_moves(
+                    coords.transform_move_pair_list(move_list, rotation))
+            except DBAccessLookupNotFound:
+                counter_canonical = _NOT_FOUND
+            self.put(canonical_hash, generation, counter_canonical)
+
+        if counter_canonical is _NOT_FOUND:
+            raise DBAccessLookupNotFound()
+
+        to_identity_rotation = coords.INVERSE_ROTATION[rotation]
+        return Counter({coords.transform_move_pair(next_move, to_identity_rotation): count
+                        for next_move, count in counter_canonical.items()})
+
+    '''
+        Returns the cached value for canonical_hash, or None if it is not cached or has expired
+    '''
+    def get(self, canonical_hash, generation):
+        with self._lock:
+            self.check_generation(generation)
+            entry = self._entries.get(canonical_hash)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(canonical_hash)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, canonical_hash, generation, value):
+        with self._lock:
+            self.check_generation(generation)
+            self._entries[canonical_hash] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(canonical_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # Call with the lock held
+    def check_generation(self, generation):
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'generation': self._generation,
+                'tree_hits': self.tree_hits,
+                'opening_tree': None if self.opening_tree is None else self.opening_tree.get_stats(),
+            }
@@ -1,8 +1,14 @@
+import os
+
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_restful import Resource, Api
 from werkzeug.routing import BaseConverter
 from database import DBAccess, DBAccessLookupNotFound, DBAccessGameRecordError, DBAccessException, DBAccessDuplicate
+from http_api.cache import NextMoveCache
+from http_api.batch import answer_batch_request
+from http_api.games import answer_games_request
+from utils.opening_tree import OpeningTreeException, load_or_build_opening_tree
 
 # From https://exploreflask.com/en/latest/views.html
 class ListConverter(BaseConverter):
@@ -16,26 +22,68 @@ app = Flask(__name__)
 api = Api(app)
 cors = CORS(app, resources={r"/api/*": {"origins": "*"}})
 app.url_map.converters['list'] = ListConverter
-db = DBAccess('database.sqlite')
+# The api only reads, its connections are opened again when an import or rebuild changes the file
+db = DBAccess('database.sqlite', read_only=True)
+# BGO_OPENING_TREE is an opening tree file to answer the opening positions from, see utils/opening_tree.py
+opening_tree = None
+if os.environ.get('BGO_OPENING_TREE'):
+    try:
+        opening_tree = load_or_build_opening_tree(db, os.environ['BGO_OPENING_TREE'])
+    except (DBAccessException, OpeningTreeException) as e:
+        print(f'Opening tree not used - {e}')
+next_move_cache = NextMoveCache(db, opening_tree=opening_tree)
+try:
+    if db.get_pending_migrations():
+        print('Database needs to be migrated, run the migrate command in bshell.')
+except DBAccessException as e:
+    print(f'Database needs to be migrated, run the migrate command in bshell. [{e}]')
+
+'''
+    Returns the JSON response of the next moves of move_list, an empty move_list is the empty board
+'''
+def answer_next_moves(move_list):
+    try:
+        print(f'Got {len(move_list)} moves [{move_list}]')
+        next_move_dict = next_move_cache.get_next_move_counter_for_moves(move_list)
+    except DBAccessException as e:
+        message = f'Error while accessing database! {e}'
+        print(message)
+        data = {'message': message}
+        return jsonify(data)
+    except DBAccessLookupNotFound:
+        message = f'No data found'
+        data = {'message': message}
+        return jsonify(data)
+
+    # data = { next_move_dict }
+    data = [{'move': k, 'count': v} for k,v in next_move_dict.items()]
+    return jsonify(data)
 
 class NextMoveData(Resource):
     def get(self, move_list):
-        try:
-            print(f'Got {len(move_list)} moves [{move_list}]')
-            next_move_dict = db.get_next_move_counter_for_moves(move_list)
-        except DBAccessException as e:
-            message = f'Error while accessing database! {e}'
-            print(message)
-            data = {'message': message}
-            return jsonify(data)
-        except DBAccessLookupNotFound:
-            message = f'No data found'
-            data = {'message': message}
-            return jsonify(data)
-
-        # data = { next_move_dict }
-        data = [{'move': k, 'count': v} for k,v in next_move_dict.items()]
-        return jsonify(data)
+        return answer_next_moves(move_list)
+
+class NextMoveBatch(Resource):
+    # GET without moves is the empty board
+    def get(self):
+        return answer_next_moves([])
+
+    def post(self):
+        status, data = answer_batch_request(db, request.get_json(silent=True))
+        response = jsonify(data)
+        response.status_code = status
+        return response
+
+class GameSearch(Resource):
+    def get(self):
+        status, data = answer_games_request(db, request.args.to_dict())
+        response = jsonify(data)
+        response.status_code = status
+        return response
+
+class CacheStats(Resource):
+    def get(self):
+        return jsonify(next_move_cache.get_stats())
 
 class Home(Resource):
     def get(self):
@@ -47,6 +95,9 @@ class Home(Resource):
 
 api.add_resource(Home, '/api')
 api.add_resource(NextMoveData, '/api/nextmove/<list:move_list>')
+api.add_resource(NextMoveBatch, '/api/nextmove')
+api.add_resource(GameSearch, '/api/games')
+api.add_resource(CacheStats, '/api/cache')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,66 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    games.py
+        GET /api/games, searches the games by their metadata with DBAccess.search_games(). Shared by flask.py and
+        asgi.py.
+
+        /api/games?player=Lee+Sedol&from=2010&to=2015
+        /api/games?player=Lee+Sedol&from=2010&to=2015&after=2012-06-11,1234
+
+        Parameters are player, opponent, color, event, text, from, to, result, min_rank, limit and after, see
+        search_games(). Answers the games most recent first and next, the after of the next page or null on the
+        last page:
+        {
+            "games": [{"game_id": 1234, "game_date": "2012-06-11", "black_player_name": "Lee Sedol", ...}, ...],
+            "next": "2012-06-11,1234"
+        }
+'''
+
+from database import DBAccessException
+from database._search import SEARCH_PAGE_SIZE
+
+
+# Query parameters passed to search_games() as they are
+TEXT_PARAMETERS = {
+    'player': 'player',
+    'opponent': 'opponent',
+    'color': 'color',
+    'event': 'event',
+    'text': 'text',
+    'from': 'date_from',
+    'to': 'date_to',
+    'result': 'result',
+}
+
+
+'''
+    Returns (status, data) for the query parameters of a games request, a dictionary of parameter: string
+'''
+def answer_games_request(db, params):
+    search = {argument: params[name] for name, argument in TEXT_PARAMETERS.items() if params.get(name)}
+
+    try:
+        search['limit'] = int(params.get('limit') or SEARCH_PAGE_SIZE)
+        if params.get('min_rank'):
+            search['min_rank'] = int(params['min_rank'])
+    except ValueError:
+        return 400, {'message': 'limit and min_rank must be numbers'}
+
+    if params.get('after'):
+        game_date, _, game_id = params['after'].rpartition(',')
+        if not game_date or not game_id.isdigit():
+            return 400, {'message': 'after must be the next of the page before, such as 2012-06-11,1234'}
+        search['after'] = (game_date, int(game_id))
+
+    try:
+        # A read only DBAccess opens new connections if the file changed on disk, as /api/nextmove does
+        db.get_data_generation()
+        page = db.search_games(**search)
+    except DBAccessException as e:
+        message = f'Error while searching games! {e}'
+        print(message)
+        return 200, {'message': message}
+
+    next_page = None if page['next'] is None else f'{page["next"][0]},{page["next"][1]}'
+    return 200, {'games': page['games'], 'next': next_page}
@@ -0,0 +1,76 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    test_transposed_import.py
+        Imports two different games that transpose into the same final board, and a rotated copy of the first game,
+        into a new database and into a database whose final_board_hash is still keyed by board_hash. Both imports
+        must add the two games, count the copy as a duplicate and keep a final position for each game.
+
+        python -m pytest tests
+'''
+
+import io
+import sqlite3
+import tarfile
+
+from database import DBAccess
+
+
+# The same five stones, played in another order, and the first game rotated by 90 degrees
+TRANSPOSED_GAMES = (
+    ('first.sgf', '(;GM[1]SZ[19]PB[Black A]PW[White A]DT[2001-01-01]RE[B+R];B[cd];W[qq];B[ee];W[pp];B[jj])'),
+    ('second.sgf', '(;GM[1]SZ[19]PB[Black B]PW[White B]DT[2001-01-02]RE[W+R];B[ee];W[pp];B[cd];W[qq];B[jj])'),
+    ('first_rotated.sgf', '(;GM[1]SZ[19]PB[Black A]PW[White A]DT[2001-01-01]RE[B+R];B[dq];W[qc];B[eo];W[pd];B[jj])'),
+)
+
+EXPECTED_COUNTS = (3, 2, 1, 0, 0)
+
+OLD_FINAL_BOARD_HASH_LIST = ('CREATE TABLE `final_board_hash` ('
+                             '`board_hash`	INTEGER PRIMARY KEY,'
+                             '`game_id`	INTEGER NOT NULL);')
+
+
+def write_tgz(path):
+    with tarfile.open(path, 'w:gz') as tar:
+        for name, sgf_text in TRANSPOSED_GAMES:
+            data = sgf_text.encode('utf-8')
+            tarinfo = tarfile.TarInfo(name)
+            tarinfo.size = len(data)
+            tar.addfile(tarinfo, io.BytesIO(data))
+
+
+def check_import(database_path, tgz_path):
+    db = DBAccess(str(database_path))
+    try:
+        counts = db.add_games_from_tgz(str(tgz_path))
+        cursor = db.connect_to_sql().cursor()
+        cursor.execute('SELECT COUNT(*), COUNT(DISTINCT board_hash) FROM final_board_hash')
+        final_rows, final_hashes = cursor.fetchone()
+        keyed_by_hash = db.is_final_positions_keyed_by_hash()
+    finally:
+        db.close()
+
+    assert counts == EXPECTED_COUNTS
+    # Both games keep their final position although it is the same board
+    assert (final_rows, final_hashes) == (2, 1)
+    assert not keyed_by_hash
+
+
+def test_transposed_import_new_database(tmp_path):
+    tgz_path = tmp_path / 'transposed.tgz'
+    write_tgz(tgz_path)
+    check_import(tmp_path / 'new.sqlite', tgz_path)
+
+
+def test_transposed_import_old_final_board_hash(tmp_path):
+    tgz_path = tmp_path / 'transposed.tgz'
+    write_tgz(tgz_path)
+
+    # A database from before final_board_hash was keyed by game_id
+    old_path = tmp_path / 'old.sqlite'
+    old_db = sqlite3.connect(str(old_path))
+    old_db.execute(OLD_FINAL_BOARD_HASH_LIST)
+    old_db.commit()
+    old_db.close()
+
+    check_import(old_path, tgz_path)
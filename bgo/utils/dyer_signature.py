@@ -0,0 +1,42 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    dyer_signature.py
+        Dyer signatures of games, read straight from the move list without playing the moves on a board.
+
+        The Dyer signature is the points of moves 20, 40, 60, 31, 51 and 71. Two records of the same game share
+        them even when one stops early or has passes at the end, as long as both reach move 71, and two different
+        games almost never do. The points of moves 1 to 19 are a second signature, for games too short to have a
+        Dyer signature. A missing move is '..', so a record that stops before move 71 has another signature than
+        a longer record of the same game and is not found as its duplicate.
+
+        Both signatures are taken in all 8 rotations and the rotation with the smallest pair is kept, so a game
+        recorded in another orientation has the same signatures. The dyer_signatures table is keyed by them,
+        a duplicate check is one lookup of its primary key.
+'''
+
+import game_of_go.coords as coords
+
+
+# Move numbers of the points of each signature, counted from 1
+SIGNATURE_A_MOVES = (20, 40, 60, 31, 51, 71)
+SIGNATURE_B_MOVES = tuple(range(1, 20))
+MISSING_MOVE = '..'
+
+
+'''
+    Returns (signature_a, signature_b) of a list of flat moves
+'''
+def build_dyer_signature(flat_moves):
+    signature_moves = [flat_moves[number - 1] if number <= len(flat_moves) else None
+                       for number in SIGNATURE_A_MOVES + SIGNATURE_B_MOVES]
+
+    best = None
+    for rotated_flat in coords.ROTATED_FLAT:
+        signature = ''.join(MISSING_MOVE if fc is None else coords.FLAT_TO_MOVE_PAIR[rotated_flat[fc]]
+                            for fc in signature_moves)
+        if best is None or signature < best:
+            best = signature
+
+    split = len(SIGNATURE_A_MOVES) * 2
+    return best[:split], best[split:]
@@ -45,24 +45,53 @@ class GoBoard(object):
 
     '''
         Reset state to initial, empty board.
+        position is a ReplayBoard, it keeps the captures of every move so a move is taken back without a replay.
+        redo_moves are the moves taken back by remove_last_move(), the next one to redo is last.
     '''
     def reset(self):
-        self.position = game_of_go.Position.initial_state()
+        self.position = game_of_go.ReplayBoard()
         self.moves = []
+        self.redo_moves = []
         self.marks = {}
 
     '''
-        Removes the last move and rebuilds the position.
+        Removes the last move, it can be played again with redo_move().
+        Takes back one move from the position, the time does not depend on the length of the game.
     '''
     def remove_last_move(self):
-        if len(self.moves) is 0:
+        if len(self.moves) == 0:
             self.reset()
         else:
-            old_moves = self.moves
-            old_moves.pop()
-            self.reset()
-            for move in old_moves:
-                self.play(move)
+            self.reset_marks()
+            self.position.undo()
+            self.redo_moves.append(self.moves.pop())
+
+    '''
+        Plays the last move removed by remove_last_move() again.
+        Return True if a move was played, False if there is nothing to redo
+    '''
+    def redo_move(self):
+        if not self.redo_moves:
+            return False
+        return self.play(self.redo_moves[-1])
+
+    '''
+        Removes or redoes moves until move_number moves are on the board, 0 is the empty board.
+        Each step takes back or plays one move, the moves before them are not replayed.
+        Return True if the board is at move_number, False if it is out of range
+    '''
+    def go_to_move(self, move_number):
+        if move_number < 0 or move_number > len(self.moves) + len(self.redo_moves):
+            return False
+        while len(self.moves) > move_number:
+            self.remove_last_move()
+        while len(self.moves) < move_number:
+            if not self.redo_move():
+                return False
+        return True
+
+    def get_move_number(self):
+        return len(self.moves)
 
     def add_mark(self, move, mark):
         self.marks[move] = mark
@@ -123,12 +152,17 @@ class GoBoard(object):
             return
 
         try:
-            new_position = self.position.play_move(move, uc)
+            self.position.play_move(move, uc)
         except game_of_go.IllegalMove:
             print(f"   Illegal Move '{move}'")
             return False
-        self.position = new_position
         self.moves.append(move)
+
+        # Playing the next move of the redo stack keeps the rest of it, any other move starts a new line
+        if self.redo_moves and self.redo_moves[-1] == move:
+            self.redo_moves.pop()
+        else:
+            self.redo_moves = []
         color = self.invert_color(color)
         return True
 
@@ -0,0 +1,227 @@
+'''
+bGo by BrianB (troff.troff@gmail.com)
+
+    opening_tree.py
+        The next moves of the opening positions held in memory, so the lookups of the first moves of a game, which
+        are most of the traffic, do not replay the moves for sqlite or query it.
+
+        Nodes are canonical positions, a position reached by different move orders or in another rotation is one
+        node. Each node holds its next moves in the canonical rotation, already merged like
+        DBAccess.merge_next_move_counter() and most played first, with the number of games that played them.
+        The tree is four flat arrays, the sorted node hashes, the start of the moves of each node and the moves and
+        counts of all nodes, which is 12 bytes per node and 6 bytes per next move. A lookup is a binary search on
+        the canonical hash.
+
+        It is built from next_move_stats by walking the positions from the first move on one ReplayBoard, up to
+        max_depth moves deep and only into next moves played in at least min_games games, the two knobs for its
+        size. Every node keeps all of its next moves, so a position in the tree gets the same answer as from the
+        database. Positions not in the tree return None and are looked up in the database.
+
+        save() writes the arrays to a file and load_opening_tree() reads them back without any replay, the way to
+        start a server quickly on a large database. The file records the data_generation it was built from,
+        load_or_build_opening_tree() builds a new one when the database has changed since.
+'''
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+import os
+import struct
+import sys
+
+from database import DBAccessLookupNotFound
+import game_of_go.coords as coords
+import game_of_go.game_of_go as game_of_go
+
+
+DEFAULT_MAX_DEPTH = 20
+DEFAULT_MIN_GAMES = 5
+
+FILE_MAGIC = b'BGOTREE1'
+# magic, data_generation, max_depth, min_games, node count, next move count, little endian
+FILE_HEADER = struct.Struct('<8sQIIQQ')
+
+
+class OpeningTreeException(Exception):
+    '''An opening tree file could not be read or written'''
+
+
+class OpeningTree(object):
+
+    def __init__(self, node_hashes, move_starts, moves, counts, generation, max_depth, min_games):
+        self.node_hashes = node_hashes  # array('Q') of canonical hashes, sorted
+        self.move_starts = move_starts  # array('I'), node i has moves[move_starts[i]:move_starts[i + 1]]
+        self.moves = moves  # array('H') of flat codes in the canonical rotation
+        self.counts = counts  # array('I') of games per next move
+        self.generation = generation
+        self.max_depth = max_depth
+        self.min_games = min_games
+
+    '''
+        Returns the merged next moves of canonical_hash rotated back by the inverse of rotation, like
+        DBAccess.get_next_move_counter_for_moves() for a position with that canonical hash and rotation,
+        or None if the position is not in the tree
+    '''
+    def get_next_move_counter(self, canonical_hash, rotation=0):
+        index = bisect_left(self.node_hashes, canonical_hash)
+        if index == len(self.node_hashes) or self.node_hashes[index] != canonical_hash:
+            return None
+
+        to_identity = coords.ROTATED_FLAT[coords.INVERSE_ROTATION[rotation]]
+        start, end = self.move_starts[index], self.move_starts[index + 1]
+        return Counter({coords.FLAT_TO_MOVE_PAIR[to_identity[fc]]: count
+                        for fc, count in zip(self.moves[start:end], self.counts[start:end])})
+
+    # position is a Position or ReplayBoard, such as the one of the bshell search board
+    def get_next_move_counter_for_position(self, position):
+        return self.get_next_move_counter(*position.get_canonical_rotation())
+
+    def is_current(self, generation):
+        return self.generation == generation
+
+    def get_size_in_bytes(self):
+        return sum(values.itemsize * len(values)
+                   for values in (self.node_hashes, self.move_starts, self.moves, self.counts))
+
+    def get_stats(self):
+        return {
+            'nodes': len(self.node_hashes),
+            'next_moves': len(self.moves),
+            'bytes': self.get_size_in_bytes(),
+            'max_depth': self.max_depth,
+            'min_games': self.min_games,
+            'generation': self.generation,
+        }
+
+    '''
+        Writes the tree to path
+        Raises: OpeningTreeException
+    '''
+    def save(self, path):
+        try:
+            with open(path, 'wb') as tree_file:
+                tree_file.write(FILE_HEADER.pack(FILE_MAGIC, self.generation, self.max_depth, self.min_games,
+                                                 len(self.node_hashes), len(self.moves)))
+                for values in (self.node_hashes, self.move_starts, self.moves, self.counts):
+                    if sys.byteorder != 'little':
+                        values = array(values.typecode, values)
+                        values.byteswap()
+                    values.tofile(tree_file)
+        except OSError as e:
+            raise OpeningTreeException(f'error writing opening tree {path} - [{e}]')
+
+
+'''
+    Reads a tree written by OpeningTree.save()
+    Raises: OpeningTreeException
+'''
+def load_opening_tree(path):
+    try:
+        with open(path, 'rb') as tree_file:
+            header = tree_file.read(FILE_HEADER.size)
+            if len(header) != FILE_HEADER.size or header[:len(FILE_MAGIC)] != FILE_MAGIC:
+                raise OpeningTreeException(f'{path} is not an opening tree file')
+            _, generation, max_depth, min_games, node_count, move_count = FILE_HEADER.unpack(header)
+
+            arrays = []
+            for typecode, length in (('Q', node_count), ('I', node_count + 1), ('H', move_count), ('I', move_count)):
+                values = array(typecode)
+                values.fromfile(tree_file, length)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                arrays.append(values)
+    except EOFError:
+        raise OpeningTreeException(f'opening tree {path} is truncated')
+    except OSError as e:
+        raise OpeningTreeException(f'error reading opening tree {path} - [{e}]')
+
+    return OpeningTree(*arrays, generation, max_depth, min_games)
+
+
+'''
+    Builds the tree from the next_move_stats of db, see the top of the file for max_depth and min_games
+    Raises: DBAccessException
+'''
+def build_opening_tree(db, max_depth=DEFAULT_MAX_DEPTH, min_games=DEFAULT_MIN_GAMES):
+    generation = db.get_data_generation()
+    nodes = {}  # canonical_hash: (depth, [(flat code in the canonical rotation, count), ...])
+
+    # hash_list has no rows for the empty board, the walk starts from every first move
+    board = game_of_go.ReplayBoard()
+    if max_depth > 0:
+        for fc in range(game_of_go.NN):
+            board.play_flat_move(fc, game_of_go.BLACK)
+            add_opening_nodes(db, board, game_of_go.WHITE, 1, max_depth, min_games, nodes)
+            board.undo()
+
+    node_hashes = array('Q', sorted(nodes))
+    move_starts = array('I', [0])
+    moves = array('H')
+    counts = array('I')
+    for canonical_hash in node_hashes:
+        for fc, count in nodes[canonical_hash][1]:
+            moves.append(fc)
+            counts.append(count)
+        move_starts.append(len(moves))
+
+    return OpeningTree(node_hashes, move_starts, moves, counts, generation, max_depth, min_games)
+
+
+'''
+    Adds the node of the position on board and the nodes after it to nodes. The next moves are played and undone on
+    board, so it is the same position again on return. A node that was reached in fewer moves before is not walked
+    again, one that was reached in more moves is walked again for the moves the depth left out.
+'''
+def add_opening_nodes(db, board, color, depth, max_depth, min_games, nodes):
+    canonical_hash, rotation = board.get_canonical_rotation()
+    known = nodes.get(canonical_hash)
+    if known is not None and known[0] <= depth:
+        return
+
+    try:
+        next_move_counter = db.get_next_move_counter_for_canonical_hash(canonical_hash, 0)
+    except DBAccessLookupNotFound:
+        return
+
+    # Group the next moves by the canonical hash they lead to, as DBAccess.group_symmetric_next_moves() does
+    to_board = coords.ROTATED_FLAT[coords.INVERSE_ROTATION[rotation]]
+    merged = {}  # first move of the group: [count, legal]
+    representative_for_hash = {}
+    for next_move, count in next_move_counter.most_common():
+        fc = coords.convert_move_pair_to_flat(next_move)
+        try:
+            board.play_flat_move(to_board[fc], color)
+        except game_of_go.IllegalMove:
+            merged[fc] = [count, False]
+            continue
+        child_hash = board.get_canonical_hash()
+        board.undo()
+        representative = representative_for_hash.setdefault(child_hash, fc)
+        merged.setdefault(representative, [0, True])[0] += count
+
+    nodes[canonical_hash] = (depth, [(fc, count) for fc, (count, _) in merged.items()])
+
+    if depth == max_depth:
+        return
+    for fc, (count, legal) in merged.items():
+        if legal and count >= min_games:
+            board.play_flat_move(to_board[fc], color)
+            add_opening_nodes(db, board, game_of_go.swap_colors(color), depth + 1, max_depth, min_games, nodes)
+            board.undo()
+
+
+'''
+    Loads the tree saved at path when it was built with the same knobs from the current data of db, otherwise
+    builds it and saves it to path for the next start
+    Raises: DBAccessException, OpeningTreeException
+'''
+def load_or_build_opening_tree(db, path, max_depth=DEFAULT_MAX_DEPTH, min_games=DEFAULT_MIN_GAMES):
+    if os.path.exists(path):
+        opening_tree = load_opening_tree(path)
+        if (opening_tree.is_current(db.get_data_generation()) and opening_tree.max_depth == max_depth and
+                opening_tree.min_games == min_games):
+            return opening_tree
+
+    opening_tree = build_opening_tree(db, max_depth, min_games)
+    opening_tree.save(path)
+    return opening_tree